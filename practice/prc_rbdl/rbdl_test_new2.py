@@ -7,11 +7,17 @@
 # Base⊙-------⊙ j1
 # 新增：2018年6月11日
 #  1. 添加对约束力的显示
+#  2. 先仿真后绘制，见 supervised learning/tools/sim_render.py
 # ---------------------------------------
+import os
+import sys
 import numpy as np
 import rbdl
-import matplotlib.pyplot as plt
-import matplotlib.animation as animation
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../supervised learning'))
+import rbd_numpy
+from contact_dynamics import ContactSolver
+from tools import sim_render
 
 
 l1, l2, l3 = [0.5, 0.4, 0.6]
@@ -73,68 +79,44 @@ tau = np.zeros(model.qdot_size)
 t_cycle = 0.002
 
 
-# 产生绘图数据
-def data_gen(q=q0[:], qd=qd0[:], qdd=qdd0[:]):
-    t_max = 2
-    for i in range(int(t_max/t_cycle)):
-        # 从源文件知道，这个动力学计算是不包括约束的，所以用这个计算约束没用
-        # 改了一些封装之后可用了
-        print(q)
-        rbdl.CalcContactSystemVariables(model, q, qd, tau, constrain_set_l1)
-        H = constrain_set_l1.get_H()
-        G = constrain_set_l1.get_G()
-        C = constrain_set_l1.get_C()
-        gamma = constrain_set_l1.get_gamma()
-        A = np.zeros((7, 7))
-        A[0:5, 0:5] = H
-        A[5:7, 0:5] = G
-        A[0:5, 5:7] = G.transpose()
-        b = np.zeros((7, 1))
-        b[0:5, 0] = -C.transpose()
-        b[5:7, 0] = gamma.transpose()
-        res = np.dot(np.linalg.inv(A), b)
-        qdd = res[0:5, 0].transpose()
-        lamb = res[5:7, 0]
-        # 这种简单的积分是一定会产生漂移的，约束点的漂移简直可怕
-        qd = qd + qdd * t_cycle
-        q = q + qd * t_cycle
-        yield q, lamb
-
-
-def run(data):
-    q, lamb = data
-    # print(q)
-    j0_p = rbdl.CalcBodyToBaseCoordinates(model, q, b_link1, np.array([0., l1, 0.]))
-    j1_p = rbdl.CalcBodyToBaseCoordinates(model, q, b_link1, np.array([0., 0., 0.]))
-    j2_p = rbdl.CalcBodyToBaseCoordinates(model, q, b_link3, np.array([0., 0., 0.]))
-    j3_p = rbdl.CalcBodyToBaseCoordinates(model, q, b_link3, np.array([0., l3, 0.]))
-
-    link1.set_data([j0_p[1], j1_p[1]], [j0_p[2], j1_p[2]])
-    link2.set_data([j1_p[1], j2_p[1]], [j1_p[2], j2_p[2]])
-    link3.set_data([j2_p[1], j3_p[1]], [j2_p[2], j3_p[2]])
-    link4.set_data([j0_p[1], j0_p[1]-lamb[0]/60], [j0_p[2], j0_p[2]-lamb[1]/60])
-    # gif_writer.grab_frame()
-
-
-
-def init():
-    ax.set_ylim(-2, 2)
-    ax.set_xlim(-0, 4)
-
-
-fig, ax = plt.subplots()
-link1, = ax.plot([], [], 'b', lw=2)
-link2, = ax.plot([], [], 'r', lw=2)
-link3, = ax.plot([], [], 'g', lw=2)
-link4, = ax.plot([], [], 'r', lw=2)
-ax.grid()
-
-# 保存为gif文件
-# gif_writer=animation.ImageMagickFileWriter(fps=2)
-ani = animation.FuncAnimation(fig, run, data_gen, blit=False, interval=10, repeat=False, init_func=init)
-# ani.save('res.gif',writer='imagemagick', fps=2)
-# gif_writer.finish()
-plt.show()
+# 约束动力学求解：Cholesky + Schur补，见 supervised learning/contact_dynamics.py
+solver = ContactSolver()
+
+
+def contact_system(q_in, qd_in, tau_in):
+    rbdl.CalcContactSystemVariables(model, q_in, qd_in, tau_in, constrain_set_l1)
+    return (constrain_set_l1.get_H(), constrain_set_l1.get_C(),
+            constrain_set_l1.get_G(), constrain_set_l1.get_gamma())
+
+
+# 1. 仿真：全速积分，只记录轨迹
+# 这种简单的积分是一定会产生漂移的，约束点的漂移简直可怕
+t_max = 2
+q_traj, lamb_traj = sim_render.simulate_contact(solver, contact_system, q0, qd0, tau, t_cycle, t_max, 'l1')
+
+# 2. 关键点：同构的numpy运动学模型(只用于正运动学，惯量为0)，一次批量计算
+kin = rbd_numpy.TreeModel()
+zero = np.zeros((6, 6))
+kin_base = kin.add_body(-1, [0.0, 1.0, 1.0], 'R', [1., 0., 0.], zero)
+kin_base = kin.add_body(kin_base, [0.0, 0.0, 0.0], 'P', [0., 1., 0.], zero)
+kin_base = kin.add_body(kin_base, [0.0, 0.0, 0.0], 'P', [0., 0., 1.], zero)
+kin_link1 = kin.add_body(kin_base, [0.0, -l2/2, 0.0], 'R', [1., 0., 0.], zero)
+kin_link3 = kin.add_body(kin_base, [0.0, l2/2, 0.0], 'R', [1., 0., 0.], zero)
+pts = sim_render.points_trajectory(kin, q_traj, [(kin_link1, [0., l1, 0.]),     # j0
+                                                 (kin_link1, [0., 0., 0.]),     # j1
+                                                 (kin_link3, [0., 0., 0.]),     # j2
+                                                 (kin_link3, [0., l3, 0.])])    # j3
+# 约束力的显示
+force = np.stack((pts[:, 0], pts[:, 0]), axis=1)
+force[:, 1, 1] -= lamb_traj[:, 0] / 60
+force[:, 1, 2] -= lamb_traj[:, 1] / 60
+
+# 3. 绘制
+ani = sim_render.TrajectoryAnimation([pts[:, [0, 1]], pts[:, [1, 2]], pts[:, [2, 3]], force], t_cycle, fps=30,
+                                     styles=[{'color': c, 'lw': 2} for c in 'brgr'],
+                                     xlim=(0, 4), ylim=(-2, 2))
+# 保存为gif文件：TrajectoryAnimation(..., headless=True).save('res.gif')
+ani.show()
 
 # 测试完毕
 # 1. 注意定义body时设定的基坐标，在rbdl_test中是没改过的，可以试试
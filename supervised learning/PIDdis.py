@@ -1,4 +1,5 @@
 """一个简单的离散PID实现"""
+import numpy as np
 
 
 # 仿真时间是每一个周期update的，最好只用于仿真中确定时间间隔的
@@ -56,3 +57,78 @@ class DisPid:
         self.out = 0
         self.err_1 = 0.0
         self.errInt = 0.0
+
+
+# 向量化的PID控制器组：N个回路的参数和状态都以数组保存，一次update计算全部回路
+# 与DisPid的区别：
+# 1. 输出限幅 [min_u, max_u]，min_u默认为-max_u
+# 2. 积分限幅 [integrator_min, integrator_windup]，integrator_min默认为-integrator_windup
+# 3. 积分分离默认按|err|判断，one_sided_separation=True时同DisPid只在err > int_err_max时分离
+# 4. 条件积分抗饱和(anti_windup)：输出饱和且误差继续加深饱和时，本周期不积分
+# 与DisPid完全一致的设置：max_u=10, min_u=-np.inf, integrator_windup=20, integrator_min=-np.inf,
+#                        int_err_max=10, one_sided_separation=True, anti_windup=False
+class PidBank:
+    def __init__(self, n, p=0.2, i=0.0, d=0.0, gap=0.005,
+                 max_u=10.0, integrator_windup=20.0, int_err_max=10.0, min_u=None, anti_windup=True,
+                 integrator_min=None, one_sided_separation=False):
+        self.n = n
+        self.Kp = np.full(n, p, dtype=np.float64)      # 参数可以是标量或长度为n的数组
+        self.Ki = np.full(n, i, dtype=np.float64)
+        self.Kd = np.full(n, d, dtype=np.float64)
+
+        self.t_cycle = gap                             # 采样周期
+        self.out = np.zeros(n)                         # 控制输出
+        self.errInt = np.zeros(n)                      # 误差积分
+        self.err_1 = np.zeros(n)
+
+        self.integrator_windup = np.full(n, integrator_windup, dtype=np.float64)
+        self.integrator_min = (-self.integrator_windup if integrator_min is None
+                               else np.full(n, integrator_min, dtype=np.float64))
+        self.int_err_max = np.full(n, int_err_max, dtype=np.float64)
+        self.max_u = np.full(n, max_u, dtype=np.float64)
+        self.min_u = -self.max_u if min_u is None else np.full(n, min_u, dtype=np.float64)
+        self.anti_windup = anti_windup
+        self.one_sided_separation = one_sided_separation
+
+    # err: (n,) 误差
+    # d_err: (n,) 误差导数，已知时(例如直接测得速度误差)使用，否则用差分
+    # 返回输出的副本，self.out在下一次update时会被覆盖
+    def update(self, err, d_err=None):
+        err = np.asarray(err, dtype=np.float64)
+        # 比例项
+        p_item = self.Kp * err
+        # 微分项
+        if d_err is None:
+            d_item = self.Kd * (err - self.err_1) / self.t_cycle
+        else:
+            d_item = self.Kd * np.asarray(d_err, dtype=np.float64)
+        # 积分项：积分分离 + 积分限幅
+        in_band = err <= self.int_err_max if self.one_sided_separation else np.fabs(err) <= self.int_err_max
+        coefficient_i = in_band * (self.Ki * self.t_cycle)
+        int_new = np.clip(self.errInt + err, self.integrator_min, self.integrator_windup)
+        u = p_item + d_item + coefficient_i * int_new
+        # 条件积分：未饱和，或者误差方向使输出退出饱和时才接受积分
+        if self.anti_windup:
+            deepen = ((u > self.max_u) & (err > 0)) | ((u < self.min_u) & (err < 0))
+            self.errInt = np.where(deepen, self.errInt, int_new)
+            u = p_item + d_item + coefficient_i * self.errInt
+        else:
+            self.errInt = int_new
+        np.clip(u, self.min_u, self.max_u, out=self.out)
+
+        # 善后
+        self.err_1 = err.copy()
+        return self.out.copy()
+
+    def set_gains(self, p=None, i=None, d=None):
+        if p is not None:
+            self.Kp[:] = p
+        if i is not None:
+            self.Ki[:] = i
+        if d is not None:
+            self.Kd[:] = d
+
+    def controller_reset(self):
+        self.out[:] = 0.0
+        self.err_1[:] = 0.0
+        self.errInt[:] = 0.0
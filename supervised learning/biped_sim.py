@@ -1,18 +1,24 @@
 import pybullet as p
-import time
 import pybullet_data
-import pandas as pd
 import numpy as np
 from geomdl import BSpline
 from geomdl import utilities
 from scipy.interpolate import interp1d
 from scipy.optimize import minimize
 
-import tools.utils as utl
+import tools.transform as tf
+from tools.leg_kinematics import leg_forward
+from tools.profiler import SectionProfiler
+from tools.pair_table import load_pair_table
 import slip3D_ex
+from scheduler import MultiRateScheduler
+from PIDdis import PidBank
 
 g = 9.8
-sim_cycle = 0.1                             # 仿真粒度
+physics_dt = 1/1000.                        # 物理仿真步长
+planner_rate = 1000                         # 空中摆动规划频率(Hz)
+stance_rate = 200                           # 支撑优化控制频率(Hz)
+profile_path = None                         # 设置为文件路径时开启分段计时，退出时保存
 
 
 def limit_in01(p_in):
@@ -23,6 +29,28 @@ def limit_in01(p_in):
     return p_in
 
 
+# BSpline曲线与dict的互相转换，未规划的曲线对应None
+def curve_to_dict(curve):
+    if not curve.ctrlpts:
+        return None
+    return {'ctrlpts': [list(pt) for pt in curve.ctrlpts],
+            'degree': curve.degree,
+            'knotvector': list(curve.knotvector),
+            'delta': curve.delta}
+
+
+def curve_from_dict(data):
+    curve = BSpline.Curve()
+    if data is None:
+        return curve
+    curve.degree = data['degree']
+    curve.ctrlpts = data['ctrlpts']
+    curve.delta = data['delta']
+    curve.knotvector = data['knotvector']
+    curve.evaluate()
+    return curve
+
+
 # -------------------------------------------------------
 # 类：奔跑运动控制器
 #                     x方向与地面夹角
@@ -40,7 +68,12 @@ class BipedController:
         self.dic_vel_jac = {}         # 由速度索引的控制雅可比矩阵
         # self.dic_air_time = {}        # 速度索引半周期
         # self.dic_sup_time = {}        # 速度索引的支撑时间
-        self.pair_table = np.array([])
+        self.pair_table = None           # PairTable
+        self.policy = None            # 可选的控制策略(MlpPolicy)，替代查表+雅可比
+        self.prof = SectionProfiler()  # 分段计时，默认关闭
+        # 摆动腿关节PD控制器 kp=1, kd=0.1, 力矩限幅20
+        self.leg_pid = {'left': PidBank(3, p=1.0, d=0.1, gap=physics_dt, max_u=20.0),
+                        'right': PidBank(3, p=1.0, d=0.1, gap=physics_dt, max_u=20.0)}
         # -----------本周期相关变量------------------
         self.start_time = 0             # 本周起的起始时间
         self.this_x = np.array([])     # 起始顶点状态
@@ -63,6 +96,8 @@ class BipedController:
         self.cycle_cnt = 1             # 半周期计数
         # 支撑阶段相关数据
         self.path_gen = []             # 质心路径生成器
+        self.sup_t = np.array([])      # 质心路径数据，用于重建path_gen
+        self.sup_y = np.array([])
         self.t_sup_max = 0
         self.t_sup_begin = 0             # 支撑相初始时间
 
@@ -71,9 +106,9 @@ class BipedController:
     # 生成控制雅可比矩阵
     # -----------------------------------------
     def load_table(self, pair_path):
-        # 1. 读取表格
-        pair_table = pd.read_csv(pair_path, header=None).values
-        self.pair_table = pair_table
+        # 1. 读取表格(只解析一次csv，之后内存映射)
+        self.pair_table = load_pair_table(pair_path)
+        pair_table = self.pair_table.rows
         # 2. 生成控制雅可比矩阵
         table_len = pair_table.shape[0]
         for idx in range(table_len):
@@ -83,6 +118,38 @@ class BipedController:
             # self.dic_air_time[pair_table[i, 1]] = pair_table[i, 7]
             # self.dic_sup_time[pair_table[i, 1]] = pair_table[i, 8]
 
+    # -----------------------------------------
+    # 控制器状态的保存与恢复(用于检查点)
+    # 不包含机器人id、控制策略和计时器
+    # 曲线和插值器以原始数据保存，恢复时重建
+    # -----------------------------------------
+    def get_state(self):
+        skip = ('robot_id', 'plane_id', 'policy', 'prof', 'path_gen', 'this_curve_l', 'this_curve_r')
+        state = {key: val for key, val in self.__dict__.items() if key not in skip}
+        state['this_curve_l'] = curve_to_dict(self.this_curve_l)
+        state['this_curve_r'] = curve_to_dict(self.this_curve_r)
+        return state
+
+    def set_state(self, state):
+        for key, val in state.items():
+            if key not in ('this_curve_l', 'this_curve_r'):
+                setattr(self, key, val)
+        self.this_curve_l = curve_from_dict(state['this_curve_l'])
+        self.this_curve_r = curve_from_dict(state['this_curve_r'])
+        if len(self.sup_t):
+            self.set_sup_path(self.sup_t, self.sup_y)
+        else:
+            self.path_gen = []
+
+    # 开启分段计时，dump_path不为None时在退出时保存直方图
+    def enable_profiling(self, dump_path=None):
+        self.prof.enabled = True
+        self.prof.dump_on_exit(dump_path)
+
+    # 设置控制策略，policy=None时使用查表+雅可比
+    def set_policy(self, policy):
+        self.policy = policy
+
     # -----------------------------------------
     # 计算控制量：
     # 期望速度-->【pair】-->【控制量】-->落地点
@@ -101,12 +168,11 @@ class BipedController:
     def choose_pair_from_speed(self):
         # 0. 前提：table和期望速度
         des_vel = self.des_v  # 获取期望速度
-        vel_list = self.pair_table[:, 1]
         # 1. 根据速度从table中获取pair
-        if des_vel > vel_list.max() or des_vel < vel_list.min():
+        if not self.pair_table.in_range(des_vel):
             print("Error, input wrong velocity!")
-        m_idx = np.fabs(vel_list - des_vel).argmin()
-        m_pair = self.pair_table[m_idx]
+        m_idx = self.pair_table.nearest(des_vel)
+        m_pair = self.pair_table.pair(m_idx)
         # 2. 更新本周期控制参数
         self.des_pair = m_pair
         self.des_air_time = m_pair[7]           # 半周期空中时间
@@ -117,17 +183,15 @@ class BipedController:
         # 0. 前提：本次apex状态和期望pair
         m_pair = self.des_pair
         x_now = self.this_x                 # 获取当前顶点状态
-        # 1. 计算在标准pair下的控制增量 delta u
-        delta_x = x_now - m_pair[0: 3]
-        jac = self.dic_vel_jac[m_pair[1]]
-        delta_u = np.dot(jac, delta_x.transpose())
-        delta_u_out = np.array([0, 0, 0, 0])
-        delta_u_out[0:3] = delta_u
-        delta_u_out[-1] += -delta_u[-1]      # 冗余量约束设计得到
-        self.this_du = delta_u_out
-        # 2. 计算本周期应用的pair
-        #                                    增益系数
-        self.this_u = np.array(m_pair[3:7]) + 0.1 * self.this_du
+        # 1. 计算在标准pair下的控制增量 delta u，以及本周期应用的pair
+        if self.policy is None:
+            jac = self.dic_vel_jac[m_pair[1]]
+            #                                                                         增益系数
+            self.this_u, self.this_du = slip3D_ex.control_u_calculation(m_pair, jac, x_now, gain=0.1)
+        else:
+            # 使用学习得到的策略直接给出控制量
+            self.this_u = np.array(self.policy.predict(x_now, self.des_v))
+            self.this_du = (self.this_u - np.array(m_pair[3:7])) / 0.1
         if self.cycle_cnt == 1:
             self.this_u[1] = np.pi/25        # 修改第一个周期的左脚位置
         self.this_pair[0:3] = x_now.tolist()
@@ -144,20 +208,16 @@ class BipedController:
     # -----------------------------------------
     def coord_fake_world2joint(self, p_world, leg):
         assert p_world.shape == (3, 1)
-        tmp = p_world.tolist()
-        tmp.append([1])
-        pw_ext = np.array(tmp)
         b_po = p.getBasePositionAndOrientation(self.robot_id)
         alpha, beta, gamma = p.getEulerFromQuaternion(b_po[1])        # 机体欧拉角表示
         if leg == 'left':
             dy = 0.12
         else:
             dy = -0.12
-        t1 = utl.rotate_x(alpha).dot(utl.rotate_y(beta).dot(utl.trans_xyz(0, dy, -0.2)))
-        p_in1 = np.linalg.inv(t1).dot(pw_ext)
+        t1 = tf.rotate_x(alpha).dot(tf.rotate_y(beta).dot(tf.trans_xyz(0, dy, -0.2)))
+        p_in1 = t1.apply_inv(p_world[:, 0])
         ang_a = np.arctan2(p_in1[1], abs(p_in1[2]))
-        t2 = utl.rotate_x(ang_a)
-        p_in2 = np.linalg.inv(t2).dot(p_in1)
+        p_in2 = tf.rotate_x(ang_a).apply_inv(p_in1)
         x2, z2 = p_in2[0], p_in2[2]
         # print(p_in2)
         tmp1 = x2 * x2 + z2 * z2
@@ -177,20 +237,19 @@ class BipedController:
         # md = p.POSITION_CONTROL
         rid = self.robot_id
         j_id = [4, 5, 6]
-        max_force = 20
         if leg == 'left':
             j_id = [0, 1, 2]
-        for idx in range(3):
-            # p.setJointMotorControl2(rid, j_id[idx], md, targetPosition=angle[idx], force=max_force)
-            kp, kd = 1, 0.1
-            q, dq = p.getJointState(rid, j_id[idx])[0:2]
-            tor = kp*(angle[idx] - q) + kd*(vel[idx]-dq)
-            print(tor, angle[idx], q, vel[idx], dq)
-            p.setJointMotorControl2(
-                bodyUniqueId=rid,
-                jointIndex=j_id[idx],
-                controlMode=md,
-                force=tor)
+        states = p.getJointStates(rid, j_id)
+        q = np.array([st[0] for st in states])
+        dq = np.array([st[1] for st in states])
+        # 三个关节的PD控制一次计算，输出对称限幅
+        tor = self.leg_pid[leg].update(np.asarray(angle) - q, np.asarray(vel) - dq)
+        # print(tor, angle, q, vel, dq)
+        p.setJointMotorControlArray(
+            bodyUniqueId=rid,
+            jointIndices=j_id,
+            controlMode=md,
+            forces=tor.tolist())
 
     # -----------------------------------------
     # 支撑相关计算
@@ -198,26 +257,9 @@ class BipedController:
     # 2. 计算此时腿长
     # -----------------------------------------
     def calc_forward_length(self, leg):
-        # 获取必要信息
-        rid = self.robot_id
-        if leg == 'left':       # 左腿角度及偏移
-            dy = 0.12
-            ang_a = p.getJointState(rid, 0)[0]
-            ang_b = p.getJointState(rid, 1)[0]
-            ang_c = p.getJointState(rid, 2)[0]
-        else:
-            dy = -0.12
-            ang_a = p.getJointState(rid, 4)[0]
-            ang_b = p.getJointState(rid, 5)[0]
-            ang_c = p.getJointState(rid, 6)[0]
-        # 计算腿端点在机体坐标系下(注意不是世界坐标系)的位置
-        t1 = utl.trans_xyz(0, dy, -0.2)
-        t2 = utl.rotate_x(ang_a).dot(utl.rotate_y(ang_b).dot(utl.trans_xyz(0, 0, -0.5)))
-        t3 = utl.rotate_y(ang_c)                       # 膝关节转动
-        pos_ed = np.array([[0.], [0.], [-0.5], [1]])   # 末坐标系下的位置扩展
-        p_w = t1.dot(t2.dot(t3.dot(pos_ed)))           # 机体坐标系下的位置
-        leg_len = np.sqrt(p_w[0]*p_w[0] + p_w[1]*p_w[1] + p_w[2]*p_w[2])   # 腿长度
-        return p_w, leg_len
+        # 计算腿端点在机体坐标系下(注意不是世界坐标系)的位置，以及腿长度
+        foot, leg_len, _ = leg_forward(self.get_joint_angle(leg), leg)
+        return foot, leg_len
 
     def get_joint_angle(self, leg_down):
         rid = self.robot_id
@@ -291,9 +333,9 @@ class BipedController:
         jp5 = self.coord_fake_world2joint(np.array(p5).reshape((3, 1)), leg_down)
         # 2.3 构造曲线对象
         tmp_curve = BSpline.Curve()
+        tmp_curve.degree = 4
         tmp_curve.ctrlpts = (jp1, jp2, jp3, jp4, jp5)
         tmp_curve.delta = 0.01
-        tmp_curve.degree = 4
         tmp_curve.knotvector = utilities.generate_knot_vector(4, len(tmp_curve.ctrlpts))
         tmp_curve.evaluate()
         if leg_down is 'left':
@@ -324,9 +366,9 @@ class BipedController:
         jp5 = self.coord_fake_world2joint(np.array(p5).reshape((3, 1)), leg_down)
         # 3.3 构造曲线对象
         tmp_curve = BSpline.Curve()
+        tmp_curve.degree = 4
         tmp_curve.ctrlpts = (jp1, jp2, jp3, jp4, jp5)
         tmp_curve.delta = 0.01
-        tmp_curve.degree = 4
         tmp_curve.knotvector = utilities.generate_knot_vector(4, len(tmp_curve.ctrlpts))
         tmp_curve.evaluate()
         if leg_down is 'left':
@@ -352,6 +394,14 @@ class BipedController:
         right = self.this_curve_r.derivatives(limit_in01(p_c_r), order=1)
         return left, right
 
+    # 设置支撑阶段的质心路径
+    def set_sup_path(self, t_sup, y_sup):
+        self.sup_t, self.sup_y = t_sup, y_sup
+        self.t_sup_max = t_sup[-1]
+        self.path_gen = []            # 清空数据
+        for idx in range(6):
+            self.path_gen.append(interp1d(t_sup, y_sup[idx]))
+
     # -----------------------------------------
     # 获取支撑阶段的轨迹
     # np.array([x, y, z, vx, vy, vz])
@@ -372,25 +422,11 @@ class BipedController:
     # -----------------------------------------
     def sup_get_com_real_pos(self, leg):
         # 1. 获取对应到的信息
-        rid = self.robot_id
-        b_po = p.getBasePositionAndOrientation(rid)
+        b_po = p.getBasePositionAndOrientation(self.robot_id)
         alpha, beta, gamma = p.getEulerFromQuaternion(b_po[1])
-        if leg == 'left':
-            dy = 0.12
-            ang_a = p.getJointState(rid, 0)[0]
-            ang_b = p.getJointState(rid, 1)[0]
-            ang_c = p.getJointState(rid, 2)[0]
-        else:
-            dy = -0.12
-            ang_a = p.getJointState(rid, 4)[0]
-            ang_b = p.getJointState(rid, 5)[0]
-            ang_c = p.getJointState(rid, 6)[0]
-        t1 = utl.rotate_x(alpha).dot(utl.rotate_y(beta).dot(utl.trans_xyz(0, dy, -0.2)))
-        t2 = utl.rotate_x(ang_a).dot(utl.rotate_y(ang_b).dot(utl.trans_xyz(0, 0, -0.5)))
-        t3 = utl.rotate_y(ang_c)  # 膝关节转动
-        pos_ed = np.array([[0.], [0.], [-0.5], [1]])  # 末坐标系下的位置扩展
-        p_w = t1.dot(t2.dot(t3.dot(pos_ed)))  # 机体坐标系下的位置
-        return -p_w[0:3]                      # 反方向
+        foot, leg_len, _ = leg_forward(self.get_joint_angle(leg), leg)   # 机体坐标系下足端位置
+        p_w = tf.rotate_x(alpha).dot(tf.rotate_y(beta)).apply(foot)      # 转到伪世界坐标系
+        return -p_w                           # 反方向
 
     # 更新系统状态到模型
     # -----------------------------------------
@@ -401,7 +437,7 @@ class BipedController:
     # 4. pb默认的步长时1/240.0,改成1/1000了
     # -----------------------------------------
     def cost_function(self, tau, des_a, leg_down):
-        time_step = 1/1000.0                    # 单步时间长度
+        time_step = physics_dt                  # 单步时间长度
         rid = self.robot_id
         state_id = p.saveState()               # 保存当前系统状态
         md = p.TORQUE_CONTROL   # 扭矩控制模式
@@ -483,121 +519,138 @@ class BipedController:
     # -----------------------------------------
     # 机器人控制：
     # 输出[tau1 ……tau6]的控制量（no）-->直接控制
+    # 按状态分为空中控制(摆动规划)和触地控制(支撑)，二者可以以不同频率调用
     # -----------------------------------------
     def robot_control(self):
-        leg_down = ''                  # 初始化
+        if self.status == 'air':
+            self.air_control()
+        elif self.status == 'ground':
+            self.ground_control()
+
+    # 当前周期中正要落下的腿
+    def get_leg_down(self):
+        if self.cycle_cnt % 2:
+            return 'left'
+        return 'right'
+
+    # 空中部分控制
+    def air_control(self):
         # 获取一些必要信息
         rid = self.robot_id
         g = self.para[1]
+        leg_down = self.get_leg_down()
+        prof = self.prof
         # 获取机器人状态
-        vel = p.getBaseVelocity(rid)
-        pos = p.getBasePositionAndOrientation(rid)
-        contact_list = p.getContactPoints(rid, planeId)
-
-        if self.status == 'air':
-            # 如果刚从其他状态进入air状态-只需要在进入阶段执行一次
-            if self.cycle_cnt % 2:
-                leg_down = 'left'
-            else:
-                leg_down = 'right'
-            if self.status_change:
-                self.start_time = self.sys_t  # 获取本周期的起始时间
-                # 计算本次能达到的顶点高度
-                h0 = pos[0][2] + 0.5 * vel[0][2] * vel[0][2] / g
-                self.this_x = np.array([h0, vel[0][0], vel[0][1]])
-                # 更新本周期的控制pair，计算jac矩阵，以及控制参数
+        with prof.section('pybullet_io'):
+            vel = p.getBaseVelocity(rid)
+            pos = p.getBasePositionAndOrientation(rid)
+            contact_list = p.getContactPoints(rid, self.plane_id)
+
+        # 如果刚从其他状态进入air状态-只需要在进入阶段执行一次
+        if self.status_change:
+            self.start_time = self.sys_t  # 获取本周期的起始时间
+            # 计算本次能达到的顶点高度
+            h0 = pos[0][2] + 0.5 * vel[0][2] * vel[0][2] / g
+            self.this_x = np.array([h0, vel[0][0], vel[0][1]])
+            # 更新本周期的控制pair，计算jac矩阵，以及控制参数
+            with prof.section('air_entry_pair'):
                 self.choose_pair_from_speed()
+            with prof.section('air_entry_jac'):
                 self.calculate_control_param()
+            with prof.section('air_entry_swing'):
                 self.swing_related_calculation()
                 self.swing_curve_planning(leg_down)
-                if self.cycle_cnt == 1:    # 第一圈，的初始化
-                    self.start_time = -self.des_air_time/2                 # 第一圈的起始时间在之前
-                    # 系统初始，设置关节位置
-                    lj, rj = self.swing_get_planning(self.sys_t-self.start_time, 'left')
-                    # 左腿初始位置和速度
-                    p.resetJointState(rid, 0, lj[0][0], targetVelocity=lj[1][0])
-                    p.resetJointState(rid, 1, lj[0][1], targetVelocity=lj[1][1])
-                    p.resetJointState(rid, 2, lj[0][2], targetVelocity=lj[1][2])
-                    # 右腿初始位置和速度
-                    p.resetJointState(rid, 4, rj[0][0], targetVelocity=rj[1][0])
-                    p.resetJointState(rid, 5, rj[0][1], targetVelocity=rj[1][1])
-                    p.resetJointState(rid, 6, rj[0][2], targetVelocity=rj[1][2])
-                self.status_change = False
-            else:
-                # 如果不是刚进入腾空状态，直接获取状态并控制即可
-                lj, rj = self.swing_get_planning(self.sys_t-self.start_time, leg_down)
+            if self.cycle_cnt == 1:    # 第一圈，的初始化
+                self.start_time = -self.des_air_time/2                 # 第一圈的起始时间在之前
+                # 系统初始，设置关节位置
+                lj, rj = self.swing_get_planning(self.sys_t-self.start_time, 'left')
+                # 左腿初始位置和速度
+                p.resetJointState(rid, 0, lj[0][0], targetVelocity=lj[1][0])
+                p.resetJointState(rid, 1, lj[0][1], targetVelocity=lj[1][1])
+                p.resetJointState(rid, 2, lj[0][2], targetVelocity=lj[1][2])
+                # 右腿初始位置和速度
+                p.resetJointState(rid, 4, rj[0][0], targetVelocity=rj[1][0])
+                p.resetJointState(rid, 5, rj[0][1], targetVelocity=rj[1][1])
+                p.resetJointState(rid, 6, rj[0][2], targetVelocity=rj[1][2])
+            self.status_change = False
+        else:
+            # 如果不是刚进入腾空状态，直接获取状态并控制即可
+            with prof.section('air_track'):
+                with prof.section('swing_eval'):
+                    lj, rj = self.swing_get_planning(self.sys_t-self.start_time, leg_down)
                 self.position_control_leg(lj[0], lj[1], 'left')
                 self.position_control_leg(rj[0], rj[1], 'right')
-                # 判定是否进行状态转化（即是否触地）
-                if len(contact_list):
-                    self.status = 'ground'
-                    self.status_change = True
-        # 触地部分控制
-        elif self.status is 'ground':
-            if self.status_change:           # 进入地面初始化
-                self.status_change = False
-                # 仿真计算支撑过程轨迹
-                sol1, sol2, sol3, sol4, foot_point = slip3D_ex.sim_cycle(self.this_pair, self.para)
-                y1, y2 = sol2.y, sol3.y
-                t1 = sol2.t
-                t2 = t1[-1] + sol3.t
-                y_sup = np.concatenate((y1[:, 0:-1], y2), axis=1)
-                t_sup = np.concatenate((t1[0:-1], t2), axis=0)
-                self.t_sup_max = t_sup[-1]
-                self.path_gen = []            # 清空数据
-                for idx in range(6):
-                    self.path_gen.append(interp1d(t_sup, y_sup[idx]))
-                self.t_sup_begin = self.sys_t     # 设置支撑开始时间为此时的系统时间
-
-            # 计算期望运动的PD控制量
-            # 1. body质心轨迹跟踪，需要一个f(t)-->质心轨迹
-            des_a = dict()
-            tmp = self.sup_get_com_trajectory(self.sys_t - self.t_sup_begin)
-            ref_com_pos, ref_com_vel = tmp[0:3], tmp[3:6]
-            rel_com_pos = self.sup_get_com_real_pos(leg_down)
-            rel_com_vel = np.array(p.getBaseVelocity(self.robot_id)[1])
-            # PD计算重心期望加速度
-            kp, kd = 100, 10
-            des_a['com'] = kp*(ref_com_pos-rel_com_pos) + kd*(ref_com_vel-rel_com_vel)
-
-            # 2. 摆动腿轨迹跟踪
-            # 参考轨迹
+            # 判定是否进行状态转化（即是否触地）
+            if len(contact_list):
+                self.status = 'ground'
+                self.status_change = True
+
+    # 触地部分控制
+    def ground_control(self):
+        rid = self.robot_id
+        leg_down = self.get_leg_down()
+        prof = self.prof
+        if self.status_change:           # 进入地面初始化
+            self.status_change = False
+            # 仿真计算支撑过程轨迹
+            with prof.section('stance_resim'):
+                traj = slip3D_ex.sim_cycle_trajectory(self.this_pair, self.para)
+                sup = traj.phase_span(1, 2)             # 压缩 + 弹射
+                self.set_sup_path(sup[:, 0] - sup[0, 0], sup[:, 1:7].T)
+            self.t_sup_begin = self.sys_t     # 设置支撑开始时间为此时的系统时间
+
+        # 计算期望运动的PD控制量
+        # 1. body质心轨迹跟踪，需要一个f(t)-->质心轨迹
+        des_a = dict()
+        tmp = self.sup_get_com_trajectory(self.sys_t - self.t_sup_begin)
+        ref_com_pos, ref_com_vel = tmp[0:3], tmp[3:6]
+        rel_com_pos = self.sup_get_com_real_pos(leg_down)
+        rel_com_vel = np.array(p.getBaseVelocity(self.robot_id)[1])
+        # PD计算重心期望加速度
+        kp, kd = 100, 10
+        des_a['com'] = kp*(ref_com_pos-rel_com_pos) + kd*(ref_com_vel-rel_com_vel)
+
+        # 2. 摆动腿轨迹跟踪
+        # 参考轨迹
+        with prof.section('swing_eval'):
             lj, rj = self.swing_get_planning(self.sys_t - self.start_time, leg_down)
-            # 实际位置和速度
-            if leg_down == 'left':
-                ang_a, vel_a = p.getJointState(rid, 4)[0:2]
-                ang_b, vel_b = p.getJointState(rid, 5)[0:2]
-                ang_c, vel_c = p.getJointState(rid, 6)[0:2]
-                ref_ang_q = np.array(rj[0])
-                ref_ang_dq = np.array(rj[1])
-            else:
-                ang_a, vel_a = p.getJointState(rid, 0)[0:2]
-                ang_b, vel_b = p.getJointState(rid, 1)[0:2]
-                ang_c, vel_c = p.getJointState(rid, 2)[0:2]
-                ref_ang_q = np.array(lj[0])
-                ref_ang_dq = np.array(lj[1])
-            real_ang_q = np.array([ang_a, ang_b, ang_c])
-            real_ang_dq = np.array([vel_a, vel_b, vel_c])
-            # 基于误差的控制规划
-            kp, kd = 40, 5
-            des_a['foot'] = kp*(ref_ang_q-real_ang_q) + kd*(ref_ang_dq-real_ang_dq)
-
-            # 3. 稳定body角度为0，角动量为0
-            kp, kd = 20, 4
-            tmp = p.getBasePositionAndOrientation(rid)
-            real_body_ang = np.array(p.getEulerFromQuaternion(tmp[1]))
-            real_body_vel = np.array(p.getBaseVelocity(rid))
-            des_a['body'] = -kp*real_body_ang - kd*real_body_vel
-
-
-            # 4. 稳定净角动量为0（先不考虑这个）
-
-            # 5. 优化求解最优控制力
+        # 实际位置和速度
+        if leg_down == 'left':
+            ang_a, vel_a = p.getJointState(rid, 4)[0:2]
+            ang_b, vel_b = p.getJointState(rid, 5)[0:2]
+            ang_c, vel_c = p.getJointState(rid, 6)[0:2]
+            ref_ang_q = np.array(rj[0])
+            ref_ang_dq = np.array(rj[1])
+        else:
+            ang_a, vel_a = p.getJointState(rid, 0)[0:2]
+            ang_b, vel_b = p.getJointState(rid, 1)[0:2]
+            ang_c, vel_c = p.getJointState(rid, 2)[0:2]
+            ref_ang_q = np.array(lj[0])
+            ref_ang_dq = np.array(lj[1])
+        real_ang_q = np.array([ang_a, ang_b, ang_c])
+        real_ang_dq = np.array([vel_a, vel_b, vel_c])
+        # 基于误差的控制规划
+        kp, kd = 40, 5
+        des_a['foot'] = kp*(ref_ang_q-real_ang_q) + kd*(ref_ang_dq-real_ang_dq)
+
+        # 3. 稳定body角度为0，角动量为0
+        kp, kd = 20, 4
+        tmp = p.getBasePositionAndOrientation(rid)
+        real_body_ang = np.array(p.getEulerFromQuaternion(tmp[1]))
+        real_body_vel = np.array(p.getBaseVelocity(rid))
+        des_a['body'] = -kp*real_body_ang - kd*real_body_vel
+
+
+        # 4. 稳定净角动量为0（先不考虑这个）
+
+        # 5. 优化求解最优控制力
+        with prof.section('optimal_control'):
             tau_ctrl = self.optimal_control(des_a, leg_down)
-            # tau_ctrl = np.array([0, 0, 0, 0, 0, 0])
-            md = p.TORQUE_CONTROL
-            leg_id_li = [0, 1, 2, 4, 5, 6]
-            print(tau_ctrl)
+        # tau_ctrl = np.array([0, 0, 0, 0, 0, 0])
+        md = p.TORQUE_CONTROL
+        leg_id_li = [0, 1, 2, 4, 5, 6]
+        print(tau_ctrl)
+        with prof.section('pybullet_io'):
             for idx in range(6):
                 p.setJointMotorControl2(
                     bodyUniqueId=rid,
@@ -606,35 +659,39 @@ class BipedController:
                     force=tau_ctrl[idx])
 
 
-# 准备环境
-physicsClient = p.connect(p.GUI)
-p.setAdditionalSearchPath(pybullet_data.getDataPath())
-p.setGravity(0, 0, -g)
-
-# 创建模型
-planeId = p.loadURDF("plane.urdf")
-cubeStartPos = [0, 0, 1.3]
-cubeStartOrientation = p.getQuaternionFromEuler([0, 0, 0])
-RobotId = p.loadURDF("bipedRobotOne.urdf", cubeStartPos, cubeStartOrientation)
-p.resetBaseVelocity(RobotId, [2.0, 0, 0])
-mode = p.VELOCITY_CONTROL
-# 控制器
-bc = BipedController(RobotId, planeId)
-bc.load_table('./data/stable_pair.csv')
-bc.set_target_vel(3.0)
-p.setTimeStep(1/1000.)
-
-for i in range(6000):
-    # 控制程序
-    print(i)
-    bc.set_system_time(i*sim_cycle)
-    bc.robot_control()
-    p.stepSimulation()
-    time.sleep(1/240.0)
-
-p.disconnect()
-
-
-
-
-
+# 准备环境，返回 plane_id, robot_id
+def create_world(connect_mode=p.GUI):
+    p.connect(connect_mode)
+    p.setAdditionalSearchPath(pybullet_data.getDataPath())
+    p.setGravity(0, 0, -g)
+    p.setTimeStep(physics_dt)
+    # 创建模型
+    plane_id = p.loadURDF("plane.urdf")
+    cube_start_pos = [0, 0, 1.3]
+    cube_start_orientation = p.getQuaternionFromEuler([0, 0, 0])
+    robot_id = p.loadURDF("bipedRobotOne.urdf", cube_start_pos, cube_start_orientation)
+    p.resetBaseVelocity(robot_id, [2.0, 0, 0])
+    return plane_id, robot_id
+
+
+# 多速率调度：物理仿真、摆动规划、支撑控制各自按自己的频率运行，共用一个时钟
+def create_scheduler(bc):
+    sched = MultiRateScheduler(physics_dt, p.stepSimulation, bc.set_system_time)
+    sched.add_task('planner', planner_rate, bc.air_control, guard=lambda: bc.status == 'air')
+    sched.add_task('stance', stance_rate, bc.ground_control, guard=lambda: bc.status == 'ground')
+    return sched
+
+
+if __name__ == '__main__':
+    planeId, RobotId = create_world()
+    # 控制器
+    bc = BipedController(RobotId, planeId)
+    bc.load_table('./data/stable_pair.csv')
+    bc.set_target_vel(3.0)
+    if profile_path is not None:
+        bc.enable_profiling(profile_path)
+    sched = create_scheduler(bc)
+    sched.run(6.0, realtime=True)
+    print(sched.report())
+
+    p.disconnect()
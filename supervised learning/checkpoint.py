@@ -0,0 +1,94 @@
+# -----------------------------------------------
+# biped_sim实验的检查点：保存/恢复/分叉
+# 检查点是一个目录：
+#   world.bullet   - pybullet世界状态(p.saveBullet)
+#   controller.pkl - BipedController状态以及调度器时钟
+# 从同一个检查点可以分叉出多个实验(例如不同的期望速度)，
+# 每个实验在独立进程中运行，暖机和过渡阶段只需要仿真一次
+# -----------------------------------------------
+import os
+import pickle
+import multiprocessing as mp
+import numpy as np
+import pybullet as p
+
+import biped_sim
+
+
+def save_checkpoint(path, bc, sched):
+    os.makedirs(path, exist_ok=True)
+    p.saveBullet(os.path.join(path, 'world.bullet'))
+    data = {'controller': bc.get_state(),
+            'tick': sched.tick,
+            'physics_dt': sched.physics_dt}
+    with open(os.path.join(path, 'controller.pkl'), 'wb') as f:
+        pickle.dump(data, f)
+
+
+# 在已经创建好的世界中恢复检查点(模型加载顺序需与保存时一致，见biped_sim.create_world)
+def load_checkpoint(path, bc, sched):
+    with open(os.path.join(path, 'controller.pkl'), 'rb') as f:
+        data = pickle.load(f)
+    if data['physics_dt'] != sched.physics_dt:
+        raise ValueError('checkpoint physics_dt %g does not match scheduler %g'
+                         % (data['physics_dt'], sched.physics_dt))
+    p.restoreState(fileName=os.path.join(path, 'world.bullet'))
+    bc.set_state(data['controller'])
+    sched.tick = data['tick']
+    bc.set_system_time(sched.t)
+
+
+# 在新进程中打开检查点，返回 (bc, sched)
+def open_checkpoint(path, connect_mode=p.DIRECT):
+    plane_id, robot_id = biped_sim.create_world(connect_mode)
+    bc = biped_sim.BipedController(robot_id, plane_id)
+    sched = biped_sim.create_scheduler(bc)
+    load_checkpoint(path, bc, sched)
+    return bc, sched
+
+
+# 单个分叉实验：variant = {'target_vel': ..., 'duration': ...}
+# 返回结束时的机体状态和调度统计
+def run_variant(path, variant):
+    bc, sched = open_checkpoint(path)
+    if 'target_vel' in variant:
+        bc.set_target_vel(variant['target_vel'])
+    sched.run(variant.get('duration', 1.0))
+    pos, orn = p.getBasePositionAndOrientation(bc.robot_id)
+    vel = p.getBaseVelocity(bc.robot_id)[0]
+    res = {'variant': variant,
+           't': sched.t,
+           'base_pos': np.array(pos),
+           'base_vel': np.array(vel),
+           'status': bc.status,
+           'report': sched.report()}
+    p.disconnect()
+    return res
+
+
+def _run_variant_args(args):
+    return run_variant(*args)
+
+
+# 从检查点分叉多个实验，并行运行
+def fork_checkpoint(path, variants, processes=None):
+    ctx = mp.get_context('spawn')      # 每个进程需要独立的pybullet连接
+    with ctx.Pool(processes) as pool:
+        return pool.map(_run_variant_args, [(path, v) for v in variants])
+
+
+if __name__ == '__main__':
+    ckpt_path = './data/ckpt_warmup'
+    # 1. 暖机：以3m/s运行5s后保存检查点
+    planeId, RobotId = biped_sim.create_world(p.DIRECT)
+    m_bc = biped_sim.BipedController(RobotId, planeId)
+    m_bc.load_table('./data/stable_pair.csv')
+    m_bc.set_target_vel(3.0)
+    m_sched = biped_sim.create_scheduler(m_bc)
+    m_sched.run(5.0)
+    save_checkpoint(ckpt_path, m_bc, m_sched)
+    p.disconnect()
+    # 2. 从检查点分叉不同期望速度的实验
+    m_variants = [{'target_vel': v, 'duration': 2.0} for v in [2.5, 3.0, 3.5, 4.0]]
+    for item in fork_checkpoint(ckpt_path, m_variants):
+        print(item['variant'], 't=%.3f' % item['t'], 'vel', item['base_vel'], item['status'])
@@ -0,0 +1,65 @@
+# -----------------------------------------------
+# 约束漂移与步长的关系
+# 模型：rbd_numpy的双足，左脚支撑、关节力为0(同rbdl_biped.modelTest)
+# 对比：无稳定 / Baumgarte / 步后投影 / 两者结合
+# 指标：接触点最大位置误差、最大速度误差、仿真耗时
+# -----------------------------------------------
+import time
+import numpy as np
+
+import rbd_numpy
+from contact_dynamics import ContactSolver
+
+modes = {
+    'none': {},
+    'baumgarte': {'baumgarte': True},
+    'project': {'project': True},
+    'both': {'baumgarte': True, 'project': True},
+}
+
+
+# Baumgarte增益随步长取：alpha = beta = ratio/dt
+# G不变时，误差的离散系统在 0 <= ratio < 1, ratio^2 < 4(1 - ratio) 时稳定(见ContactSolver.step)，
+# 但这里双足零力矩倒下，关节速度可达约20rad/s，10ms一步G转过约0.2rad，线性分析不再成立：
+# ratio=0.2在10ms时发散，ratio=0.1在1-10ms都不发散
+def baumgarte_gains(dt, ratio=0.1):
+    return ratio / dt, ratio / dt
+
+
+def run_drift(dt, t_max=0.5, baumgarte=False, project=False):
+    model, cs_left, _, _ = rbd_numpy.biped_model_create()
+    system = rbd_numpy.contact_system(model, cs_left)
+    q = np.zeros(model.q_size)
+    dq = np.zeros(model.q_size)
+    tau = np.zeros(model.q_size)
+    constraint = rbd_numpy.constraint_function(model, cs_left, q)
+    solver = ContactSolver()
+    gains = baumgarte_gains(dt) if baumgarte else None
+    pos_err, vel_err = 0.0, 0.0
+    t0 = time.perf_counter()
+    for _ in range(int(round(t_max / dt))):
+        q, dq, _, _ = solver.step(q, dq, tau, dt, system, 'cs_left',
+                                  constraint=constraint, baumgarte=gains, project=project)
+        phi, G = constraint(q)
+        pos_err = max(pos_err, np.abs(phi).max())
+        vel_err = max(vel_err, np.abs(G.dot(dq)).max())
+    return pos_err, vel_err, time.perf_counter() - t0
+
+
+if __name__ == '__main__':
+    dts = [1e-3, 2e-3, 5e-3, 10e-3]
+    print('%10s %8s %12s %12s %10s' % ('mode', 'dt/ms', 'pos_err/m', 'vel_err', 'time/s'))
+    result = {}
+    for name, opts in modes.items():
+        for dt in dts:
+            result[name, dt] = run_drift(dt, **opts)
+            print('%10s %8.1f %12.3e %12.3e %10.3f' % ((name, dt * 1e3) + result[name, dt]))
+
+    import matplotlib.pyplot as plt
+    for name in modes:
+        plt.loglog(np.array(dts) * 1e3, [max(result[name, dt][0], 1e-16) for dt in dts], 'o-', label=name)
+    plt.xlabel('dt / ms')
+    plt.ylabel('max contact position error / m')
+    plt.grid(True, which='both')
+    plt.legend()
+    plt.show()
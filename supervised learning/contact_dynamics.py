@@ -0,0 +1,153 @@
+# ----------------------------------------
+# 带约束的动力学求解
+#   H qdd + G^T fc = -C
+#   G qdd          = gamma
+# 不构造增广矩阵 [[H, G^T], [G, 0]]，也不求逆：
+#   1. H 做Cholesky分解 H = L L^T
+#   2. 一次回代得到 H^-1 G^T 和 H^-1 C
+#   3. Schur补 S = G H^-1 G^T，解 S fc = -G H^-1 C - gamma
+#   4. qdd = -H^-1 C - H^-1 G^T fc
+# 每个约束集(如 cs_left, cs_right)缓存一份工作数组(workspace)，H和Schur补的
+# Cholesky分解、回代都直接在这些数组上进行(LAPACK potrf/potrs，覆盖输入)，
+# 每步不再分配矩阵。H、G是稠密的，每步数值都变，没有可以复用的符号分解结构，
+# 缓存的只是数组。
+#
+# 约束漂移(只约束了加速度，积分后位置、速度误差会累积)：
+#   1. Baumgarte稳定：gamma' = gamma - 2*alpha*G*dq - beta^2*phi
+#   2. 步后投影：以H为度量把 q 投影到 phi(q)=0，再把 dq 投影到 G dq=0
+#      dx = H^-1 G^T (G H^-1 G^T)^-1 r，复用本步H的分解
+# ----------------------------------------
+import numpy as np
+from scipy.linalg import cho_factor, cho_solve
+from scipy.linalg.lapack import dpotrf, dpotrs
+
+
+# 原地Cholesky分解(下三角)，a须为Fortran顺序的float64数组
+def _factor_in_place(a):
+    _, info = dpotrf(a, lower=1, clean=0, overwrite_a=1)
+    if info != 0:
+        raise np.linalg.LinAlgError('matrix is not positive definite (potrf info %d)' % info)
+
+
+# 原地回代，b须为Fortran顺序的float64数组
+def _solve_in_place(fac, b):
+    _, info = dpotrs(fac, b, lower=1, overwrite_b=1)
+    if info != 0:
+        raise ValueError('potrs info %d' % info)
+
+
+class ContactWorkspace:
+    def __init__(self, n, m):
+        self.n = n                                  # 广义坐标维数
+        self.m = m                                  # 约束维数
+        self.h_fac = np.empty((n, n), order='F')    # H的Cholesky分解，投影时复用
+        self.rhs = np.empty((n, m + 1), order='F')  # [G^T, C] --> [H^-1 G^T, H^-1 C]，一次回代
+        self.schur = np.empty((m, m), order='F')
+        self.schur_rhs = np.empty(m)
+
+
+class ContactSolver:
+    def __init__(self):
+        self.cache = {}
+
+    def workspace(self, key, n, m):
+        ws = self.cache.get(key)
+        if ws is None or ws.n != n or ws.m != m:
+            ws = ContactWorkspace(n, m)
+            self.cache[key] = ws
+        return ws
+
+    # 返回 qdd, fc
+    def solve(self, H, C, G, gamma, key=None):
+        n, m = H.shape[0], G.shape[0]
+        ws = self.workspace(key, n, m)
+        ws.h_fac[...] = H
+        _factor_in_place(ws.h_fac)
+        ws.rhs[:, 0:m] = G.T
+        ws.rhs[:, m] = np.ravel(C)
+        _solve_in_place(ws.h_fac, ws.rhs)
+        hinv_gt, hinv_c = ws.rhs[:, 0:m], ws.rhs[:, m]
+        np.dot(G, hinv_gt, out=ws.schur.T)          # S对称，写入转置视图(C顺序)即可
+        np.dot(G, hinv_c, out=ws.schur_rhs)
+        ws.schur_rhs += np.ravel(gamma)
+        np.negative(ws.schur_rhs, out=ws.schur_rhs)
+        _factor_in_place(ws.schur)
+        _solve_in_place(ws.schur, ws.schur_rhs)
+        fc = ws.schur_rhs.copy()
+        qdd = -hinv_c - np.dot(hinv_gt, fc)
+        return qdd, fc
+
+    # 批量求解：H (N, n, n), C (N, n), G (N, m, n), gamma (N, m)，返回 qdd (N, n), fc (N, m)
+    # 步骤同solve，分解用numpy的堆叠求解(每个状态一次LU)，不使用workspace
+    @staticmethod
+    def solve_batch(H, C, G, gamma):
+        m = G.shape[1]
+        rhs = np.concatenate((np.swapaxes(G, 1, 2), C[:, :, None]), axis=2)
+        sol = np.linalg.solve(H, rhs)
+        hinv_gt, hinv_c = sol[:, :, 0:m], sol[:, :, m]
+        schur = np.matmul(G, hinv_gt)
+        schur_rhs = -(np.einsum('nkq,nq->nk', G, hinv_c) + gamma)
+        fc = np.linalg.solve(schur, schur_rhs[:, :, None])[:, :, 0]
+        qdd = -hinv_c - np.einsum('nqk,nk->nq', hinv_gt, fc)
+        return qdd, fc
+
+    # 以H为度量的最小修正：H^-1 G^T (G H^-1 G^T)^-1 r
+    def correction(self, G, r, key=None):
+        ws = self.cache[key]
+        hinv_gt = np.asfortranarray(G.T, dtype=np.float64).copy(order='F')
+        _solve_in_place(ws.h_fac, hinv_gt)
+        return hinv_gt.dot(cho_solve(cho_factor(G.dot(hinv_gt), check_finite=False), r, check_finite=False))
+
+    # 步后投影，constraint(q) --> phi, G
+    def project(self, q, dq, constraint, key=None, tol=1e-10, max_iter=3):
+        for _ in range(max_iter):
+            phi, G = constraint(q)
+            if np.abs(phi).max() < tol:
+                break
+            q = q - self.correction(G, phi, key)
+        else:
+            phi, G = constraint(q)
+        dq = dq - self.correction(G, G.dot(dq), key)
+        return q, dq
+
+    # -----------------------------------------
+    # 单步积分
+    # system(q, dq, tau) --> H, C, G, gamma
+    # integrator:
+    #   'semi_implicit' - 先更新速度，再用新速度更新位置(辛欧拉)
+    #   'explicit'      - 显式欧拉，位置用旧速度
+    # 漂移稳定(可选)：
+    #   constraint(q) --> phi, G  约束位置误差及其雅可比
+    #   baumgarte=(alpha, beta)   没有constraint时只有速度项
+    #                             G不变时误差 e 的离散系统(半隐式欧拉)稳定的必要条件：
+    #                             0 <= alpha*dt < 1, (beta*dt)^2 < 4*(1 - alpha*dt)，超出时报错
+    #                             G随q变化很快时(关节速度*dt大)在该区域内也可能发散
+    #   project=True              步后投影，需要constraint
+    # 返回 q, dq, qdd, fc
+    # -----------------------------------------
+    def step(self, q, dq, tau, dt, system, key=None, integrator='semi_implicit',
+             constraint=None, baumgarte=None, project=False):
+        H, C, G, gamma = system(q, dq, tau)
+        if baumgarte is not None:
+            alpha, beta = baumgarte
+            a, b = alpha * dt, (beta * dt) ** 2
+            if not (0 <= a < 1 and 0 <= b < 4 * (1 - a)):
+                raise ValueError('Baumgarte gains outside the stable region: alpha*dt=%g, beta*dt=%g'
+                                 % (alpha * dt, beta * dt))
+            gamma = np.ravel(gamma) - 2 * alpha * G.dot(dq)
+            if constraint is not None:
+                gamma = gamma - beta * beta * constraint(q)[0]
+        qdd, fc = self.solve(H, C, G, gamma, key)
+        if integrator == 'semi_implicit':
+            dq = dq + qdd * dt
+            q = q + dq * dt
+        elif integrator == 'explicit':
+            q = q + dq * dt
+            dq = dq + qdd * dt
+        else:
+            raise ValueError('unknown integrator: %s' % integrator)
+        if project:
+            if constraint is None:
+                raise ValueError('projection needs a constraint function')
+            q, dq = self.project(q, dq, constraint, key)
+        return q, dq, qdd, fc
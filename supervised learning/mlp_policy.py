@@ -0,0 +1,71 @@
+# -----------------------------------------------
+# 学习得到的控制策略：小型MLP
+# 输入：[h0, vx0, vy0, des_v]  (this_x 与期望速度)
+# 输出：u = [alpha, beta, ks1, ks2]  (this_u)
+# 说明：
+#   1. 推理只用numpy，权重和中间层都预先分配好，控制时不需要深度学习库
+#   2. 训练是离线的，见policy_train.py
+# -----------------------------------------------
+import numpy as np
+
+
+class MlpPolicy:
+    # weights[k]: (n_in, n_out)   biases[k]: (n_out,)
+    # x_mean, x_std: 输入归一化参数(4,)   u_mean, u_std: 输出反归一化参数(4,)
+    def __init__(self, weights, biases, x_mean, x_std, u_mean, u_std):
+        self.weights = [np.ascontiguousarray(w, dtype=np.float64) for w in weights]
+        self.biases = [np.ascontiguousarray(b, dtype=np.float64) for b in biases]
+        self.x_mean = np.asarray(x_mean, dtype=np.float64)
+        self.x_std = np.asarray(x_std, dtype=np.float64)
+        self.u_mean = np.asarray(u_mean, dtype=np.float64)
+        self.u_std = np.asarray(u_std, dtype=np.float64)
+        # 预分配推理缓存
+        self._in = np.empty(self.weights[0].shape[0])
+        self._layer = [np.empty(w.shape[1]) for w in self.weights]
+        self._out = np.empty(self.weights[-1].shape[1])
+
+    # 单次推理，返回的数组在下次调用时会被覆盖
+    def predict(self, x, des_v):
+        buf = self._in
+        buf[0:3] = x
+        buf[3] = des_v
+        buf -= self.x_mean
+        buf /= self.x_std
+        last = len(self.weights) - 1
+        for k in range(last + 1):
+            h = self._layer[k]
+            np.dot(buf, self.weights[k], out=h)
+            h += self.biases[k]
+            if k < last:
+                np.tanh(h, out=h)
+            buf = h
+        np.multiply(buf, self.u_std, out=self._out)
+        self._out += self.u_mean
+        return self._out
+
+    # 批量推理 x:(N, 3) des_v:(N,) --> (N, 4)，主要用于离线评估
+    def predict_batch(self, x, des_v):
+        buf = np.column_stack((x, des_v))
+        buf = (buf - self.x_mean) / self.x_std
+        last = len(self.weights) - 1
+        for k in range(last + 1):
+            buf = np.dot(buf, self.weights[k]) + self.biases[k]
+            if k < last:
+                buf = np.tanh(buf)
+        return buf * self.u_std + self.u_mean
+
+    def save(self, path):
+        arrays = {'x_mean': self.x_mean, 'x_std': self.x_std,
+                  'u_mean': self.u_mean, 'u_std': self.u_std}
+        for k in range(len(self.weights)):
+            arrays['w%d' % k] = self.weights[k]
+            arrays['b%d' % k] = self.biases[k]
+        np.savez(path, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path)
+        n_layer = len([key for key in data.files if key.startswith('w')])
+        weights = [data['w%d' % k] for k in range(n_layer)]
+        biases = [data['b%d' % k] for k in range(n_layer)]
+        return cls(weights, biases, data['x_mean'], data['x_std'], data['u_mean'], data['u_std'])
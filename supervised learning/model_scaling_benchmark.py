@@ -0,0 +1,131 @@
+# -----------------------------------------------
+# 计算耗时随自由度的变化
+# 模型：bipedRobotOne.urdf、atlas.urdf(均带浮动基座)，以及不同长度的合成串联链
+# 项目：正运动学、点雅可比、质量矩阵(CRBA)、逆动力学(RNEA)、正动力学(ABA)、约束动力学求解
+# 每项分别测单次调用和批量(每个状态的平均耗时)
+# 最后在对数坐标下拟合 耗时 ~ DoF^k，k接近1说明线性增长
+# -----------------------------------------------
+import time
+import numpy as np
+
+import rbd_numpy
+import urdf_model
+from contact_dynamics import ContactSolver
+
+items = ('fk', 'jacobian', 'crba', 'rnea', 'aba', 'contact')
+n_batch = 256
+
+
+# 浮动基座 + n个转动关节的串联链，关节轴依次为x, y, z
+def synthetic_chain(n, link_len=0.3, mass=1.0):
+    model = rbd_numpy.TreeModel()
+    inertia = rbd_numpy.spatial_inertia(mass, [0., 0., -link_len / 2], np.diag([0.01, 0.01, 0.002]))
+    idx = model.add_floating_base(-1, np.zeros(3), inertia, name='base')
+    for k in range(n):
+        idx = model.add_body(idx, [0., 0., -link_len if k else 0.], 'R', np.eye(3)[k % 3], inertia,
+                             name='link%d' % k)
+    return model
+
+
+# 没有质量的body(浮动基座的虚拟body除外)给一个很小的惯量，保证H正定
+def regularise(model, eps=1e-6):
+    for i in range(model.nb):
+        if model.inertia[i][5, 5] == 0 and model.joint_type[i] == 'R' and i > 5:
+            model.inertia[i] = rbd_numpy.spatial_inertia(eps, np.zeros(3), eps * np.eye(3))
+    model._arrays = None
+    return model
+
+
+# 最后一个body原点下方0.1处的点接触
+def leaf_contact(model):
+    cs = rbd_numpy.ContactSet()
+    for axis in np.eye(3):
+        cs.add_constraint(model.nb - 1, [0., 0., -0.1], axis)
+    return cs
+
+
+def time_call(fun, repeat):
+    best = np.inf
+    for _ in range(3):
+        t0 = time.perf_counter()
+        for _ in range(repeat):
+            fun()
+        best = min(best, (time.perf_counter() - t0) / repeat)
+    return best
+
+
+def benchmark(model, cs, repeat=20, seed=0):
+    rng = np.random.default_rng(seed)
+    n = model.q_size
+    q, qd, tau = rng.normal(0, 0.3, (3, n_batch, n))
+    body, point = model.nb - 1, np.array([0., 0., -0.1])
+    solver = ContactSolver()
+
+    def contact_single():
+        H, C, G, gamma = rbd_numpy.contact_system_variables(model, q[0], qd[0], tau[0], cs)
+        solver.solve(H, C, G, gamma, 'bench')
+
+    def contact_batch():
+        H, C, G, gamma = rbd_numpy.contact_system_variables(model, q, qd, tau, cs)
+        ContactSolver.solve_batch(H, C, G, gamma)
+
+    funs = {
+        'fk': lambda x: rbd_numpy.body_to_base_coordinates(model, q[x], body, point),
+        'jacobian': lambda x: rbd_numpy.point_jacobian_bias(model, q[x], qd[x], body, point),
+        'crba': lambda x: rbd_numpy.crba(model, q[x]),
+        'rnea': lambda x: rbd_numpy.rnea(model, q[x], qd[x], tau[x]),
+        'aba': lambda x: rbd_numpy.aba(model, q[x], qd[x], tau[x]),
+    }
+    single, batch = {}, {}
+    for name, fun in funs.items():
+        single[name] = time_call(lambda: fun(0), repeat)
+        batch[name] = time_call(lambda: fun(slice(None)), 2) / n_batch
+    single['contact'] = time_call(contact_single, repeat)
+    batch['contact'] = time_call(contact_batch, 2) / n_batch
+    return single, batch
+
+
+def fit_exponent(dof, cost):
+    return np.polyfit(np.log(dof), np.log(cost), 1)[0]
+
+
+if __name__ == '__main__':
+    b_model, b_cs_left = urdf_model.biped_model_from_urdf()[0:2]
+    models = [('biped', b_model, b_cs_left),
+              ('atlas', regularise(urdf_model.load_urdf_model(urdf_model.atlas_urdf)), None)]
+    for n in (2, 4, 8, 16, 32, 64):
+        models.append(('chain%d' % n, synthetic_chain(n), None))
+
+    rows = []
+    print('%10s %5s | %s' % ('model', 'dof', ' '.join('%9s' % it for it in items)) + '   (us/call, us/state in batch)')
+    for name, model, cs in models:
+        single, batch = benchmark(model, cs if cs is not None else leaf_contact(model))
+        rows.append((name, model.q_size, single, batch))
+        print('%10s %5d | %s' % (name, model.q_size, ' '.join('%9.1f' % (single[it] * 1e6) for it in items)))
+        print('%10s %5s | %s' % ('', 'batch', ' '.join('%9.1f' % (batch[it] * 1e6) for it in items)))
+
+    chains = [r for r in rows if r[0].startswith('chain')]
+    dof = np.array([r[1] for r in chains])
+    print('\nscaling exponent k (cost ~ dof^k) over synthetic chains:')
+    for it in items:
+        k_single = fit_exponent(dof, [r[2][it] for r in chains])
+        k_batch = fit_exponent(dof, [r[3][it] for r in chains])
+        print('  %-9s single %.2f   batch %.2f' % (it, k_single, k_batch))
+
+    import matplotlib.pyplot as plt
+    fig, axes = plt.subplots(1, 2, figsize=(11, 4.5))
+    for ax, k, title in ((axes[0], 2, 'single call'), (axes[1], 3, 'batch (per state)')):
+        for it in items:
+            cost = np.array([r[k][it] for r in chains]) * 1e6
+            if np.isfinite(cost).all():
+                ax.loglog(dof, cost, 'o-', label=it)
+        for name, n, single, batch in rows[:2]:
+            cost = (single if k == 2 else batch)['crba'] * 1e6
+            ax.loglog(n, cost, 'k*', ms=10)
+            ax.annotate(name, (n, cost))
+        ax.set_xlabel('DoF')
+        ax.set_ylabel('time / us')
+        ax.set_title(title)
+        ax.grid(True, which='both')
+        ax.legend()
+    plt.show()
@@ -1,10 +1,40 @@
 # 贝塞尔曲线的实现，将作为本次实验的轨迹表达方式
 # 当然，当你发现原来就有轮子的时候，你的心情是不那么好的，NURBS-python
 # pip install NURBS-Python 即可安装对应的库
+from functools import lru_cache
 import numpy as np
 import scipy.special as sp
 
 
+# m阶Bernstein基转幂基的系数矩阵，每个阶数只计算一次
+#   B_k,m(s) = C(m,k) s^k (1-s)^(m-k) = sum_i M[i, k] s^i
+#   M[i, k] = C(m, k) C(m-k, i-k) (-1)^(i-k),  i >= k
+@lru_cache(maxsize=None)
+def power_basis_matrix(m):
+    M = np.zeros((m + 1, m + 1))
+    for k in range(m + 1):
+        for i in range(k, m + 1):
+            M[i, k] = sp.comb(m, k) * sp.comb(m - k, i - k) * (-1) ** (i - k)
+    M.setflags(write=False)
+    return M
+
+
+# d阶导数的控制点：m!/(m-d)! * d阶差分
+def derivative_control_points(coeff, d):
+    m = coeff.shape[-1] - 1
+    if d > m:
+        return np.zeros(coeff.shape[:-1] + (1,))
+    return np.diff(coeff, n=d, axis=-1) * (sp.factorial(m) / sp.factorial(m - d))
+
+
+# 所有曲线、所有采样点一次计算：(n, m+1) x (m+1, m+1) x (m+1, len(s))
+def bezier_eval(coeff, s, d=0):
+    cp = derivative_control_points(np.asarray(coeff, dtype=np.float64), d)
+    deg = cp.shape[-1] - 1
+    power_coeff = cp.dot(power_basis_matrix(deg).T)
+    return power_coeff.dot(np.vander(s, deg + 1, increasing=True).T)
+
+
 # m---贝塞尔曲线的阶数，控制点系数数量为阶数+1
 # n---曲线的数量
 # 一维贝塞尔曲线
@@ -29,48 +59,11 @@ class BezierD1:
             print("Error: wrong size of coefficient")
             return False
 
-    # 输入s为[0~1]范围中的
+    # 输入s为[0~1]范围中的，diff为任意阶导数
     def value(self, s, diff=0):
         # check input
         if s.max()> 1 or s.min()<0 or len(s.shape)>1:
             print("Error: input index is out of range")
             return False, np.array([])
         else:
-            val = np.zeros((self.n,len(s)))
-            for i in range(self.n):
-                if diff == 0:                            # 原函数值
-                    for k in range(self.m + 1):
-                        thisCoef = self.coeff[i, k] * sp.comb(self.m, k)
-                        val[i, :] += thisCoef * np.power(s, k) * np.power(1 - s, self.m - k)
-                if diff == 1:                            # 一阶导数
-                    for k in range(self.m):
-                        thisCoef = (self.coeff[i, k+1] - self.coeff[i, k]) * sp.comb(self.m-1, k) * self.m
-                        val[i, :] += thisCoef * np.power(s, k) * np.power(1 - s, self.m - k-1)
-                if diff == 2:                            # 二阶导数（这个计算方法不好）
-                    for k in range(self.m+1):
-                        thisCoef = self.coeff[i, k]*sp.comb(self.m, k)
-                        if k == 0:
-                            val[i, :] += thisCoef * self.m*(self.m-1)*np.power((1-s), (self.m-2))
-                        elif k == 1:
-                            val[i, :] += thisCoef * (-2*(self.m-1)*np.power((1-s), (self.m-2))
-                                                     + (self.m-1)*(self.m-2)*s*np.power((1-s), (self.m-3)))
-                        elif k == self.m-1:
-                            val[i, :] += thisCoef * ((self.m-1)*(self.m-2)*np.power(s, (self.m-3))
-                                                     - self.m*(self.m-1) * np.power(s, (self.m-2)))
-                        elif k == self.m:
-                            val[i, :] += thisCoef * k*(k-1)*np.power(s,(k-2))
-                        else:
-                            val[i, :] += thisCoef * (k*(k-1)*np.power(s, (k-2))*np.power((1-s),(self.m-k))
-                                                     - 2*(self.m-k)*k*np.power(s,(k-1))*np.power((1-s),(self.m-k-1))
-                                                     + (self.m-k)*(self.m-k-1)*np.power(s,k)*np.power((1-s), (self.m-k-2)))
-            return True, val
-
-
-
-
-
-
-
-
-
-
+            return True, bezier_eval(self.coeff, s, diff)
@@ -2,7 +2,7 @@
 # 《High-Speed Humanoid Running Through Control with a 3D-SLIP Model》
 
 from .. import slip3D_ex
-import pandas as pd
+from ..tools.pair_table import load_pair_table
 import numpy as np
 
 
@@ -41,7 +41,7 @@ def control_jac_calculation(pair):
 
 # 生成控制矩阵字典
 def control_jac_dic_generate():
-    m_table = pd.read_csv('./data/stable_pair.csv', header=None).values
+    m_table = load_pair_table('./data/stable_pair.csv').rows
     table_len = m_table.shape[0]
     dic = {}               # 用速度来索引控制对
     for i in range(table_len):
@@ -56,14 +56,13 @@ def control_jac_dic_generate():
 # 状态： [h0, vx0, vy0]
 def control_para_calculation(des_vel, x_now, dic):
     # 1.检查给定的期望速度值是否在范围内
-    m_table = pd.read_csv('./data/stable_pair.csv', header=None).values
-    vel_list = m_table[:, 1]
-    if des_vel > vel_list.max() or des_vel < vel_list.min():
+    m_table = load_pair_table('./data/stable_pair.csv')
+    if not m_table.in_range(des_vel):
         print("Error, input wrong velocity!")
         return
     # 2.规范化期望速度并找到对应的pair
-    m_idx = np.fabs(vel_list - des_vel).argmin()
-    m_pair = m_table[m_idx]
+    m_idx = m_table.nearest(des_vel)
+    m_pair = m_table.pair(m_idx)
 
     # 3.计算在该pair下的delta量
     delta_x = x_now - m_pair[0: 3]         # 计算当前状态对稳态的delta x
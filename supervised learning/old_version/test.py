@@ -1,5 +1,4 @@
 import numpy as np
-from scipy import integrate
 import matplotlib.pyplot as plt
 from PIDdis import DisPid
 from linebezier import BezierD1
@@ -27,17 +26,20 @@ def mass_point_control_test():
     y_out = np.zeros((2, step_cnt))       # 输出数据
     t = np.zeros(step_cnt)
 
+    # 质点是线性系统，力在周期内保持不变，零阶保持下精确离散化，不再每周期重启odeint
+    # x(k+1) = Ad x(k) + Bd f
+    a_d = np.array([[1, t_cycle], [0, 1]])
+    b_d = np.array([0.5 * t_cycle * t_cycle / mass, t_cycle / mass])
+
     for i in range(0, step_cnt-1):
         t[i] = t_cycle * i
-        ts = [0, t_cycle]
         ref = np.sin(t[i])                # 期望位置，正弦曲线
         err = ref - y0[0]
         pid1.update(err)
         f = pid1.out                      # 本周期PID控制量计算
-        tmp = integrate.odeint(fun_mass_point, y0, ts, args=(f, mass))
-        y_out[0, i+1] = tmp[-1][0]        # 记录数据
-        y_out[1, i+1] = tmp[-1][1]
-        y0 = [tmp[-1][0], tmp[-1][1]]     # 新的初始化
+        y0 = a_d.dot(y0) + b_d * f
+        y_out[0, i+1] = y0[0]             # 记录数据
+        y_out[1, i+1] = y0[1]
     # 绘图
     plt.figure()
     plt.plot(t[0:-1], y_out[0][0:-1], 'b-', linewidth=2, label='real position')
@@ -0,0 +1,252 @@
+# -----------------------------------------------
+# PID参数自动整定
+# 1. 候选参数 (Kp, Ki, Kd)：网格，或者围绕当前Pareto前沿的自适应采样
+# 2. 每组参数做一次完整的闭环仿真，评分：IAE, ISE, 超调量, 调节时间
+# 3. 多进程并行评估，每个进程内用PidBank把一批参数一起仿真
+# 4. 评分结果按(实验, 参数)缓存(可保存到文件)，重复的参数不再仿真
+#    实验 = 被控对象类型及参数 + 仿真设置(含控制器限幅)，换实验不会读到旧的评分
+# 5. 输出Pareto前沿
+# -----------------------------------------------
+import os
+import json
+import pickle
+import hashlib
+import multiprocessing as mp
+import numpy as np
+
+from PIDdis import PidBank
+
+score_dtype = np.dtype([('kp', 'f8'), ('ki', 'f8'), ('kd', 'f8'),
+                        ('iae', 'f8'), ('ise', 'f8'), ('overshoot', 'f8'), ('settling_time', 'f8')])
+score_fields = ('iae', 'ise', 'overshoot', 'settling_time')
+cache_version = 2
+
+# 与DisPid(old_version/test.py::mass_point_control_test)相同的限幅：
+# 输出只有上限10，误差积分只有上限20，只在err > 10时积分分离，没有条件积分
+dispid_limits = {'max_u': 10.0, 'min_u': -np.inf, 'integrator_windup': 20.0, 'integrator_min': -np.inf,
+                 'int_err_max': 10.0, 'one_sided_separation': True, 'anti_windup': False}
+
+
+# ------------------------------------------------
+#              被控对象(批量)
+# state: (M, k)，u: (M,)
+# ------------------------------------------------
+# 一个方向上的质量点与驱动力，状态：x, v (零阶保持下精确离散)
+class MassPointPlant:
+    def __init__(self, mass=1.0):
+        self.mass = mass
+
+    def initial_state(self, m):
+        return np.zeros((m, 2))
+
+    def step(self, x, u, dt):
+        acc = u / self.mass
+        pos = x[:, 0] + x[:, 1] * dt + 0.5 * acc * dt * dt
+        vel = x[:, 1] + acc * dt
+        return np.column_stack((pos, vel))
+
+    def output(self, x):
+        return x[:, 0]
+
+
+# 一阶惯性环节 K/(tau*s + 1) (零阶保持下精确离散)
+class FirstOrderPlant:
+    def __init__(self, gain=1.0, tau=1.0):
+        self.gain = gain
+        self.tau = tau
+
+    def initial_state(self, m):
+        return np.zeros((m, 1))
+
+    def step(self, x, u, dt):
+        a = np.exp(-dt / self.tau)
+        return a * x + (1 - a) * self.gain * u[:, None]
+
+    def output(self, x):
+        return x[:, 0]
+
+
+# ------------------------------------------------
+#              闭环仿真与评分
+# ------------------------------------------------
+# gains: (M, 3)，返回输出 y: (n+1, M)
+# pid_kwargs: PidBank的限幅设置，例如dispid_limits；None时为PidBank默认(输出±10，条件积分)
+def simulate_closed_loop(plant, gains, t_end=8.0, dt=0.01, ref=1.0, pid_kwargs=None):
+    gains = np.atleast_2d(gains)
+    m = gains.shape[0]
+    pid = PidBank(m, gains[:, 0], gains[:, 1], gains[:, 2], gap=dt, **(pid_kwargs or {}))
+    x = plant.initial_state(m)
+    n = int(round(t_end / dt))
+    y = np.empty((n + 1, m))
+    y[0] = plant.output(x)
+    for k in range(n):
+        u = pid.update(ref - y[k])
+        x = plant.step(x, u, dt)
+        y[k + 1] = plant.output(x)
+    return y
+
+
+# 阶跃响应评分，band为调节时间的误差带(相对参考值)
+def score_response(y, ref, dt, band=0.02):
+    err = ref - y
+    iae = np.fabs(err).sum(axis=0) * dt
+    ise = (err * err).sum(axis=0) * dt
+    overshoot = np.maximum((y - ref).max(axis=0) / abs(ref), 0.0)
+    outside = np.fabs(err) > band * abs(ref)
+    # 最后一次在误差带之外的时刻
+    last_out = outside.shape[0] - 1 - np.argmax(outside[::-1], axis=0)
+    settling_time = np.where(outside.any(axis=0), (last_out + 1) * dt, 0.0)
+    settling_time[outside[-1]] = np.inf                 # 仿真结束仍未进入误差带
+    bad = ~np.isfinite(y).all(axis=0)                    # 发散
+    for item in (iae, ise, overshoot, settling_time):
+        item[bad] = np.inf
+    return iae, ise, overshoot, settling_time
+
+
+def evaluate_gains(plant, gains, sim_kwargs=None):
+    sim_kwargs = dict(sim_kwargs or {})
+    dt = sim_kwargs.get('dt', 0.01)
+    ref = sim_kwargs.get('ref', 1.0)
+    with np.errstate(over='ignore', invalid='ignore'):
+        y = simulate_closed_loop(plant, gains, **sim_kwargs)
+        return score_response(y, ref, dt)
+
+
+def _evaluate_chunk(args):
+    plant, gains, sim_kwargs = args
+    return gains, evaluate_gains(plant, gains, sim_kwargs)
+
+
+# ------------------------------------------------
+#              候选参数
+# ------------------------------------------------
+# 每个范围为 (low, high, n)，log=True时按对数均匀取值
+def grid_candidates(kp_range, ki_range, kd_range, log=False):
+    space = np.geomspace if log else np.linspace
+    axes = [space(lo, hi, n) for lo, hi, n in (kp_range, ki_range, kd_range)]
+    mesh = np.meshgrid(*axes, indexing='ij')
+    return np.column_stack([a.ravel() for a in mesh])
+
+
+# 非支配解(全部目标均为越小越好)
+def pareto_front(scores, fields=score_fields):
+    obj = np.column_stack([scores[f] for f in fields])
+    keep = np.isfinite(obj).all(axis=1)
+    idx = np.flatnonzero(keep)
+    obj = obj[idx]
+    dominated = np.zeros(len(idx), dtype=bool)
+    for k in range(len(idx)):
+        better_eq = (obj <= obj[k]).all(axis=1)
+        strictly = (obj < obj[k]).any(axis=1)
+        dominated[k] = (better_eq & strictly).any()
+    return scores[idx[~dominated]]
+
+
+def _json_default(o):
+    if isinstance(o, (np.generic, np.ndarray)):
+        return np.asarray(o).tolist()
+    raise TypeError('%s is not JSON serialisable' % type(o).__name__)
+
+
+# 实验的稳定哈希：被控对象类型及参数，排序后的仿真设置
+def experiment_key(plant, sim_kwargs):
+    desc = {'plant': '%s.%s' % (type(plant).__module__, type(plant).__qualname__),
+            'params': vars(plant), 'sim': sim_kwargs}
+    text = json.dumps(desc, sort_keys=True, default=_json_default)
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()[:16]
+
+
+# ------------------------------------------------
+#              整定器
+# ------------------------------------------------
+class PidAutotuner:
+    # sim_kwargs: simulate_closed_loop的参数(t_end, dt, ref, pid_kwargs)
+    # cache_path: 评分缓存文件，None时只在内存中缓存；版本不同的缓存文件被忽略
+    def __init__(self, plant, sim_kwargs=None, processes=None, chunk=256, cache_path=None):
+        self.plant = plant
+        self.sim_kwargs = sim_kwargs or {}
+        self.experiment = experiment_key(plant, self.sim_kwargs)
+        self.processes = processes or os.cpu_count()
+        self.chunk = chunk
+        self.cache_path = cache_path
+        self.cache = {}
+        if cache_path is not None and os.path.exists(cache_path):
+            with open(cache_path, 'rb') as f:
+                stored = pickle.load(f)
+            if isinstance(stored, dict) and stored.get('version') == cache_version:
+                self.cache = stored['scores']
+
+    def _key(self, g):
+        return (self.experiment,) + tuple(np.round(g, 9).tolist())
+
+    # 评估候选参数，返回结构化数组(score_dtype)
+    def evaluate(self, gains):
+        gains = np.atleast_2d(np.asarray(gains, dtype=np.float64))
+        todo = [g for g in np.unique(gains, axis=0) if self._key(g) not in self.cache]
+        if todo:
+            todo = np.array(todo)
+            jobs = [(self.plant, todo[k:k+self.chunk], self.sim_kwargs)
+                    for k in range(0, len(todo), self.chunk)]
+            if self.processes > 1 and len(jobs) > 1:
+                with mp.get_context('spawn').Pool(min(self.processes, len(jobs))) as pool:
+                    results = pool.map(_evaluate_chunk, jobs)
+            else:
+                results = [_evaluate_chunk(job) for job in jobs]
+            for chunk_gains, chunk_scores in results:
+                for k in range(len(chunk_gains)):
+                    self.cache[self._key(chunk_gains[k])] = tuple(s[k] for s in chunk_scores)
+            self.save_cache()
+        out = np.empty(len(gains), dtype=score_dtype)
+        for k in range(len(gains)):
+            out[k] = tuple(gains[k]) + self.cache[self._key(gains[k])]
+        return out
+
+    def save_cache(self):
+        if self.cache_path is not None:
+            with open(self.cache_path, 'wb') as f:
+                pickle.dump({'version': cache_version, 'scores': self.cache}, f)
+
+    # 网格搜索
+    def grid_search(self, kp_range, ki_range, kd_range, log=False):
+        scores = self.evaluate(grid_candidates(kp_range, ki_range, kd_range, log))
+        return scores, pareto_front(scores)
+
+    # 自适应采样：初始在对数空间均匀随机采样，之后在Pareto前沿附近扰动，扰动幅度逐步减小
+    # bounds: [(kp_lo, kp_hi), (ki_lo, ki_hi), (kd_lo, kd_hi)]，下限需大于0
+    def adaptive_search(self, bounds, n_init=512, n_iter=6, n_batch=256, sigma=0.5, seed=0):
+        rng = np.random.default_rng(seed)
+        lo = np.log([b[0] for b in bounds])
+        hi = np.log([b[1] for b in bounds])
+        samples = np.exp(rng.uniform(lo, hi, (n_init, 3)))
+        scores = self.evaluate(samples)
+        for it in range(n_iter):
+            front = pareto_front(scores)
+            if len(front) == 0:
+                break
+            centers = np.log(np.column_stack((front['kp'], front['ki'], front['kd'])))
+            pick = centers[rng.integers(0, len(centers), n_batch)]
+            new = np.clip(pick + rng.normal(0, sigma * 0.6 ** it, pick.shape), lo, hi)
+            scores = np.concatenate((scores, self.evaluate(np.exp(new))))
+        return scores, pareto_front(scores)
+
+
+def print_front(front, max_rows=20):
+    order = np.argsort(front['iae'])
+    print('%10s %10s %10s %10s %10s %10s %10s' % ('Kp', 'Ki', 'Kd', 'IAE', 'ISE', 'overshoot', 'settle'))
+    for row in front[order][:max_rows]:
+        print('%10.4g %10.4g %10.4g %10.4g %10.4g %10.4g %10.4g' % tuple(row))
+
+
+if __name__ == '__main__':
+    # 质量点位置控制(参考old_version/test.py::mass_point_control_test，限幅与DisPid相同)
+    tuner = PidAutotuner(MassPointPlant(1.0),
+                         sim_kwargs={'t_end': 8.0, 'dt': 0.01, 'ref': 1.0, 'pid_kwargs': dispid_limits},
+                         cache_path='./data/pid_autotune_cache.pkl')
+    print('hand tuned (20, 1, 9):')
+    print_front(tuner.evaluate([[20, 1, 9]]))
+    all_scores, m_front = tuner.grid_search((1, 100, 12), (0.1, 10, 8), (0.5, 20, 10), log=True)
+    print('grid: %d candidates, %d on the Pareto front' % (len(all_scores), len(m_front)))
+    print_front(m_front)
+    all_scores, m_front = tuner.adaptive_search([(1, 100), (0.1, 10), (0.5, 20)])
+    print('adaptive: %d candidates, %d on the Pareto front' % (len(all_scores), len(m_front)))
+    print_front(m_front)
@@ -0,0 +1,41 @@
+# -----------------------------------------------
+# MLP策略与查表控制器的对比测试
+# 1. 单次推理耗时
+# 2. 与查表+雅可比控制量的误差
+# 前提：先运行policy_train.py得到 ./data/mlp_policy.npz
+# -----------------------------------------------
+import time
+import numpy as np
+
+from mlp_policy import MlpPolicy
+from policy_train import load_table_and_jac, sample_dataset, table_control, policy_path
+
+
+def time_per_call(fun, args_list, repeat=5):
+    best = np.inf
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for args in args_list:
+            fun(*args)
+        best = min(best, (time.perf_counter() - t0) / len(args_list))
+    return best
+
+
+if __name__ == '__main__':
+    table, jacs = load_table_and_jac()
+    policy = MlpPolicy.load(policy_path)
+    x, y = sample_dataset(table, jacs, 2000, np.random.default_rng(1))
+    samples = [(x[k, 0:3], x[k, 3]) for k in range(x.shape[0])]
+
+    t_mlp = time_per_call(policy.predict, samples)
+    t_table = time_per_call(lambda xs, v: table_control(table, jacs, xs, v), samples)
+    print('inference latency  mlp: %.2f us   table: %.2f us' % (t_mlp * 1e6, t_table * 1e6))
+
+    u_mlp = np.array([policy.predict(*args).copy() for args in samples])
+    err = u_mlp - y
+    rmse = np.sqrt((err * err).mean(axis=0))
+    rel = rmse / np.fabs(y).mean(axis=0)
+    print('control error vs table controller [alpha, beta, ks1, ks2]')
+    print('  rmse     :', rmse)
+    print('  max abs  :', np.fabs(err).max(axis=0))
+    print('  relative :', rel)
@@ -0,0 +1,114 @@
+# -----------------------------------------------
+# 离线训练MLP控制策略
+# 1. 用查表+雅可比控制器(BipedController原有方法)生成样本
+# 2. numpy实现的Adam训练，不依赖深度学习库
+# 3. 结果保存为 ./data/mlp_policy.npz，由BipedController.set_policy载入
+# -----------------------------------------------
+import os
+import hashlib
+import numpy as np
+
+import slip3D_ex
+from mlp_policy import MlpPolicy
+from tools.pair_table import load_pair_table
+
+b_para = [20.0, -9.8, 1.0]                 # [m, g, l0]，与BipedController一致
+jac_path = './data/control_jac'            # 雅可比缓存前缀，文件名后接表格内容的hash
+policy_path = './data/mlp_policy.npz'
+# 顶点状态扰动范围 [h0, vx0, vy0]
+x_noise = np.array([0.05, 0.3, 0.2])
+
+
+# 雅可比缓存文件名，含表格内容和b_para的hash，表格改动后不会读到旧的雅可比
+def jac_cache_path(table):
+    digest = hashlib.sha1(np.ascontiguousarray(table, dtype=np.float64).tobytes())
+    digest.update(repr(b_para).encode('utf-8'))
+    return '%s_%s.npy' % (jac_path, digest.hexdigest()[:16])
+
+
+# 读取表格并计算(或读取缓存的)控制雅可比矩阵 (N, 3, 3)
+def load_table_and_jac(pair_path='./data/stable_pair.csv'):
+    table = load_pair_table(pair_path).rows
+    cache_path = jac_cache_path(table)
+    if os.path.exists(cache_path):
+        return table, np.load(cache_path)
+    jacs = np.array([slip3D_ex.control_jac_calculation(pair, b_para) for pair in table])
+    np.save(cache_path, jacs)
+    return table, jacs
+
+
+# 查表+雅可比控制器，返回 this_u
+def table_control(table, jacs, x_now, des_v):
+    idx = np.fabs(table[:, 1] - des_v).argmin()
+    u, _ = slip3D_ex.control_u_calculation(table[idx], jacs[idx], x_now)
+    return u
+
+
+# 随机生成样本 X:(n, 4) = [h0, vx0, vy0, des_v]  Y:(n, 4) = this_u
+def sample_dataset(table, jacs, n, rng):
+    vel = table[:, 1]
+    des_v = rng.uniform(vel.min(), vel.max(), n)
+    idx = np.fabs(vel[None, :] - des_v[:, None]).argmin(axis=1)
+    x = table[idx, 0:3] + rng.uniform(-1, 1, (n, 3)) * x_noise
+    y = np.array([table_control(table, jacs, x[k], des_v[k]) for k in range(n)])
+    return np.column_stack((x, des_v)), y
+
+
+# -----------------------------------------
+# 训练：tanh隐层，线性输出，MSE损失，Adam优化
+# -----------------------------------------
+def train_mlp(x, y, hidden=(32, 32), epochs=400, batch=256, lr=1e-3, seed=0):
+    rng = np.random.default_rng(seed)
+    x_mean, x_std = x.mean(axis=0), x.std(axis=0) + 1e-9
+    u_mean, u_std = y.mean(axis=0), y.std(axis=0) + 1e-9
+    xn = (x - x_mean) / x_std
+    yn = (y - u_mean) / u_std
+    sizes = [x.shape[1]] + list(hidden) + [y.shape[1]]
+    ws = [rng.normal(0, np.sqrt(1.0 / sizes[k]), (sizes[k], sizes[k+1])) for k in range(len(sizes)-1)]
+    bs = [np.zeros(sizes[k+1]) for k in range(len(sizes)-1)]
+    params = ws + bs
+    m_t = [np.zeros_like(a) for a in params]
+    v_t = [np.zeros_like(a) for a in params]
+    beta1, beta2, eps = 0.9, 0.999, 1e-8
+    step = 0
+    n = x.shape[0]
+    for epoch in range(epochs):
+        order = rng.permutation(n)
+        for b0 in range(0, n, batch):
+            sel = order[b0:b0+batch]
+            # 前向
+            acts = [xn[sel]]
+            for k in range(len(ws)):
+                z = np.dot(acts[-1], ws[k]) + bs[k]
+                acts.append(np.tanh(z) if k < len(ws) - 1 else z)
+            # 反向
+            delta = 2 * (acts[-1] - yn[sel]) / sel.size
+            g_w, g_b = [None] * len(ws), [None] * len(ws)
+            for k in range(len(ws) - 1, -1, -1):
+                g_w[k] = np.dot(acts[k].T, delta)
+                g_b[k] = delta.sum(axis=0)
+                if k:
+                    delta = np.dot(delta, ws[k].T) * (1 - acts[k] * acts[k])
+            # Adam更新
+            step += 1
+            for a, g, m_a, v_a in zip(params, g_w + g_b, m_t, v_t):
+                m_a *= beta1
+                m_a += (1 - beta1) * g
+                v_a *= beta2
+                v_a += (1 - beta2) * g * g
+                m_hat = m_a / (1 - beta1 ** step)
+                v_hat = v_a / (1 - beta2 ** step)
+                a -= lr * m_hat / (np.sqrt(v_hat) + eps)
+    return MlpPolicy(ws, bs, x_mean, x_std, u_mean, u_std)
+
+
+if __name__ == '__main__':
+    m_table, m_jacs = load_table_and_jac()
+    m_rng = np.random.default_rng(2018)
+    x_train, y_train = sample_dataset(m_table, m_jacs, 20000, m_rng)
+    policy = train_mlp(x_train, y_train)
+    x_test, y_test = sample_dataset(m_table, m_jacs, 2000, m_rng)
+    err = policy.predict_batch(x_test[:, 0:3], x_test[:, 3]) - y_test
+    print('test rmse [alpha, beta, ks1, ks2]:', np.sqrt((err * err).mean(axis=0)))
+    policy.save(policy_path)
+    print('policy saved to', policy_path)
@@ -0,0 +1,511 @@
+# ----------------------------------------
+# 文件描述：纯numpy的刚体树动力学，替代修改过的rbdl-python
+# 算法参考Featherstone《Rigid Body Dynamics Algorithms》：
+#   RNEA - 逆动力学    CRBA - 质量矩阵    ABA - 正动力学
+# 约定：
+#   1. 空间向量 [角速度; 线速度]，空间变换 X = [[E, 0], [-E r×, E]]，与rbdl一致
+#   2. 每个关节一个自由度(转动'R'/移动'P'，任意轴)，
+#      浮动基座按rbdl的 Joint.fromJointAxes(diag(1,1,1,1,1,1)) 展开为
+#      rx, ry, rz, tx, ty, tz 六个关节和五个无质量的虚拟body
+#   3. 所有函数都支持批量：q 为 (nq,) 或 (N, nq)
+# ----------------------------------------
+import numpy as np
+
+
+# ------------------------------------------------
+#                  空间代数(批量)
+# ------------------------------------------------
+def skew(v):
+    v = np.asarray(v, dtype=np.float64)
+    out = np.zeros(v.shape[:-1] + (3, 3))
+    out[..., 0, 1], out[..., 0, 2] = -v[..., 2], v[..., 1]
+    out[..., 1, 0], out[..., 1, 2] = v[..., 2], -v[..., 0]
+    out[..., 2, 0], out[..., 2, 1] = -v[..., 1], v[..., 0]
+    return out
+
+
+# 坐标变换矩阵 E (rbdl的Xrot)：绕axis转动q后，父坐标系到子坐标系的坐标变换
+def axis_rotation(axis, q):
+    q = np.asarray(q, dtype=np.float64)
+    k = skew(axis)
+    s, c = np.sin(q)[..., None, None], np.cos(q)[..., None, None]
+    return np.eye(3) - s * k + (1 - c) * np.dot(k, k)
+
+
+# 由 E, r 构造空间变换 X = [[E, 0], [-E r×, E]]
+def spatial_transform(E, r):
+    E = np.asarray(E, dtype=np.float64)
+    r = np.asarray(r, dtype=np.float64)
+    shape = np.broadcast_shapes(E.shape[:-2], r.shape[:-1])
+    X = np.zeros(shape + (6, 6))
+    X[..., 0:3, 0:3] = E
+    X[..., 3:6, 3:6] = E
+    X[..., 3:6, 0:3] = -np.matmul(E, skew(r))
+    return X
+
+
+# 由质量、质心和质心处惯量构造空间惯量(同rbdl Body.fromMassComInertia)
+def spatial_inertia(mass, com, inertia_com):
+    c = skew(com)
+    out = np.zeros((6, 6))
+    out[0:3, 0:3] = np.asarray(inertia_com) + mass * np.dot(c, c.T)
+    out[0:3, 3:6] = mass * c
+    out[3:6, 0:3] = mass * c.T
+    out[3:6, 3:6] = mass * np.eye(3)
+    return out
+
+
+# 运动向量叉乘 v×m
+def cross_motion(v, m):
+    w, vl = v[..., 0:3], v[..., 3:6]
+    out = np.empty(np.broadcast_shapes(v.shape, m.shape))
+    out[..., 0:3] = np.cross(w, m[..., 0:3])
+    out[..., 3:6] = np.cross(w, m[..., 3:6]) + np.cross(vl, m[..., 0:3])
+    return out
+
+
+# 力向量叉乘 v×*f
+def cross_force(v, f):
+    w, vl = v[..., 0:3], v[..., 3:6]
+    out = np.empty(np.broadcast_shapes(v.shape, f.shape))
+    out[..., 0:3] = np.cross(w, f[..., 0:3]) + np.cross(vl, f[..., 3:6])
+    out[..., 3:6] = np.cross(w, f[..., 3:6])
+    return out
+
+
+def _mv(A, x):
+    return np.einsum('...ij,...j->...i', A, x)
+
+
+def _mtv(A, x):
+    return np.einsum('...ji,...j->...i', A, x)
+
+
+# ------------------------------------------------
+#                  模型
+# ------------------------------------------------
+class TreeModel:
+    def __init__(self, gravity=(0.0, 0.0, -9.81)):
+        self.gravity = np.array(gravity, dtype=np.float64)
+        self.parent = []                # 父body序号，-1为基座
+        self.joint_type = []            # 'R' / 'P'
+        self.joint_axis = []            # 关节轴(关节坐标系下)
+        self.x_tree = []                # 父坐标系到关节坐标系的固定变换 (6, 6)
+        self.inertia = []               # body坐标系下的空间惯量 (6, 6)
+        self.names = []
+        self.frames = {}                # 固定在body上的坐标系：name --> (body, E, r)
+        self._arrays = None
+
+    @property
+    def nb(self):
+        return len(self.parent)
+
+    @property
+    def q_size(self):
+        return len(self.parent)
+
+    # E, r: 关节坐标系相对父坐标系的旋转(坐标变换)和位置，与rbdl.SpatialTransform相同
+    # 返回新body的序号
+    def add_body(self, parent, r, joint_type, axis, inertia, E=None, name=''):
+        if E is None:
+            E = np.eye(3)
+        axis = np.asarray(axis, dtype=np.float64)
+        self.parent.append(parent)
+        self.joint_type.append(joint_type)
+        self.joint_axis.append(axis / np.linalg.norm(axis))
+        self.x_tree.append(spatial_transform(E, r))
+        self.inertia.append(np.asarray(inertia, dtype=np.float64))
+        self.names.append(name)
+        self._arrays = None
+        return self.nb - 1
+
+    # 浮动基座：rx, ry, rz, tx, ty, tz，返回最后一个body(即机体)的序号
+    def add_floating_base(self, parent, r, inertia, name='base'):
+        zero = np.zeros((6, 6))
+        axes = np.eye(3)
+        idx = parent
+        for k in range(3):
+            idx = self.add_body(idx, r if k == 0 else np.zeros(3), 'R', axes[k], zero, name=name + '_r%d' % k)
+        for k in range(3):
+            last = k == 2
+            idx = self.add_body(idx, np.zeros(3), 'P', axes[k], inertia if last else zero,
+                                name=name if last else name + '_t%d' % k)
+        return idx
+
+    # 运动子空间 S (nb, 6)，以及数组形式的模型参数
+    def arrays(self):
+        if self._arrays is None:
+            S = np.zeros((self.nb, 6))
+            for i in range(self.nb):
+                if self.joint_type[i] == 'R':
+                    S[i, 0:3] = self.joint_axis[i]
+                else:
+                    S[i, 3:6] = self.joint_axis[i]
+            self._arrays = (S, np.array(self.x_tree), np.array(self.inertia))
+        return self._arrays
+
+    def body_id(self, name):
+        return self.names.index(name)
+
+    def add_frame(self, name, body, r, E=None):
+        self.frames[name] = (body, np.eye(3) if E is None else np.asarray(E, dtype=np.float64),
+                             np.asarray(r, dtype=np.float64))
+
+    def save(self, path):
+        frame_names = sorted(self.frames)
+        np.savez(path, gravity=self.gravity, parent=np.array(self.parent, dtype=np.int64),
+                 joint_type=np.array(self.joint_type, dtype='U1'), joint_axis=np.array(self.joint_axis),
+                 x_tree=np.array(self.x_tree), inertia=np.array(self.inertia),
+                 names=np.array(self.names, dtype=str), frame_names=np.array(frame_names, dtype=str),
+                 frame_body=np.array([self.frames[k][0] for k in frame_names], dtype=np.int64),
+                 frame_E=np.array([self.frames[k][1] for k in frame_names]).reshape(-1, 3, 3),
+                 frame_r=np.array([self.frames[k][2] for k in frame_names]).reshape(-1, 3))
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path)
+        model = cls(gravity=data['gravity'])
+        model.parent = data['parent'].tolist()
+        model.joint_type = data['joint_type'].tolist()
+        model.joint_axis = list(data['joint_axis'])
+        model.x_tree = list(data['x_tree'])
+        model.inertia = list(data['inertia'])
+        model.names = data['names'].tolist()
+        for name, body, E, r in zip(data['frame_names'], data['frame_body'], data['frame_E'], data['frame_r']):
+            model.frames[str(name)] = (int(body), E, r)
+        return model
+
+
+# 关节变换 XJ (N, 6, 6)
+def joint_transform(model, i, qi):
+    axis = model.joint_axis[i]
+    if model.joint_type[i] == 'R':
+        return spatial_transform(axis_rotation(axis, qi), np.zeros(3))
+    return spatial_transform(np.eye(3), axis * np.asarray(qi)[..., None])
+
+
+def _batch(q):
+    q = np.asarray(q, dtype=np.float64)
+    return q[None, :] if q.ndim == 1 else q, q.ndim == 1
+
+
+def _xup(model, q):
+    S, x_tree, _ = model.arrays()
+    return [np.matmul(joint_transform(model, i, q[:, i]), x_tree[i]) for i in range(model.nb)]
+
+
+# 各body到基座的变换 X_{i<-0}
+def _x_base(model, xup):
+    x0 = []
+    for i in range(model.nb):
+        lam = model.parent[i]
+        x0.append(xup[i] if lam < 0 else np.matmul(xup[i], x0[lam]))
+    return x0
+
+
+# ------------------------------------------------
+#                  动力学算法
+# ------------------------------------------------
+# 逆动力学：tau = H qdd + C
+# f_ext: 可选 {body序号: (N, 6) body坐标系下的外力}
+def rnea(model, q, qd, qdd, f_ext=None, gravity=True):
+    q, single = _batch(q)
+    qd, _ = _batch(qd)
+    qdd, _ = _batch(qdd)
+    n = q.shape[0]
+    S, _, inertia = model.arrays()
+    xup = _xup(model, q)
+    a0 = np.zeros((n, 6))
+    if gravity:
+        a0[:, 3:6] = -model.gravity
+    v, a, f = [None] * model.nb, [None] * model.nb, [None] * model.nb
+    for i in range(model.nb):
+        lam = model.parent[i]
+        vj = S[i] * qd[:, i:i+1]
+        if lam < 0:
+            v[i] = vj
+            a[i] = _mv(xup[i], a0) + S[i] * qdd[:, i:i+1]
+        else:
+            v[i] = _mv(xup[i], v[lam]) + vj
+            a[i] = _mv(xup[i], a[lam]) + S[i] * qdd[:, i:i+1] + cross_motion(v[i], vj)
+        iv = _mv(inertia[i], v[i])
+        f[i] = _mv(inertia[i], a[i]) + cross_force(v[i], iv)
+        if f_ext is not None and i in f_ext:
+            f[i] = f[i] - f_ext[i]
+    tau = np.empty((n, model.nb))
+    for i in range(model.nb - 1, -1, -1):
+        tau[:, i] = f[i].dot(S[i])
+        lam = model.parent[i]
+        if lam >= 0:
+            f[lam] = f[lam] + _mtv(xup[i], f[i])
+    return tau[0] if single else tau
+
+
+# 非线性项 C(q, qd) (科氏力、离心力、重力)
+def nonlinear_effects(model, q, qd):
+    q_arr = np.asarray(q)
+    return rnea(model, q, qd, np.zeros(q_arr.shape))
+
+
+# 质量矩阵 H(q)
+def crba(model, q):
+    q, single = _batch(q)
+    n = q.shape[0]
+    S, _, inertia = model.arrays()
+    xup = _xup(model, q)
+    ic = [np.broadcast_to(inertia[i], (n, 6, 6)).copy() for i in range(model.nb)]
+    for i in range(model.nb - 1, -1, -1):
+        lam = model.parent[i]
+        if lam >= 0:
+            ic[lam] += np.matmul(np.swapaxes(xup[i], 1, 2), np.matmul(ic[i], xup[i]))
+    H = np.zeros((n, model.nb, model.nb))
+    for i in range(model.nb):
+        F = _mv(ic[i], S[i])
+        H[:, i, i] = F.dot(S[i])
+        j = i
+        while model.parent[j] >= 0:
+            F = _mtv(xup[j], F)
+            j = model.parent[j]
+            H[:, i, j] = H[:, j, i] = F.dot(S[j])
+    return H[0] if single else H
+
+
+# 正动力学：qdd = H^-1 (tau - C)
+def aba(model, q, qd, tau, f_ext=None):
+    q, single = _batch(q)
+    qd, _ = _batch(qd)
+    tau, _ = _batch(tau)
+    n = q.shape[0]
+    S, _, inertia = model.arrays()
+    xup = _xup(model, q)
+    nb = model.nb
+    v, c, ia, pa = [None] * nb, [None] * nb, [None] * nb, [None] * nb
+    for i in range(nb):
+        lam = model.parent[i]
+        vj = S[i] * qd[:, i:i+1]
+        if lam < 0:
+            v[i] = vj
+            c[i] = np.zeros((n, 6))
+        else:
+            v[i] = _mv(xup[i], v[lam]) + vj
+            c[i] = cross_motion(v[i], vj)
+        ia[i] = np.broadcast_to(inertia[i], (n, 6, 6)).copy()
+        pa[i] = cross_force(v[i], _mv(inertia[i], v[i]))
+        if f_ext is not None and i in f_ext:
+            pa[i] = pa[i] - f_ext[i]
+    U, d, u = [None] * nb, [None] * nb, [None] * nb
+    for i in range(nb - 1, -1, -1):
+        U[i] = _mv(ia[i], S[i])
+        d[i] = U[i].dot(S[i])
+        u[i] = tau[:, i] - pa[i].dot(S[i])
+        lam = model.parent[i]
+        if lam >= 0:
+            Ia = ia[i] - U[i][:, :, None] * U[i][:, None, :] / d[i][:, None, None]
+            pa_i = pa[i] + _mv(Ia, c[i]) + U[i] * (u[i] / d[i])[:, None]
+            xt = np.swapaxes(xup[i], 1, 2)
+            ia[lam] += np.matmul(xt, np.matmul(Ia, xup[i]))
+            pa[lam] = pa[lam] + _mv(xt, pa_i)
+    a0 = np.zeros((n, 6))
+    a0[:, 3:6] = -model.gravity
+    qdd = np.empty((n, nb))
+    a = [None] * nb
+    for i in range(nb):
+        lam = model.parent[i]
+        a_i = _mv(xup[i], a0 if lam < 0 else a[lam]) + c[i]
+        qdd[:, i] = (u[i] - (U[i] * a_i).sum(axis=1)) / d[i]
+        a[i] = a_i + S[i] * qdd[:, i:i+1]
+    return qdd[0] if single else qdd
+
+
+# ------------------------------------------------
+#                  运动学与接触约束
+# ------------------------------------------------
+# body上一点在基座坐标系下的位置(同rbdl CalcBodyToBaseCoordinates)
+def body_to_base_coordinates(model, q, body, point):
+    q, single = _batch(q)
+    x0 = _x_base(model, _xup(model, q))[body]
+    E = x0[:, 0:3, 0:3]
+    # X = [[E, 0], [-E r×, E]] => E r× = -X[3:6, 0:3]，r为body原点在基座中的位置
+    r_skew = -np.matmul(np.swapaxes(E, 1, 2), x0[:, 3:6, 0:3])
+    r = np.stack((r_skew[:, 2, 1], r_skew[:, 0, 2], r_skew[:, 1, 0]), axis=1)
+    pos = r + _mtv(E, np.broadcast_to(point, (q.shape[0], 3)))
+    return pos[0] if single else pos
+
+
+# 点的雅可比矩阵(基座坐标系) (N, 3, nq)，以及 -Jdot*qd (N, 3)
+def point_jacobian_bias(model, q, qd, body, point):
+    q, single = _batch(q)
+    qd, _ = _batch(qd)
+    n = q.shape[0]
+    S, _, _ = model.arrays()
+    xup = _xup(model, q)
+    x0 = _x_base(model, xup)
+    E = x0[body][:, 0:3, 0:3]
+    p = np.broadcast_to(np.asarray(point, dtype=np.float64), (n, 3))
+    # 1. 雅可比：各祖先关节的运动在body坐标系下的表示
+    J = np.zeros((n, 3, model.nb))
+    X = np.broadcast_to(np.eye(6), (n, 6, 6))
+    j = body
+    while j >= 0:
+        col = _mv(X, np.broadcast_to(S[j], (n, 6)))
+        v_pt = col[:, 3:6] + np.cross(col[:, 0:3], p)
+        J[:, :, j] = _mtv(E, v_pt)
+        X = np.matmul(X, xup[j])
+        j = model.parent[j]
+    # 2. qdd=0时的点加速度(不含重力)
+    path = []
+    j = body
+    while j >= 0:
+        path.append(j)
+        j = model.parent[j]
+    v = np.zeros((n, 6))
+    a = np.zeros((n, 6))
+    for i in reversed(path):
+        vj = S[i] * qd[:, i:i+1]
+        v = _mv(xup[i], v) + vj
+        a = _mv(xup[i], a) + cross_motion(v, vj)
+    w, vo = v[:, 0:3], v[:, 3:6]
+    acc = a[:, 3:6] + np.cross(a[:, 0:3], p) + np.cross(w, vo + np.cross(w, p))
+    bias = -_mtv(E, acc)
+    if single:
+        return J[0], bias[0]
+    return J, bias
+
+
+# 点接触约束集：每一行为 (body, point, normal)，同rbdl ConstraintSet.AddConstraint
+class ContactSet:
+    def __init__(self):
+        self.rows = []
+
+    def add_constraint(self, body, point, normal, name=''):
+        self.rows.append((body, np.asarray(point, dtype=np.float64),
+                          np.asarray(normal, dtype=np.float64), name))
+
+    # 同一点的多个方向合并计算
+    def points(self):
+        pts = []
+        for body, point, normal, _ in self.rows:
+            for k, (b, pt, normals) in enumerate(pts):
+                if b == body and np.array_equal(pt, point):
+                    normals.append(normal)
+                    break
+            else:
+                pts.append((body, point, [normal]))
+        return pts
+
+
+# 约束矩阵 G (N, m, nq) 和 gamma (N, m)，满足 G qdd = gamma
+def constraint_jacobian(model, q, qd, cs):
+    q_arr = np.asarray(q)
+    single = q_arr.ndim == 1
+    G_rows, gamma_rows = [], []
+    for body, point, normals in cs.points():
+        J, bias = point_jacobian_bias(model, q, qd, body, point)
+        if single:
+            J, bias = J[None], bias[None]
+        nrm = np.array(normals)
+        G_rows.append(np.einsum('kj,njq->nkq', nrm, J))
+        gamma_rows.append(np.einsum('kj,nj->nk', nrm, bias))
+    G = np.concatenate(G_rows, axis=1)
+    gamma = np.concatenate(gamma_rows, axis=1)
+    return (G[0], gamma[0]) if single else (G, gamma)
+
+
+# 约束位置误差 phi(q) = n·(p(q) - p_ref) 及雅可比 G(q)，p_ref为q_ref时的接触点位置
+# 用于 ContactSolver.step 的Baumgarte稳定与步后投影，q为单个状态 (nq,)
+def constraint_function(model, cs, q_ref):
+    pts = cs.points()
+    ref = [body_to_base_coordinates(model, q_ref, body, point) for body, point, _ in pts]
+
+    def constraint(q):
+        qd0 = np.zeros(np.shape(q))
+        phi, G = [], []
+        for (body, point, normals), p_ref in zip(pts, ref):
+            nrm = np.array(normals)
+            J, _ = point_jacobian_bias(model, q, qd0, body, point)
+            phi.append(nrm.dot(body_to_base_coordinates(model, q, body, point) - p_ref))
+            G.append(nrm.dot(J))
+        return np.concatenate(phi), np.concatenate(G)
+    return constraint
+
+
+# 同rbdl CalcContactSystemVariables: H qdd + G^T fc = -C, G qdd = gamma (C = N(q, qd) - tau)
+def contact_system_variables(model, q, qd, tau, cs):
+    H = crba(model, q)
+    C = nonlinear_effects(model, q, qd) - np.asarray(tau)
+    G, gamma = constraint_jacobian(model, q, qd, cs)
+    return H, C, G, gamma
+
+
+# ------------------------------------------------
+#       双足模型，参数与rbdl_biped.biped_model_create一致
+# ------------------------------------------------
+def biped_model_create():
+    model = TreeModel(gravity=(0.0, 0.0, -9.81))
+    thigh_len = 0.5
+    shank_len = 0.5
+    i_torso = spatial_inertia(20.0, [0., 0., 0.], np.diag([0.37, 0.29, 0.128]))
+    i_link1 = spatial_inertia(0.5, [0., 0., 0.], np.diag([0.0003, 0.0003, 0.0003]))
+    i_thigh = spatial_inertia(2.0, [0., 0., -thigh_len / 2], np.diag([0.04208, 0.04208, 0.00083]))
+    i_shank = spatial_inertia(2.0, [0., 0., -shank_len / 2], np.diag([0.04208, 0.04208, 0.00083]))
+    x_axis, y_axis = [1., 0., 0.], [0., 1., 0.]
+
+    id_torso = model.add_floating_base(-1, np.zeros(3), i_torso, name='torso')
+    id_left_link1 = model.add_body(id_torso, [0.0, 0.12, -0.2], 'R', x_axis, i_link1, name='left_link1')
+    id_left_thigh = model.add_body(id_left_link1, [0.0, 0.0, 0.0], 'R', y_axis, i_thigh, name='left_thigh')
+    id_left_shank = model.add_body(id_left_thigh, [0.0, 0.0, -thigh_len], 'R', y_axis, i_shank, name='left_shank')
+    id_right_link1 = model.add_body(id_torso, [0.0, -0.12, -0.2], 'R', x_axis, i_link1, name='right_link1')
+    id_right_thigh = model.add_body(id_right_link1, [0.0, 0.0, 0.0], 'R', y_axis, i_thigh, name='right_thigh')
+    id_right_shank = model.add_body(id_right_thigh, [0.0, 0.0, -thigh_len], 'R', y_axis, i_shank, name='right_shank')
+
+    c_point = np.array([0.0, 0.0, -0.55])
+    cs_left, cs_right = ContactSet(), ContactSet()
+    for cs, shank in ((cs_left, id_left_shank), (cs_right, id_right_shank)):
+        cs.add_constraint(shank, c_point, [1., 0., 0.], 'ground_x')
+        cs.add_constraint(shank, c_point, [0., 1., 0.], 'ground_y')
+        cs.add_constraint(shank, c_point, [0., 0., 1.], 'ground_z')
+    lid = [id_torso,
+           id_left_link1, id_left_thigh, id_left_shank,
+           id_right_link1, id_right_thigh, id_right_shank]
+    return model, cs_left, cs_right, lid
+
+
+# 供 ContactSolver.step 使用的 system(q, dq, tau) 函数
+def contact_system(model, cs):
+    def system(q, dq, tau):
+        return contact_system_variables(model, q, dq, tau, cs)
+    return system
+
+
+if __name__ == '__main__':
+    import time
+    from contact_dynamics import ContactSolver
+
+    b_model, b_cs_left, b_cs_right, b_lid = biped_model_create()
+    # 1. 批量与逐个调用的耗时对比
+    rng = np.random.default_rng(0)
+    n_state = 2000
+    qs = rng.normal(0, 0.3, (n_state, b_model.q_size))
+    qds = rng.normal(0, 1.0, (n_state, b_model.q_size))
+    taus = np.zeros((n_state, b_model.q_size))
+    t0 = time.perf_counter()
+    qdd_loop = np.array([aba(b_model, qs[k], qds[k], taus[k]) for k in range(n_state)])
+    t1 = time.perf_counter()
+    qdd_batch = aba(b_model, qs, qds, taus)
+    t2 = time.perf_counter()
+    print('aba  %d states: loop %.3fs, batch %.3fs, max diff %.2e'
+          % (n_state, t1 - t0, t2 - t1, np.abs(qdd_loop - qdd_batch).max()))
+    H_all = crba(b_model, qs)
+    qdd_ref = np.linalg.solve(H_all, (taus - nonlinear_effects(b_model, qs, qds))[..., None])[..., 0]
+    print('aba vs crba solve: max diff %.2e' % np.abs(qdd_batch - qdd_ref).max())
+
+    # 2. 左脚支撑、关节力为0的约束动力学(对照rbdl_biped.modelTest)
+    solver = ContactSolver()
+    system = contact_system(b_model, b_cs_left)
+    q, dq = np.zeros(b_model.q_size), np.zeros(b_model.q_size)
+    tau = np.zeros(b_model.q_size)
+    foot0 = body_to_base_coordinates(b_model, q, b_lid[3], [0., 0., -0.55])
+    for _ in range(2000):
+        q, dq, ddq, fc = solver.step(q, dq, tau, 0.001, system, 'cs_left')
+    foot1 = body_to_base_coordinates(b_model, q, b_lid[3], [0., 0., -0.55])
+    print('stance 2s: foot drift %.2e m, contact force' % np.linalg.norm(foot1 - foot0), fc)
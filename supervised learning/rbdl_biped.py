@@ -6,11 +6,13 @@
 # ----------------------------------------
 import numpy as np
 import rbdl
-import matplotlib.pyplot as plt
-import matplotlib.animation as animation
 
+import rbd_numpy
+from contact_dynamics import ContactSolver
+from tools import sim_render
 
-# 创建模型
+
+# 创建模型(手写参数；由URDF直接建模见 urdf_model.biped_model_from_urdf)
 def biped_model_create():
     model = rbdl.Model()
     model.gravity = np.array([0.0, 0.0, -9.81])
@@ -78,86 +80,50 @@ def biped_model_create():
     return model, cs_left, cs_right, lid
 
 
-def modelTest():
+def modelTest(save_path=None):
     t_cycle = 0.001
+    t_max = 2
     model, cs_left, cs_right, lid = biped_model_create()
     cs_left.Bind(model)
-    id_torso, idl_link, idl_thigh, idl_shank, idr_link, idr_thigh, idr_shank = lid
-    # 初始化数据
-    fig, ax = plt.subplots()
-    AB, = ax.plot([], [], 'b', lw=2)
-    FC, = ax.plot([], [], 'r', lw=2)
-    CD, = ax.plot([], [], 'g', lw=2)
-    DE, = ax.plot([], [], 'b', lw=2)
-    FG, = ax.plot([], [], 'g', lw=2)
-    GH, = ax.plot([], [], 'b', lw=2)
-    ax.grid()
-    # 动画绘图初始化函数
-    def init():
-        ax.set_ylim(-5,1)
-        ax.set_xlim(-3,3)
-
-    def data_gen():
-        t_max = 2
-        # 设计关节力为0
-        q0 = np.zeros(model.q_size)
-        print(model.q_size)
-        dq0 = np.zeros(model.qdot_size)
-        tau = np.zeros(model.qdot_size)
-
-        # 循环初始化
-        q, dq = q0, dq0
-        for i in range(int(t_max / t_cycle)):
-            rbdl.CalcContactSystemVariables(model, q, dq, tau, cs_left)
-            H = cs_left.get_H()
-            G = cs_left.get_G()
-            C = cs_left.get_C()
-            gamma = cs_left.get_gamma()
-            sz_d1 = H.shape[0] + G.shape[0]
-            A = np.zeros((sz_d1, sz_d1))
-            # 构造混合的A矩阵
-            A[0:H.shape[0], 0:H.shape[0]] = H
-            A[H.shape[0]:sz_d1, 0:H.shape[0]] = G
-            A[0:H.shape[0], H.shape[0]:sz_d1] = G.transpose()
-            b = np.zeros((sz_d1, 1))
-            b[0:H.shape[0], 0] = -C.transpose()
-            b[H.shape[0]:sz_d1, 0] = gamma.transpose()
-            # 计算动力学方程
-            res = np.dot(np.linalg.inv(A), b)
-            ddq = res[0:H.shape[0], 0].transpose()
-            fc = res[H.shape[0]:sz_d1, 0]
-            # 还是这个简单的积分吧
-            dq = dq + ddq * t_cycle
-            q = q + dq * t_cycle
-            yield q, fc
-
-    def run(data):
-        show_axis = 'yz'
-        q, fc = data
-        pA = rbdl.CalcBodyToBaseCoordinates(model, q, id_torso, np.array([0., 0., 0.2]))
-        pB = rbdl.CalcBodyToBaseCoordinates(model, q, id_torso, np.array([0., 0., -0.2]))
-        pC = rbdl.CalcBodyToBaseCoordinates(model, q, idl_link, np.array([0., 0., 0.]))
-        pD = rbdl.CalcBodyToBaseCoordinates(model, q, idl_thigh, np.array([0., 0., -0.5]))
-        pE = rbdl.CalcBodyToBaseCoordinates(model, q, idl_shank, np.array([0., 0., -0.5]))
-        pF = rbdl.CalcBodyToBaseCoordinates(model, q, idr_link, np.array([0., 0., 0.]))
-        pG = rbdl.CalcBodyToBaseCoordinates(model, q, idr_thigh, np.array([0., 0., -0.5]))
-        pH = rbdl.CalcBodyToBaseCoordinates(model, q, idr_shank, np.array([0., 0., -0.5]))
-        if show_axis=='yz':
-            AB.set_data([pA[1], pB[1]], [pA[2], pB[2]])
-            FC.set_data([pF[1], pC[1]], [pF[2], pC[2]])
-            CD.set_data([pC[1], pD[1]], [pC[2], pD[2]])
-            DE.set_data([pD[1], pE[1]], [pD[2], pE[2]])
-            FG.set_data([pF[1], pG[1]], [pF[2], pG[2]])
-            GH.set_data([pG[1], pH[1]], [pG[2], pH[2]])
-        else:
-            AB.set_data([pA[0], pB[0]], [pA[2], pB[2]])
-            FC.set_data([pF[0], pC[0]], [pF[2], pC[2]])
-            CD.set_data([pC[0], pD[0]], [pC[2], pD[2]])
-            DE.set_data([pD[0], pE[0]], [pD[2], pE[2]])
-            FG.set_data([pF[0], pG[0]], [pF[2], pG[2]])
-            GH.set_data([pG[0], pH[0]], [pG[2], pH[2]])
-    ani = animation.FuncAnimation(fig, run, data_gen, blit=False, interval=10, repeat=False, init_func=init)
-    plt.show()
+
+    # 1. 仿真：全速积分，只记录轨迹
+    # 约束动力学：H的Cholesky分解 + 约束的Schur补，不构造增广矩阵
+    solver = ContactSolver()
+
+    def system(q_in, dq_in, tau_in):
+        rbdl.CalcContactSystemVariables(model, q_in, dq_in, tau_in, cs_left)
+        return cs_left.get_H(), cs_left.get_C(), cs_left.get_G(), cs_left.get_gamma()
+
+    # 设计关节力为0
+    q0 = np.zeros(model.q_size)
+    dq0 = np.zeros(model.qdot_size)
+    tau = np.zeros(model.qdot_size)
+    q_traj, fc_traj = sim_render.simulate_contact(solver, system, q0, dq0, tau, t_cycle, t_max, 'cs_left')
+
+    # 2. 关键点：同构的numpy模型一次批量计算
+    np_model, _, _, np_lid = rbd_numpy.biped_model_create()
+    id_torso, idl_link, idl_thigh, idl_shank, idr_link, idr_thigh, idr_shank = np_lid
+    pts = sim_render.points_trajectory(np_model, q_traj, [
+        (id_torso, [0., 0., 0.2]),      # A
+        (id_torso, [0., 0., -0.2]),     # B
+        (idl_link, [0., 0., 0.]),       # C
+        (idl_thigh, [0., 0., -0.5]),    # D
+        (idl_shank, [0., 0., -0.5]),    # E
+        (idr_link, [0., 0., 0.]),       # F
+        (idr_thigh, [0., 0., -0.5]),    # G
+        (idr_shank, [0., 0., -0.5])])   # H
+    A, B, C, D, E, F, G, H = range(8)
+
+    # 3. 绘制：AB, FC, CD, DE, FG, GH
+    segments = [(A, B), (F, C), (C, D), (D, E), (F, G), (G, H)]
+    colors = ['b', 'r', 'g', 'b', 'g', 'b']
+    ani = sim_render.TrajectoryAnimation([pts[:, list(seg)] for seg in segments], t_cycle, fps=30,
+                                         styles=[{'color': c, 'lw': 2} for c in colors], plane='yz',
+                                         xlim=(-3, 3), ylim=(-5, 1), headless=save_path is not None)
+    if save_path is None:
+        ani.show()
+    else:
+        ani.save(save_path)
 
 
 # modelTest()
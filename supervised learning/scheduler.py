@@ -0,0 +1,91 @@
+# -----------------------------------------------
+# 多速率调度器
+# 物理仿真按自己的步长运行，控制任务(规划、支撑控制等)按各自频率运行
+# 所有任务共用一个时钟：t = tick * physics_dt
+# 记录每个任务的执行时间以及超时(deadline overrun)次数
+# -----------------------------------------------
+import time
+
+
+class SchedTask:
+    def __init__(self, name, stride, fun, guard, budget):
+        self.name = name
+        self.stride = stride            # 每隔多少个物理步执行一次
+        self.fun = fun
+        self.guard = guard              # 返回False时本次跳过
+        self.budget = budget            # 允许的单次执行时间(s)
+        self.runs = 0
+        self.overruns = 0
+        self.wall_total = 0.0
+        self.wall_max = 0.0
+
+
+class MultiRateScheduler:
+    # physics_dt - 物理步长(s)
+    # physics_step - 单步物理仿真函数，例如 p.stepSimulation
+    # set_time - 每个物理步前调用 set_time(t)，例如 BipedController.set_system_time
+    def __init__(self, physics_dt, physics_step, set_time=None):
+        self.physics_dt = physics_dt
+        self.physics_step = physics_step
+        self.set_time = set_time
+        self.tick = 0
+        self.tasks = []
+
+    @property
+    def t(self):
+        return self.tick * self.physics_dt
+
+    # 添加任务，rate为执行频率(Hz)，必须是物理频率的整数分之一
+    # budget默认为任务周期，执行时间超过budget记为一次超时
+    def add_task(self, name, rate, fun, guard=None, budget=None):
+        period = 1.0 / rate
+        stride = int(round(period / self.physics_dt))
+        if stride < 1 or abs(stride * self.physics_dt - period) > 1e-9:
+            raise ValueError('task %s: rate %g Hz is not a divisor of the physics rate' % (name, rate))
+        if budget is None:
+            budget = period
+        task = SchedTask(name, stride, fun, guard, budget)
+        self.tasks.append(task)
+        return task
+
+    # 推进一个物理步：先执行到期的任务，再进行物理仿真
+    def step(self):
+        if self.set_time is not None:
+            self.set_time(self.t)
+        for task in self.tasks:
+            if self.tick % task.stride:
+                continue
+            if task.guard is not None and not task.guard():
+                continue
+            t0 = time.perf_counter()
+            task.fun()
+            wall = time.perf_counter() - t0
+            task.runs += 1
+            task.wall_total += wall
+            if wall > task.wall_max:
+                task.wall_max = wall
+            if wall > task.budget:
+                task.overruns += 1
+        self.physics_step()
+        self.tick += 1
+
+    # 运行duration秒(仿真时间)，realtime=True时按墙上时间同步
+    def run(self, duration, realtime=False):
+        n_steps = int(round(duration / self.physics_dt))
+        wall_begin = time.perf_counter()
+        t_begin = self.t
+        for _ in range(n_steps):
+            self.step()
+            if realtime:
+                lag = (self.t - t_begin) - (time.perf_counter() - wall_begin)
+                if lag > 0:
+                    time.sleep(lag)
+
+    def report(self):
+        lines = ['t = %.3f s, %d physics steps' % (self.t, self.tick)]
+        for task in self.tasks:
+            mean = task.wall_total / task.runs if task.runs else 0.0
+            lines.append('%-10s %7.1f Hz  runs %6d  mean %8.3f ms  max %8.3f ms  overruns %d'
+                         % (task.name, 1.0 / (task.stride * self.physics_dt), task.runs,
+                            mean * 1e3, task.wall_max * 1e3, task.overruns))
+        return '\n'.join(lines)
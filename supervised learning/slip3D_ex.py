@@ -15,6 +15,8 @@ import matplotlib.pyplot as plt
 from mpl_toolkits import mplot3d
 import pandas as pd
 
+from slip_trajectory import SlipTrajectory
+
 
 # ------------------------------------------------
 #                  系统方程
@@ -140,24 +142,30 @@ def sim_cycle(pairs, b_para):
     return [in_sol1, in_sol2, in_sol3, in_sol4, in_foot_point]
 
 
+# 一个周期的仿真结果存为SlipTrajectory：四个阶段首尾相接，时间连续
+def sim_cycle_trajectory(pairs, b_para):
+    sols = sim_cycle(pairs, b_para)
+    traj = SlipTrajectory()
+    for sol in sols[0:4]:
+        traj.add_phase(sol.t, sol.y)
+    traj.foot_point[:] = sols[4]
+    return traj
+
+
 # 测试：sim_cycle_test([.94, 4.5, 0, 1.1577, 0, 6.05e3, 6.05e3])
 # b_para = [20.0, -9.8, 1.0]
 def sim_cycle_test(pairs, b_para):
-    sol1, sol2, sol3, sol4, foot_point = sim_cycle(pairs, b_para)
+    traj = sim_cycle_trajectory(pairs, b_para)
+    foot_point = traj.foot_point
     ax = plt.axes(projection='3d')
-    ax.plot(sol1.y[0, :], sol1.y[1, :], sol1.y[2, :], 'r')
-    ax.plot(sol2.y[0, :], sol2.y[1, :], sol2.y[2, :], 'g')
-    ax.plot(sol3.y[0, :], sol3.y[1, :], sol3.y[2, :], 'b')
-    ax.plot(sol4.y[0, :], sol4.y[1, :], sol4.y[2, :], 'r')
+    for k, color in enumerate('rgbr'):
+        pos = traj.phase(k)[:, 1:4]
+        ax.plot(pos[:, 0], pos[:, 1], pos[:, 2], color)
     ax.plot([0], [0], [0], '*r')
     ax.plot([foot_point[0]], [foot_point[1]], [foot_point[2]], '*b')
     plt.show()
-    return sol2, sol3
-    # 存储数据为csv文件
-    # pd.DataFrame(sol1.y).to_csv('data/sol1.csv')
-    # pd.DataFrame(sol2.y).to_csv('data/sol2.csv')
-    # pd.DataFrame(sol3.y).to_csv('data/sol3.csv')
-    # pd.DataFrame(sol4.y).to_csv('data/sol4.csv')
+    return traj
+    # 存储数据：traj.save('data/slip_cycle.npy')
 
 
 # 仿真一遍获得下一顶点状态
@@ -189,3 +197,17 @@ def control_jac_calculation(pair, b_para):
     jac_u_2[:, 2] = jac_u_2[:, 2] - jac_u[:, -1]
     j_total = np.dot(np.linalg.inv(jac_u_2), jac_x)
     return j_total
+
+
+# 由当前顶点状态计算本周期控制量
+# pair - 标准pair, jac - control_jac_calculation的结果
+# x_now - 当前顶点状态 [h0, vx0, vy0]
+# 返回： u = [alpha, beta, ks1, ks2], 以及无系数的du
+def control_u_calculation(pair, jac, x_now, gain=0.1):
+    delta_x = x_now - pair[0:3]
+    delta_u = np.dot(jac, delta_x)
+    delta_u_out = np.zeros(4)
+    delta_u_out[0:3] = delta_u
+    delta_u_out[-1] += -delta_u[-1]      # 冗余量约束设计得到
+    u = np.array(pair[3:7]) + gain * delta_u_out
+    return u, delta_u_out
@@ -0,0 +1,99 @@
+# -----------------------------------------------
+# SLIP仿真轨迹的存储
+# 一个 (T, 7) 数组，每行 [t, x, y, z, vx, vy, vz]，容量不够时翻倍
+# 阶段：0-下落  1-压缩  2-弹射  3-上升
+#   相邻阶段共用边界上的一行，phase(k) 返回包含两端的视图(不复制)
+# 保存为 .npy：第0行为头 [阶段0~3的结束行号(未用为-1), x_f, y_f, z_f]，之后为数据
+# -----------------------------------------------
+import numpy as np
+
+phase_names = ('flight_down', 'compress', 'thrust', 'flight_up')
+max_phase = 4
+
+
+class SlipTrajectory:
+    def __init__(self, capacity=512):
+        self._buf = np.empty((capacity, 7))
+        self.size = 0
+        self.ends = []                      # 各阶段结束行号(不含)
+        self.foot_point = np.zeros(3)       # 触地点
+
+    def _reserve(self, n):
+        if n > self._buf.shape[0]:
+            cap = self._buf.shape[0]
+            while cap < n:
+                cap *= 2
+            buf = np.empty((cap, 7))
+            buf[0:self.size] = self._buf[0:self.size]
+            self._buf = buf
+
+    # 追加一个阶段，t从0开始，自动接在上一阶段的末尾时刻之后
+    # y: (6, n)，即solve_ivp结果的sol.y
+    # 与上一阶段的边界行用新阶段的第一行代替
+    def add_phase(self, t, y):
+        if len(self.ends) >= max_phase:
+            raise ValueError('a SLIP cycle has at most %d phases' % max_phase)
+        t = np.asarray(t, dtype=np.float64)
+        start = 0
+        if self.size:
+            start = self.size - 1
+            t = t + self._buf[start, 0]
+        n = t.shape[0]
+        self._reserve(start + n)
+        self._buf[start:start+n, 0] = t
+        self._buf[start:start+n, 1:7] = np.asarray(y).T
+        self.size = start + n
+        self.ends.append(self.size)
+
+    @property
+    def data(self):
+        return self._buf[0:self.size]
+
+    @property
+    def t(self):
+        return self._buf[0:self.size, 0]
+
+    @property
+    def pos(self):
+        return self._buf[0:self.size, 1:4]
+
+    @property
+    def vel(self):
+        return self._buf[0:self.size, 4:7]
+
+    # 状态 (T, 6)
+    @property
+    def state(self):
+        return self._buf[0:self.size, 1:7]
+
+    def phase_start(self, k):
+        return 0 if k == 0 else self.ends[k - 1] - 1
+
+    # 第k阶段，包含两端边界
+    def phase(self, k):
+        return self._buf[self.phase_start(k):self.ends[k]]
+
+    # 第k0到k1阶段(含)
+    def phase_span(self, k0, k1):
+        return self._buf[self.phase_start(k0):self.ends[k1]]
+
+    def last_state(self):
+        return self._buf[self.size - 1, 1:7]
+
+    def save(self, path):
+        out = np.empty((self.size + 1, 7))
+        out[0, 0:max_phase] = -1
+        out[0, 0:len(self.ends)] = self.ends
+        out[0, 4:7] = self.foot_point
+        out[1:] = self.data
+        np.save(path, out)
+
+    @classmethod
+    def load(cls, path, mmap_mode=None):
+        arr = np.load(path, mmap_mode=mmap_mode)
+        traj = cls.__new__(cls)
+        traj._buf = arr[1:]
+        traj.size = arr.shape[0] - 1
+        traj.ends = [int(e) for e in arr[0, 0:max_phase] if e >= 0]
+        traj.foot_point = np.array(arr[0, 4:7])
+        return traj
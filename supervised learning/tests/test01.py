@@ -1,58 +1,17 @@
 # 机器人运动逆运动学控制测试
+import os
+import sys
 import pybullet as p
 import time
 import pybullet_data
 import numpy as np
 
-
-def box_inertia(shape, m):
-    x, y, z = shape
-    ixx = (y*y + z*z) * m / 12
-    iyy = (x*x + z*z) * m / 12
-    izz = (x*x + y*y) * m / 12
-    return [ixx, iyy, izz]
-
-
-# 这种写法不是很有效率，暂时用一下
-def rotate_x(alpha):
-    ca = np.cos(alpha)
-    sa = np.sin(alpha)
-    return np.array([[1.0, 0.0, 0.0, 0.0],
-                     [0.0, ca,  -sa, 0.0],
-                     [0.0, sa,   ca, 0.0],
-                     [0.0, 0.0, 0.0, 1.0]])
-
-
-def rotate_y(beta):
-    cb = np.cos(beta)
-    sb = np.sin(beta)
-    return np.array([[cb,  0.0,  sb, 0.0],
-                     [0.0, 1.0, 0.0, 0.0],
-                     [-sb, 0.0,  cb, 0.0],
-                     [0.0, 0.0, 0.0, 1.0]])
-
-
-def rotate_z(gamma):
-    cg = np.cos(gamma)
-    sg = np.sin(gamma)
-    return np.array([[cg,  -sg, 0.0, 0.0],
-                     [sg,   cg, 0.0, 0.0],
-                     [0.0, 0.0, 1.0, 0.0],
-                     [0.0, 0.0, 0.0, 1.0]])
-
-
-def trans_xyz(x, y, z):
-    return np.array([[1.0, 0.0, 0.0, x],
-                     [0.0, 1.0, 0.0, y],
-                     [0.0, 0.0, 1.0, z],
-                     [0.0, 0.0, 0.0, 1.0]])
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from tools.transform import rotate_x, rotate_y, trans_xyz
 
 
 def coord_fake_world2joint(robot_id, p_world, leg):
     assert p_world.shape == (3, 1)
-    tmp = p_world.tolist()
-    tmp.append([1])
-    pw_ext = np.array(tmp)
     b_po = p.getBasePositionAndOrientation(robot_id)
     alpha, beta, gamma = p.getEulerFromQuaternion(b_po[1])  # 机体欧拉角表示
     if leg == 'left':
@@ -60,11 +19,9 @@ def coord_fake_world2joint(robot_id, p_world, leg):
     else:
         dy = -0.12
     t1 = rotate_x(alpha).dot(rotate_y(beta).dot(trans_xyz(0, dy, -0.2)))
-    p_in1 = np.linalg.inv(t1).dot(pw_ext)
-    # print(np.linalg.inv(t1))
+    p_in1 = t1.apply_inv(p_world[:, 0])
     ang_a = np.arctan2(p_in1[1], abs(p_in1[2]))
-    t2 = rotate_x(ang_a)
-    p_in2 = np.linalg.inv(t2).dot(p_in1)
+    p_in2 = rotate_x(ang_a).apply_inv(p_in1)
     x2, z2 = p_in2[0], p_in2[2]
     print(p_in1)
     tmp1 = x2 * x2 + z2 * z2
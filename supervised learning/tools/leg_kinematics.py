@@ -0,0 +1,47 @@
+# 三自由度腿的正运动学(纯numpy，可批量)
+# 关节：髋关节侧摆(x轴) a，髋关节前摆(y轴) b，膝关节(y轴) c
+# 几何：髋关节相对机体 (0, ±0.12, -0.2)，大腿、小腿长均为0.5
+# 足端位置在机体坐标系下表示：
+#   x' = -l1*sin(b) - l2*sin(b+c)
+#   z' = -l1*cos(b) - l2*cos(b+c)
+#   foot = (x', dy - sin(a)*z', dz + cos(a)*z')
+import numpy as np
+
+hip_dy = 0.12               # 髋关节横向偏移(左正右负)
+hip_dz = -0.2               # 髋关节竖直偏移
+thigh_len = 0.5
+shank_len = 0.5
+
+
+# q: (N, 3) 或 (3,) 关节角 [a, b, c]
+# 返回: foot (N, 3) 足端位置, leg_len (N,) 足端到机体原点距离, jac (N, 3, 3) d(foot)/dq
+def leg_forward(q, leg='left'):
+    q = np.asarray(q, dtype=np.float64)
+    dy = hip_dy if leg == 'left' else -hip_dy
+    a, b, c = q[..., 0], q[..., 1], q[..., 2]
+    sa, ca = np.sin(a), np.cos(a)
+    sb, cb = np.sin(b), np.cos(b)
+    sbc, cbc = np.sin(b + c), np.cos(b + c)
+    xp = -thigh_len * sb - shank_len * sbc
+    zp = -thigh_len * cb - shank_len * cbc
+
+    foot = np.empty(q.shape)
+    foot[..., 0] = xp
+    foot[..., 1] = dy - sa * zp
+    foot[..., 2] = hip_dz + ca * zp
+    leg_len = np.sqrt(np.einsum('...i,...i->...', foot, foot))
+
+    jac = np.empty(q.shape + (3,))
+    jac[..., 0, 0] = 0.0
+    jac[..., 1, 0] = -ca * zp
+    jac[..., 2, 0] = -sa * zp
+    jac[..., 0, 1] = zp
+    jac[..., 1, 1] = sa * xp
+    jac[..., 2, 1] = -ca * xp
+    dxc = -shank_len * cbc
+    dzc = shank_len * sbc
+    jac[..., 0, 2] = dxc
+    jac[..., 1, 2] = -sa * dzc
+    jac[..., 2, 2] = ca * dzc
+    return foot, leg_len, jac
+
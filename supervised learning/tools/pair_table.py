@@ -0,0 +1,70 @@
+# 稳定pair表
+# 1. csv只在第一次(或csv更新后)解析，转存为带版本号的 .npy 结构化数组
+# 2. 之后以内存映射方式读取，同一进程内只加载一次，多个进程共享同一份文件页
+# 3. 按速度排序建立索引，最近速度查找为二分查找
+import os
+import numpy as np
+
+pair_fields = ('h0', 'vx0', 'vy0', 'alpha', 'beta', 'ks1', 'ks2', 't_air', 't_sup')
+pair_dtype = np.dtype([(name, 'f8') for name in pair_fields])
+table_version = 1
+
+_tables = {}
+
+
+class PairTable:
+    def __init__(self, data):
+        self.data = data                                            # 结构化数组 (N,)
+        self.rows = data.view(np.float64).reshape(len(data), -1)    # 同一内存的 (N, 9) 视图
+        self.order = np.argsort(data['vx0'], kind='stable')
+        self.sorted_v = np.ascontiguousarray(data['vx0'][self.order])
+
+    def __len__(self):
+        return len(self.data)
+
+    def in_range(self, v):
+        return self.sorted_v[0] <= v <= self.sorted_v[-1]
+
+    # 速度最接近v的行号，v可以是数组
+    def nearest(self, v):
+        v = np.asarray(v, dtype=np.float64)
+        if len(self.sorted_v) == 1:             # 只有一行时没有左右两侧可比
+            return self.order[np.zeros(v.shape, dtype=np.intp)]
+        k = np.clip(np.searchsorted(self.sorted_v, v), 1, len(self.sorted_v) - 1)
+        left, right = self.sorted_v[k - 1], self.sorted_v[k]
+        k = k - (v - left <= right - v)
+        return self.order[k]
+
+    # 第idx行的普通数组(复制)，下标同原csv的列
+    def pair(self, idx):
+        return np.array(self.rows[idx])
+
+
+def npy_path_of(csv_path):
+    return os.path.splitext(csv_path)[0] + '.v%d.npy' % table_version
+
+
+def convert_csv(csv_path, npy_path=None):
+    npy_path = npy_path or npy_path_of(csv_path)
+    rows = np.loadtxt(csv_path, delimiter=',', ndmin=2)
+    data = np.empty(rows.shape[0], dtype=pair_dtype)
+    data.view(np.float64).reshape(rows.shape)[:] = rows
+    tmp = npy_path + '.%d.tmp' % os.getpid()
+    with open(tmp, 'wb') as f:
+        np.save(f, data)
+    os.replace(tmp, npy_path)                   # 多进程同时转换时不会读到写了一半的文件
+    return npy_path
+
+
+def load_pair_table(csv_path='./data/stable_pair.csv', mmap=True):
+    key = (os.path.abspath(csv_path), mmap)
+    if key in _tables:
+        return _tables[key]
+    npy_path = npy_path_of(csv_path)
+    if not os.path.exists(npy_path) or os.path.getmtime(npy_path) < os.path.getmtime(csv_path):
+        convert_csv(csv_path, npy_path)
+    data = np.load(npy_path, mmap_mode='r' if mmap else None)
+    if data.dtype != pair_dtype:
+        raise ValueError('unexpected pair table layout in %s' % npy_path)
+    _tables[key] = PairTable(data)
+    return _tables[key]
@@ -0,0 +1,121 @@
+# 分段计时工具
+# 按名称统计每段代码的墙上时间，结果存为对数分箱的直方图
+# 关闭时section()返回一个共享的空上下文，几乎没有开销
+import atexit
+import bisect
+import time
+import numpy as np
+
+
+class _NullSection:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+
+_null_section = _NullSection()
+
+
+class _Section:
+    __slots__ = ('prof', 'name', 't0')
+
+    def __init__(self, prof, name):
+        self.prof = prof
+        self.name = name
+        self.t0 = 0.0
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        self.prof.record(self.name, time.perf_counter() - self.t0)
+        return False
+
+
+class SectionStat:
+    def __init__(self, n_bins):
+        self.counts = np.zeros(n_bins + 1, dtype=np.int64)   # 最后一格为超出上限
+        self.n = 0
+        self.total = 0.0
+        self.max = 0.0
+
+
+class SectionProfiler:
+    # edges: 直方图分箱边界(s)，默认 1us ~ 1s 对数分60段
+    def __init__(self, enabled=False, edges=None):
+        self.enabled = enabled
+        self.edges = np.logspace(-6, 0, 61) if edges is None else np.asarray(edges)
+        self._edge_list = self.edges.tolist()
+        self.stats = {}
+
+    # 用法: with prof.section('name'): ...
+    def section(self, name):
+        if not self.enabled:
+            return _null_section
+        return _Section(self, name)
+
+    def record(self, name, dt):
+        stat = self.stats.get(name)
+        if stat is None:
+            stat = SectionStat(len(self.edges) - 1)
+            self.stats[name] = stat
+        idx = bisect.bisect_right(self._edge_list, dt) - 1
+        if idx < 0:
+            idx = 0
+        stat.counts[idx] += 1
+        stat.n += 1
+        stat.total += dt
+        if dt > stat.max:
+            stat.max = dt
+
+    def reset(self):
+        self.stats = {}
+
+    # 由直方图估计分位数(取所在分箱的上边界)
+    def quantile(self, name, q):
+        stat = self.stats[name]
+        cum = np.cumsum(stat.counts)
+        idx = int(np.searchsorted(cum, q * stat.n))
+        if idx >= len(self.edges) - 1:
+            return stat.max
+        return min(self.edges[idx + 1], stat.max)
+
+    # 实时读取统计结果
+    def summary(self):
+        res = {}
+        for name, stat in self.stats.items():
+            res[name] = {'n': stat.n,
+                         'total': stat.total,
+                         'mean': stat.total / stat.n,
+                         'p50': self.quantile(name, 0.5),
+                         'p99': self.quantile(name, 0.99),
+                         'max': stat.max}
+        return res
+
+    def report(self):
+        lines = ['%-18s %8s %10s %10s %10s %10s %10s' % ('section', 'n', 'total s', 'mean ms', 'p50 ms', 'p99 ms', 'max ms')]
+        for name, s in sorted(self.summary().items(), key=lambda it: -it[1]['total']):
+            lines.append('%-18s %8d %10.3f %10.3f %10.3f %10.3f %10.3f'
+                         % (name, s['n'], s['total'], s['mean'] * 1e3, s['p50'] * 1e3, s['p99'] * 1e3, s['max'] * 1e3))
+        return '\n'.join(lines)
+
+    # 保存直方图: edges 以及每段的 counts/n/total/max
+    def dump(self, path):
+        arrays = {'edges': self.edges}
+        for name, stat in self.stats.items():
+            arrays[name + '_counts'] = stat.counts
+            arrays[name + '_summary'] = np.array([stat.n, stat.total, stat.max])
+        np.savez(path, **arrays)
+
+    # 程序退出时打印并保存结果
+    def dump_on_exit(self, path=None):
+        def _dump():
+            if not self.stats:
+                return
+            print(self.report())
+            if path is not None:
+                self.dump(path)
+        atexit.register(_dump)
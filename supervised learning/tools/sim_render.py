@@ -0,0 +1,95 @@
+# 先仿真、后绘制
+# 1. simulate: 全速积分，结果存为数组 q (T, nq), fc (T, m)
+# 2. points_trajectory: 一次批量正运动学得到所有关键点 (T, P, 3)
+# 3. TrajectoryAnimation: 按固定帧率抽帧，复用线条对象，blit绘制；
+#    headless=True 时只用Agg画布，可直接导出mp4/gif
+import numpy as np
+import matplotlib.animation as animation
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+import rbd_numpy
+
+
+# step(q, dq) --> q, dq, fc
+def simulate(step, q0, dq0, n_step):
+    q, dq = np.array(q0, dtype=np.float64), np.array(dq0, dtype=np.float64)
+    q_traj = np.empty((n_step, q.size))
+    fc_traj = None
+    for k in range(n_step):
+        q, dq, fc = step(q, dq)
+        if fc_traj is None:
+            fc_traj = np.empty((n_step, np.size(fc)))
+        q_traj[k] = q
+        fc_traj[k] = np.ravel(fc)
+    return q_traj, fc_traj
+
+
+# 用 ContactSolver 做约束动力学仿真，关节力为常值tau
+def simulate_contact(solver, system, q0, dq0, tau, dt, t_max, key=None):
+    def step(q, dq):
+        q, dq, _, fc = solver.step(q, dq, tau, dt, system, key)
+        return q, dq, fc
+    return simulate(step, q0, dq0, int(round(t_max / dt)))
+
+
+# points: [(body, point), ...]，返回 (T, P, 3)
+def points_trajectory(model, q_traj, points):
+    return np.stack([rbd_numpy.body_to_base_coordinates(model, q_traj, body, pt)
+                     for body, pt in points], axis=1)
+
+
+# 仿真步长dt下，按帧率fps抽取的帧序号
+def frame_indices(n_step, dt, fps):
+    stride = max(int(round(1.0 / (fps * dt))), 1)
+    return np.arange(stride - 1, n_step, stride)
+
+
+class TrajectoryAnimation:
+    # polylines: [(T, k, 3) 折线各顶点的轨迹, ...]
+    # styles: 每条折线的plot参数，如 {'color': 'b', 'lw': 2}
+    # plane: 'yz' 或 'xz'
+    def __init__(self, polylines, dt, fps=30, styles=None, plane='yz',
+                 xlim=(-3, 3), ylim=(-5, 1), headless=False):
+        self.polylines = polylines
+        self.frames = frame_indices(polylines[0].shape[0], dt, fps)
+        self.fps = fps
+        axes = {'x': 0, 'y': 1, 'z': 2}
+        self.axis_h, self.axis_v = axes[plane[0]], axes[plane[1]]
+        if headless:
+            self.fig = Figure()
+            FigureCanvasAgg(self.fig)
+        else:
+            import matplotlib.pyplot as plt
+            self.fig = plt.figure()
+        self.ax = self.fig.add_subplot(111)
+        self.ax.set_xlim(*xlim)
+        self.ax.set_ylim(*ylim)
+        self.ax.grid()
+        styles = styles or [{}] * len(polylines)
+        self.lines = [self.ax.plot([], [], animated=True, **style)[0] for style in styles]
+        self.anim = animation.FuncAnimation(self.fig, self.update, frames=self.frames,
+                                            init_func=self.init, blit=True,
+                                            interval=1000.0 / fps, repeat=False)
+
+    def init(self):
+        for line in self.lines:
+            line.set_data([], [])
+        return self.lines
+
+    def update(self, k):
+        for line, traj in zip(self.lines, self.polylines):
+            line.set_data(traj[k, :, self.axis_h], traj[k, :, self.axis_v])
+        return self.lines
+
+    def show(self):
+        import matplotlib.pyplot as plt
+        plt.show()
+
+    # 按扩展名选择: .gif -> Pillow, 其他 -> ffmpeg
+    def save(self, path, dpi=100):
+        if path.endswith('.gif'):
+            writer = animation.PillowWriter(fps=self.fps)
+        else:
+            writer = animation.FFMpegWriter(fps=self.fps)
+        self.anim.save(path, writer=writer, dpi=dpi)
@@ -0,0 +1,96 @@
+# 刚体变换(SE3)：3x3旋转矩阵 + 平移向量
+# 代替tools.utils中的4x4齐次矩阵，逆变换用闭式解 (R^T, -R^T p)
+# 角度参数可以是标量，也可以是数组(批量)：
+#   rotate_x(0.1).rot.shape       == (3, 3)
+#   rotate_x(np.zeros(N)).rot.shape == (N, 3, 3)
+import numpy as np
+
+
+class Transform:
+    __slots__ = ('rot', 'pos')
+
+    def __init__(self, rot, pos):
+        self.rot = rot              # (..., 3, 3)
+        self.pos = pos              # (..., 3)
+
+    @property
+    def batched(self):
+        return self.rot.ndim > 2
+
+    # 复合变换 self * other
+    def dot(self, other):
+        if self.batched or other.batched:
+            rot = np.matmul(self.rot, other.rot)
+            pos = np.einsum('...ij,...j->...i', self.rot, other.pos) + self.pos
+        else:
+            rot = self.rot.dot(other.rot)
+            pos = self.rot.dot(other.pos) + self.pos
+        return Transform(rot, pos)
+
+    __matmul__ = dot
+
+    def inv(self):
+        rot_t = np.swapaxes(self.rot, -1, -2)
+        if self.batched:
+            pos = -np.einsum('...ij,...j->...i', rot_t, self.pos)
+        else:
+            pos = -rot_t.dot(self.pos)
+        return Transform(rot_t, pos)
+
+    # 作用于点 pt: (..., 3)
+    def apply(self, pt):
+        if self.batched or np.ndim(pt) > 1:
+            return np.einsum('...ij,...j->...i', self.rot, pt) + self.pos
+        return self.rot.dot(pt) + self.pos
+
+    # 逆变换作用于点，不需要构造逆变换
+    def apply_inv(self, pt):
+        if self.batched or np.ndim(pt) > 1:
+            return np.einsum('...ji,...j->...i', self.rot, pt - self.pos)
+        return (pt - self.pos).dot(self.rot)
+
+    # 4x4齐次矩阵，用于与旧代码对照
+    def matrix(self):
+        mat = np.zeros(self.rot.shape[:-2] + (4, 4))
+        mat[..., 0:3, 0:3] = self.rot
+        mat[..., 0:3, 3] = self.pos
+        mat[..., 3, 3] = 1.0
+        return mat
+
+
+def _rotation(c, s, i, j):
+    rot = np.zeros(np.shape(c) + (3, 3))
+    k = 3 - i - j
+    rot[..., k, k] = 1.0
+    rot[..., i, i] = c
+    rot[..., i, j] = -s
+    rot[..., j, i] = s
+    rot[..., j, j] = c
+    return rot
+
+
+def rotate_x(alpha):
+    rot = _rotation(np.cos(alpha), np.sin(alpha), 1, 2)
+    return Transform(rot, np.zeros(rot.shape[:-1]))
+
+
+def rotate_y(beta):
+    rot = _rotation(np.cos(beta), np.sin(beta), 2, 0)
+    return Transform(rot, np.zeros(rot.shape[:-1]))
+
+
+def rotate_z(gamma):
+    rot = _rotation(np.cos(gamma), np.sin(gamma), 0, 1)
+    return Transform(rot, np.zeros(rot.shape[:-1]))
+
+
+# x, y, z 可以是标量或同样长度的数组
+def trans_xyz(x, y, z):
+    pos = np.stack(np.broadcast_arrays(x, y, z), axis=-1).astype(np.float64)
+    rot = np.zeros(pos.shape[:-1] + (3, 3))
+    rot[..., 0, 0] = rot[..., 1, 1] = rot[..., 2, 2] = 1.0
+    return Transform(rot, pos)
+
+
+def identity():
+    return Transform(np.eye(3), np.zeros(3))
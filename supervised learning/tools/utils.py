@@ -12,6 +12,7 @@ def box_inertia(shape, m):
 
 
 # 这种写法不是很有效率，暂时用一下
+# 运动学计算请使用tools.transform，避免4x4矩阵和通用求逆
 def rotate_x(alpha):
     ca = np.cos(alpha)
     sa = np.sin(alpha)
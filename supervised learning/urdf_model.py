@@ -0,0 +1,137 @@
+# ----------------------------------------
+# 文件描述：由URDF生成rbd_numpy的树模型，保证与pybullet加载的模型一致
+# 1. 转动('revolute', 'continuous') / 移动('prismatic')关节各对应一个body
+# 2. 固定关节('fixed')的子link并入父body(惯量合并)，同时记为父body上的frame
+# 3. 根link：floating_base=True时接浮动基座(rx, ry, rz, tx, ty, tz)，否则固定在基座上
+# 4. 结果按文件内容的hash缓存为npz，文件不变时跳过XML解析与建模
+# ----------------------------------------
+import os
+import hashlib
+import xml.etree.ElementTree as ET
+import numpy as np
+
+from rbd_numpy import TreeModel, ContactSet, spatial_transform, spatial_inertia
+
+cache_version = 1
+biped_urdf = './models/bipedRobotOne.urdf'
+atlas_urdf = '../model/atlas.urdf'
+joint_types = {'revolute': 'R', 'continuous': 'R', 'prismatic': 'P', 'fixed': 'F'}
+
+
+# URDF的rpy：R = Rz(yaw) Ry(pitch) Rx(roll)
+def rpy_matrix(rpy):
+    r, p, y = rpy
+    cr, sr, cp, sp, cy, sy = np.cos(r), np.sin(r), np.cos(p), np.sin(p), np.cos(y), np.sin(y)
+    return np.array([[cy * cp, cy * sp * sr - sy * cr, cy * sp * cr + sy * sr],
+                     [sy * cp, sy * sp * sr + cy * cr, sy * sp * cr - cy * sr],
+                     [-sp, cp * sr, cp * cr]])
+
+
+def _vec(elem, attr, default):
+    if elem is None or elem.get(attr) is None:
+        return np.array(default, dtype=np.float64)
+    return np.array([float(v) for v in elem.get(attr).split()])
+
+
+# 子坐标系相对父坐标系的 (E, r)，E为父到子的坐标变换(rbdl约定)
+def _origin(elem):
+    origin = None if elem is None else elem.find('origin')
+    return rpy_matrix(_vec(origin, 'rpy', [0., 0., 0.])).T, _vec(origin, 'xyz', [0., 0., 0.])
+
+
+# link坐标系下的空间惯量，文件中没有定义的link按无质量处理
+def _link_inertia(link):
+    inertial = None if link is None else link.find('inertial')
+    if inertial is None:
+        return np.zeros((6, 6))
+    mass = float(inertial.find('mass').get('value'))
+    E, com = _origin(inertial)
+    i = inertial.find('inertia')
+    get = lambda k: float(i.get(k, 0.0))
+    ic = np.array([[get('ixx'), get('ixy'), get('ixz')],
+                   [get('ixy'), get('iyy'), get('iyz')],
+                   [get('ixz'), get('iyz'), get('izz')]])
+    # 惯量在质心坐标系下给出，转到link坐标系
+    return spatial_inertia(mass, com, E.T.dot(ic).dot(E))
+
+
+def parse_urdf(path, floating_base=True, gravity=(0.0, 0.0, -9.81)):
+    root = ET.parse(path).getroot()
+    links = {link.get('name'): link for link in root.findall('link')}
+    joints = root.findall('joint')
+    children = {}
+    child_names = set()
+    for joint in joints:
+        children.setdefault(joint.find('parent').get('link'), []).append(joint)
+        child_names.add(joint.find('child').get('link'))
+    roots = [name for name in links if name not in child_names]
+    if len(roots) != 1:
+        raise ValueError('URDF must have exactly one root link, got %s' % roots)
+
+    model = TreeModel(gravity=gravity)
+    inertia = {}
+    if floating_base:
+        base = model.add_floating_base(-1, np.zeros(3), np.zeros((6, 6)), name=roots[0])
+    else:
+        base = -1
+    # link_frame[name] = (body, E, r)：link坐标系在所属body中的位置
+    link_frame = {roots[0]: (base, np.eye(3), np.zeros(3))}
+    inertia[base] = _link_inertia(links[roots[0]])
+    # 深度优先，按文件中的关节顺序编号(与pybullet的link序号一致)
+    stack = list(reversed(children.get(roots[0], [])))
+    while stack:
+        joint = stack.pop()
+        jtype = joint.get('type')
+        if jtype not in joint_types:
+            raise ValueError('unsupported joint type: %s (%s)' % (jtype, joint.get('name')))
+        body, E_p, r_p = link_frame[joint.find('parent').get('link')]
+        child = joint.find('child').get('link')
+        E_j, r_j = _origin(joint)
+        E, r = E_j.dot(E_p), r_p + E_p.T.dot(r_j)
+        if joint_types[jtype] == 'F':
+            link_frame[child] = (body, E, r)
+            model.add_frame(child, body, r, E)
+            X = spatial_transform(E, r)
+            inertia[body] = inertia[body] + X.T.dot(_link_inertia(links.get(child))).dot(X)
+        else:
+            axis = _vec(joint.find('axis'), 'xyz', [1., 0., 0.])
+            idx = model.add_body(body, r, joint_types[jtype], axis, np.zeros((6, 6)), E=E, name=child)
+            link_frame[child] = (idx, np.eye(3), np.zeros(3))
+            inertia[idx] = _link_inertia(links.get(child))
+        stack.extend(reversed(children.get(child, [])))
+    for idx, value in inertia.items():
+        if idx >= 0:
+            model.inertia[idx] = value
+    return model
+
+
+# 带缓存的加载，缓存文件名含URDF内容的hash
+def load_urdf_model(path, floating_base=True, cache_dir='./data/urdf_cache'):
+    with open(path, 'rb') as f:
+        digest = hashlib.sha1(f.read())
+    digest.update(('%d-%d' % (cache_version, floating_base)).encode('utf-8'))
+    stem = os.path.splitext(os.path.basename(path))[0]
+    cache_path = os.path.join(cache_dir, '%s_%s.npz' % (stem, digest.hexdigest()[:16]))
+    if os.path.exists(cache_path):
+        return TreeModel.load(cache_path)
+    model = parse_urdf(path, floating_base)
+    os.makedirs(cache_dir, exist_ok=True)
+    model.save(cache_path)
+    return model
+
+
+# 与rbdl_biped.biped_model_create的返回值相同，参数全部来自URDF
+# 接触点为足端球的最低点
+def biped_model_from_urdf(path=biped_urdf, foot_radius=0.025):
+    model = load_urdf_model(path)
+    cs_left, cs_right = ContactSet(), ContactSet()
+    for cs, foot in ((cs_left, 'left-foot'), (cs_right, 'right-foot')):
+        body, E, r = model.frames[foot]
+        c_point = r + E.T.dot([0., 0., -foot_radius])
+        cs.add_constraint(body, c_point, [1., 0., 0.], 'ground_x')
+        cs.add_constraint(body, c_point, [0., 1., 0.], 'ground_y')
+        cs.add_constraint(body, c_point, [0., 0., 1.], 'ground_z')
+    lid = [model.body_id(name) for name in ('torso-base',
+                                            'left-block', 'left-thigh', 'left-shank',
+                                            'right-block', 'right-thigh', 'right-shank')]
+    return model, cs_left, cs_right, lid
@@ -0,0 +1,97 @@
+import numpy as np
+from scipy.integrate import ode
+from scipy.linalg import expm
+
+# Co-simulation steppers for closed-loop control scripts.
+#
+# A controller computes u at the start of each interval and the plant is
+# integrated to the end of the interval with u held constant (zero-order
+# hold). Calling odeint for every interval restarts the solver each time.
+# These steppers keep their state between calls instead (OdeStepper only
+# partly, see below):
+#
+#   sim = OdeStepper(f, x0, t0, args=(...))   # f(x, t, u, *args), odeint style
+#   x = sim.advance(t_next, u)
+#
+#   sim = LinearZohStepper(A, B, x0)          # xdot = A x + B u
+#   x = sim.advance(t_next, u)                # exact discretisation
+
+
+class OdeStepper:
+    # One scipy.integrate.ode object (dopri5 or dop853) is kept for the
+    # whole run and u is passed in as its f_params. These Runge-Kutta
+    # codes stop exactly at t_next, so the old u is never used past the
+    # switching time. lsoda/vode step past t_next and interpolate back,
+    # which is wrong once u jumps, so they are rejected.
+    #
+    # Limitation: only the state and the Python/Fortran setup carry over.
+    # The step-size history does not: the Fortran code picks its first step
+    # afresh on every call, so each interval starts with a step-size search
+    # as odeint does. The public API can only seed the step by rebuilding
+    # the integrator (set_integrator(first_step=...)); that was measured
+    # slower on both benchmark loops and did not reliably save rhs calls
+    # (mass point +58%, CSTR -12%), so it is not done. The gain over the
+    # odeint loop is the avoided per-call setup, not warm step sizes.
+    methods = ('dopri5', 'dop853')
+
+    def __init__(self, f, x0, t0=0.0, args=(), method='dopri5', rtol=1e-8, atol=1e-8):
+        if method not in self.methods:
+            raise ValueError('method must be one of %s, got %s' % (self.methods, method))
+        self.f = f
+        self.args = args
+        self.solver = ode(self._rhs).set_integrator(method, rtol=rtol, atol=atol, nsteps=100000)
+        self.solver.set_initial_value(np.array(x0, dtype=float), t0)
+
+    def _rhs(self, t, x, u):
+        return self.f(x, t, u, *self.args)
+
+    @property
+    def t(self):
+        return self.solver.t
+
+    @property
+    def x(self):
+        return self.solver.y.copy()
+
+    # integrate to t_next with u held constant, return the state at t_next
+    def advance(self, t_next, u):
+        s = self.solver
+        if t_next <= s.t:
+            return self.x
+        s.set_f_params(u)
+        x = s.integrate(t_next)
+        if not s.successful():
+            raise RuntimeError('integration failed at t=%g' % s.t)
+        return x.copy()
+
+
+class LinearZohStepper:
+    # xdot = A x + B u, u constant over each interval:
+    #   x(t + dt) = Ad x(t) + Bd u,  [[Ad, Bd], [0, I]] = expm([[A, B], [0, 0]] dt)
+    # Ad, Bd are cached for each distinct dt.
+
+    def __init__(self, A, B, x0, t0=0.0):
+        self.A = np.atleast_2d(np.asarray(A, dtype=float))
+        self.B = np.asarray(B, dtype=float).reshape(self.A.shape[0], -1)
+        self.x = np.array(x0, dtype=float)
+        self.t = t0
+        self._cache = {}
+
+    def discretise(self, dt):
+        key = round(dt, 12)
+        if key not in self._cache:
+            n, m = self.B.shape
+            M = np.zeros((n + m, n + m))
+            M[:n, :n] = self.A
+            M[:n, n:] = self.B
+            E = expm(M * dt)
+            self._cache[key] = (E[:n, :n], E[:n, n:])
+        return self._cache[key]
+
+    def advance(self, t_next, u):
+        dt = t_next - self.t
+        if dt > 0:
+            Ad, Bd = self.discretise(dt)
+            self.x = Ad.dot(self.x) + Bd.dot(np.atleast_1d(u))
+            self.t = t_next
+        return self.x.copy()
@@ -0,0 +1,113 @@
+import time
+import numpy as np
+from scipy.integrate import odeint
+
+from cosim import OdeStepper, LinearZohStepper
+from cstr_model import cstr
+
+# Benchmark: per-interval odeint restarts vs the co-simulation steppers.
+# Both plants run in closed loop, so every integrator sees exactly the same
+# controller. Errors are measured against a tight-tolerance reference.
+#
+# OdeStepper does not carry step sizes across intervals (see cosim.py): its
+# lead over the odeint loop comes from skipping odeint's per-call setup and
+# from dopri5 stopping exactly at each switch, not from a warm integrator.
+# Only LinearZohStepper avoids the per-interval integration altogether.
+
+
+# mass point driven by a force, states: x, v
+def mass_point(x, t, f, m):
+    return [x[1], f / m]
+
+
+# ------------------------------------------------------------------
+# closed loops; make_step(x0, args) returns step(t0, t1, u) -> x(t1)
+# ------------------------------------------------------------------
+# PID tracking sin(t), as in old_version/test.py::mass_point_control_test
+def mass_point_loop(make_step, sim_time=8.0, dt=0.01, kp=20.0, ki=1.0, kd=9.0):
+    n = int(round(sim_time / dt))
+    step = make_step([0.0, 0.0], (1.0,))
+    x = np.zeros((n + 1, 2))
+    e_last, ie = 0.0, 0.0
+    for i in range(n):
+        e = np.sin(i * dt) - x[i, 0]
+        ie += e * dt
+        f = kp * e + ki * ie + kd * (e - e_last) / dt
+        e_last = e
+        x[i + 1] = step(i * dt, (i + 1) * dt, f)
+    return x
+
+
+# PI temperature control with set-point steps, as in part4_PI_control.py
+def cstr_loop(make_step, Kc=4.61730615181, tauI=0.913444964569):
+    t = np.linspace(0, 25, 251)
+    sp = np.where(t < 8, 300.0, np.where(t < 15, 320.0, 280.0))
+    step = make_step([0.87725294608097, 324.475443431599], (350.0, 1.0))
+    x = np.zeros((len(t), 2))
+    x[0] = [0.87725294608097, 324.475443431599]
+    ie = 0.0
+    for i in range(len(t) - 1):
+        dt = t[i + 1] - t[i]
+        e = sp[i] - x[i, 1]
+        ie += e * dt
+        op = 300.0 + Kc * e + Kc / tauI * ie
+        if op > 350.0 or op < 250.0:
+            op = min(max(op, 250.0), 350.0)
+            ie -= e * dt
+        x[i + 1] = step(t[i], t[i + 1], op)
+    return x
+
+
+def odeint_stepper(f, rtol=None):
+    def make_step(x0, args):
+        state = {'x': np.array(x0, dtype=float)}
+
+        def step(t0, t1, u):
+            kw = {} if rtol is None else {'rtol': rtol, 'atol': rtol}
+            state['x'] = odeint(f, state['x'], [t0, t1], args=(u,) + args, **kw)[-1]
+            return state['x']
+        return step
+    return make_step
+
+
+def ode_stepper(f, **opts):
+    def make_step(x0, args):
+        sim = OdeStepper(f, x0, 0.0, args=args, **opts)
+        return lambda t0, t1, u: sim.advance(t1, u)
+    return make_step
+
+
+def mass_point_zoh(x0, args):
+    m = args[0]
+    sim = LinearZohStepper([[0.0, 1.0], [0.0, 0.0]], [[0.0], [1.0 / m]], x0)
+    return lambda t0, t1, u: sim.advance(t1, u)
+
+
+def run(name, loop, variants, reference, repeat=3):
+    print('%s' % name)
+    print('  %-26s %10s %12s' % ('integrator', 'time (ms)', 'max error'))
+    for label, make_step in variants:
+        best = np.inf
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            x = loop(make_step)
+            best = min(best, time.perf_counter() - t0)
+        print('  %-26s %10.2f %12.3e' % (label, best * 1e3, np.abs(x - reference).max()))
+
+
+if __name__ == '__main__':
+    ref = mass_point_loop(mass_point_zoh)              # exact for a linear plant
+    run('mass point, 800 intervals of 10 ms', mass_point_loop, [
+        ('odeint restart', odeint_stepper(mass_point)),
+        ('odeint restart, rtol 1e-10', odeint_stepper(mass_point, 1e-10)),
+        ('OdeStepper dopri5', ode_stepper(mass_point)),
+        ('LinearZohStepper (expm)', mass_point_zoh),
+    ], ref)
+
+    ref = cstr_loop(odeint_stepper(cstr, 1e-12))
+    run('CSTR, 250 intervals of 0.1 min', cstr_loop, [
+        ('odeint restart', odeint_stepper(cstr)),
+        ('odeint restart, rtol 1e-10', odeint_stepper(cstr, 1e-10)),
+        ('OdeStepper dopri5', ode_stepper(cstr)),
+        ('OdeStepper dop853', ode_stepper(cstr, method='dop853')),
+    ], ref)
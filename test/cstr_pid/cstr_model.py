@@ -0,0 +1,151 @@
+import math
+import numpy as np
+from scipy import sparse
+from scipy.integrate import solve_ivp
+
+# CSTR model shared by the part* scripts.
+#
+# States (2):    Ca - concentration of A in CSTR (mol/m^3)
+#                T  - temperature in CSTR (K)
+# Inputs (3):    Tc - temperature of cooling jacket (K)
+#                Tf - feed temperature (K)
+#                Caf - feed concentration (mol/m^3)
+#
+# The parameters are fixed when the model is created. x may be a single
+# state (2,) or a batch of reactors (N, 2); u, Tf and Caf are scalars or
+# (N,) arrays. Results have the same leading shape as x.
+#
+#   model = CstrModel()
+#   xdot = model.rhs(x, u)                 # (N, 2)
+#   J = model.jacobian(x, u)               # (N, 2, 2)
+#   xs = model.simulate(x0, u, t)          # (len(t), N, 2), one solver call
+
+
+class CstrModel:
+    def __init__(self, q=100.0, V=100.0, rho=1000.0, Cp=0.239, mdelH=5e4, EoverR=8750.0,
+                 k0=7.2e10, UA=5e4, Tf=350.0, Caf=1.0):
+        self.q = q              # Volumetric Flowrate (m^3/sec)
+        self.V = V              # Volume of CSTR (m^3)
+        self.rho = rho          # Density of A-B Mixture (kg/m^3)
+        self.Cp = Cp            # Heat capacity of A-B Mixture (J/kg-K)
+        self.mdelH = mdelH      # Heat of reaction for A->B (J/mol)
+        self.EoverR = EoverR    # E/R, activation energy over gas constant (K)
+        self.k0 = k0            # Pre-exponential factor (1/sec)
+        self.UA = UA            # Overall heat transfer coefficient times area (W/K)
+        self.Tf = Tf            # default feed temperature (K)
+        self.Caf = Caf          # default feed concentration (mol/m^3)
+        # lumped coefficients
+        self.a = q / V                      # dilution rate
+        self.b = mdelH / (rho * Cp)         # adiabatic temperature rise per mol
+        self.c = UA / V / rho / Cp          # jacket heat transfer rate
+
+    # constructor arguments, e.g. for run metadata
+    def params(self):
+        return {name: getattr(self, name) for name in
+                ('q', 'V', 'rho', 'Cp', 'mdelH', 'EoverR', 'k0', 'UA', 'Tf', 'Caf')}
+
+    def _feed(self, Tf, Caf):
+        return (self.Tf if Tf is None else Tf), (self.Caf if Caf is None else Caf)
+
+    # reaction rate constant k(T) and rate rA = k Ca
+    def rate(self, x):
+        x = np.asarray(x, dtype=float)
+        k = self.k0 * np.exp(-self.EoverR / x[..., 1])
+        return k, k * x[..., 0]
+
+    def rhs(self, x, u, Tf=None, Caf=None):
+        x = np.asarray(x, dtype=float)
+        Tf, Caf = self._feed(Tf, Caf)
+        if x.ndim == 1:
+            # single reactor (odeint callbacks): plain floats beat tiny array ops
+            Ca, T = x.tolist()
+            rA = self.k0 * math.exp(-self.EoverR / T) * Ca
+            return np.array([self.a * (Caf - Ca) - rA,
+                             self.a * (Tf - T) + self.b * rA + self.c * (u - T)])
+        Ca, T = x[..., 0], x[..., 1]
+        rA = self.rate(x)[1]
+        xdot = np.empty(x.shape)
+        xdot[..., 0] = self.a * (Caf - Ca) - rA
+        xdot[..., 1] = self.a * (Tf - T) + self.b * rA + self.c * (u - T)
+        return xdot
+
+    # d rhs / d x, (2, 2) or (N, 2, 2)
+    def jacobian(self, x, u=None, Tf=None, Caf=None):
+        x = np.asarray(x, dtype=float)
+        k, rA = self.rate(x)
+        drdT = rA * self.EoverR / x[..., 1] ** 2
+        J = np.empty(x.shape[:-1] + (2, 2))
+        J[..., 0, 0] = -self.a - k
+        J[..., 0, 1] = -drdT
+        J[..., 1, 0] = self.b * k
+        J[..., 1, 1] = -self.a - self.c + self.b * drdT
+        return J
+
+    # d rhs / d [Tc, Tf, Caf], constant
+    def input_jacobian(self):
+        return np.array([[0.0, 0.0, self.a],
+                         [self.c, self.a, 0.0]])
+
+    # linear model around (x, u): dx' = A dx + B du, B for the cooling temperature only
+    def linearise(self, x, u, Tf=None, Caf=None):
+        return self.jacobian(x, u, Tf, Caf), self.input_jacobian()[:, 0:1].copy()
+
+    # steady state for jacket temperature u (Newton, batched), x_guess (2,) or (N, 2)
+    def steady_state(self, u, x_guess=(0.87725294608097, 324.475443431599), Tf=None, Caf=None,
+                     tol=1e-10, max_iter=50):
+        u = np.asarray(u, dtype=float)
+        x = np.array(np.broadcast_to(x_guess, u.shape + (2,)), dtype=float)
+        for _ in range(max_iter):
+            f = self.rhs(x, u, Tf, Caf)
+            dx = np.linalg.solve(self.jacobian(x, u, Tf, Caf), f[..., None])[..., 0]
+            x -= dx
+            if np.abs(dx).max() < tol * max(1.0, np.abs(x).max()):
+                return x
+        raise RuntimeError('steady state did not converge')
+
+    # ---- flat interface for scipy solvers, y = x.ravel() with x (N, 2) ----
+    def ivp_rhs(self, t, y, u, Tf=None, Caf=None):
+        return self.rhs(y.reshape(-1, 2), u, Tf, Caf).ravel()
+
+    # block-diagonal Jacobian of ivp_rhs
+    def ivp_jac(self, t, y, u, Tf=None, Caf=None):
+        J = self.jacobian(y.reshape(-1, 2), u, Tf, Caf)
+        return sparse.block_diag(list(J), format='csc') if len(J) > 1 else J[0]
+
+    # same Jacobian in LSODA banded storage (lband = uband = 1)
+    def ivp_jac_banded(self, t, y, u, Tf=None, Caf=None):
+        J = self.jacobian(y.reshape(-1, 2), u, Tf, Caf)
+        banded = np.zeros((3, y.size))
+        banded[0, 1::2] = J[:, 0, 1]
+        banded[1, 0::2] = J[:, 0, 0]
+        banded[1, 1::2] = J[:, 1, 1]
+        banded[2, 0:-1:2] = J[:, 1, 0]
+        return banded
+
+    # integrate N reactors together over t with u, Tf, Caf held constant
+    # returns (len(t), N, 2), or (len(t), 2) for a single x0
+    def simulate(self, x0, u, t, Tf=None, Caf=None, method='LSODA', rtol=1e-8, atol=1e-8):
+        x0 = np.asarray(x0, dtype=float)
+        single = x0.ndim == 1
+        x0 = np.atleast_2d(x0)
+        args = (u, Tf, Caf)
+        if method == 'LSODA':
+            opts = {'jac': self.ivp_jac_banded, 'lband': 1, 'uband': 1}
+        elif method in ('BDF', 'Radau'):
+            opts = {'jac': self.ivp_jac}
+        else:
+            opts = {}
+        sol = solve_ivp(self.ivp_rhs, (t[0], t[-1]), x0.ravel(), method=method, t_eval=t, args=args,
+                        rtol=rtol, atol=atol, **opts)
+        if not sol.success:
+            raise RuntimeError(sol.message)
+        xs = sol.y.T.reshape(len(t), -1, 2)
+        return xs[:, 0] if single else xs
+
+
+default_model = CstrModel()
+
+
+# odeint style function used by the part* scripts
+def cstr(x, t, u, Tf, Caf):
+    return default_model.rhs(x, u, Tf, Caf)
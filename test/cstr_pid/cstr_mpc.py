@@ -0,0 +1,163 @@
+import time
+import numpy as np
+from scipy.linalg import cho_factor, cho_solve
+
+from cosim import LinearZohStepper
+from cstr_model import default_model
+
+# Linear MPC for the CSTR temperature loop
+#
+# Model: the CSTR linearised at (Ca_ss, T_ss, u_ss) and discretised exactly
+# for a held jacket temperature (cosim.LinearZohStepper). All variables are
+# deviations from the operating point.
+#
+# Decision variables: the next Nc jacket temperatures U (held after Nc),
+# predicted reactor temperature over Np steps
+#
+#   Y = Phi x + Gamma U + d
+#   J = q |Y - r|^2 + w |D U - e1 u_prev|^2          (D: first differences)
+#     = 1/2 U' H U + f' U + const
+#   op_lo <= u_ss + U <= op_hi
+#
+# H, Phi, Gamma and the maps from (x, d, r, u_prev) to f are built and H is
+# Cholesky factorised once, in __init__. Each step then only forms f. If the
+# unconstrained minimiser is inside the box it is the answer; otherwise the
+# box-constrained QP is solved by a primal-dual active set method (a few
+# small reduced solves), warm-started from the previous solution and bound
+# multipliers shifted by one step, with accelerated projected gradient
+# (FISTA) as a fallback.
+#
+# Offset-free tracking (DMC): an internal copy of the linear model runs on the
+# applied inputs, and d = measured T - model T is held constant over the horizon.
+#
+#   mpc = CstrMpc(dt)
+#   u = mpc.step(x_measured, sp)         # absolute jacket temperature
+#   print(mpc.timing_report())
+
+
+class CstrMpc:
+    def __init__(self, dt, model=default_model, u_ss=300.0, x_ss=None, Np=30, Nc=10, q=1.0, w=0.05,
+                 op_lo=250.0, op_hi=350.0, pdas_iter=20, tol=1e-8, max_iter=2000):
+        self.dt = dt
+        self.u_ss = u_ss
+        self.x_ss = model.steady_state(u_ss) if x_ss is None else np.asarray(x_ss, dtype=float)
+        self.Np, self.Nc = Np, Nc
+        self.lo, self.hi = op_lo - u_ss, op_hi - u_ss
+        self.pdas_iter, self.tol, self.max_iter = pdas_iter, tol, max_iter
+
+        A, B = model.linearise(self.x_ss, u_ss)
+        self.Ad, self.Bd = LinearZohStepper(A, B, np.zeros(2)).discretise(dt)
+        self.Bd = self.Bd[:, 0]
+        C = np.array([0.0, 1.0])
+
+        # condensed prediction: y[k] = C Ad^k x + sum_j C Ad^(k-1-j) Bd u[min(j, Nc-1)]
+        Phi = np.empty((Np, 2))
+        markov = np.empty(Np)                       # C Ad^i Bd
+        Ak = np.eye(2)
+        for i in range(Np):
+            markov[i] = C.dot(Ak).dot(self.Bd)
+            Ak = self.Ad.dot(Ak)
+            Phi[i] = C.dot(Ak)
+        Gamma = np.zeros((Np, Nc))
+        for k in range(Np):
+            for j in range(k + 1):
+                Gamma[k, min(j, Nc - 1)] += markov[k - j]
+        D = np.eye(Nc) - np.eye(Nc, k=-1)
+        self.Phi, self.Gamma = Phi, Gamma
+
+        self.H = q * Gamma.T.dot(Gamma) + w * D.T.dot(D)
+        self.H_chol = cho_factor(self.H)
+        self.L = np.linalg.eigvalsh(self.H)[-1]     # gradient Lipschitz constant
+        # f = Fx x + Fd d + Fr r + Fu u_prev
+        self.Fx = q * Gamma.T.dot(Phi)
+        self.Fd = q * Gamma.sum(axis=0)
+        self.Fr = -q * Gamma.T
+        self.Fu = -w * D[0]
+
+        self.x_model = np.zeros(2)
+        self.d = 0.0
+        self.U = np.zeros(Nc)
+        self.mu = np.zeros(Nc)                      # bound multipliers, for warm starts
+        self.u_prev = 0.0
+        self.times = []
+        self.iterations = []
+
+    def reset(self):
+        self.x_model[:] = 0.0
+        self.d = 0.0
+        self.U[:] = 0.0
+        self.mu[:] = 0.0
+        self.u_prev = 0.0
+        self.times, self.iterations = [], []
+
+    # box-constrained QP by primal-dual active set, warm-started from U0 and
+    # the previous multipliers; FISTA if the active set keeps changing
+    def solve_qp(self, f, U0, mu0=None):
+        H, lo, hi = self.H, self.lo, self.hi
+        U = np.clip(U0, lo, hi)
+        mu = np.zeros(self.Nc) if mu0 is None else mu0.copy()
+        c = self.L
+        active = None
+        for it in range(1, self.pdas_iter + 1):
+            at_hi = U + mu / c > hi
+            at_lo = U + mu / c < lo
+            new_active = (at_hi, at_lo)
+            if active is not None and (at_hi == active[0]).all() and (at_lo == active[1]).all():
+                return U, mu, it
+            active = new_active
+            free = ~(at_hi | at_lo)
+            U = np.where(at_hi, hi, np.where(at_lo, lo, 0.0))
+            if free.any():
+                rhs = -(f[free] + H[np.ix_(free, ~free)].dot(U[~free]))
+                U[free] = np.linalg.solve(H[np.ix_(free, free)], rhs)
+            mu = -(H.dot(U) + f)
+            mu[free] = 0.0
+        U, it2 = self._fista(f, np.clip(U, lo, hi))
+        return U, np.zeros(self.Nc), self.pdas_iter + it2
+
+    def _fista(self, f, U):
+        V, s = U.copy(), 1.0
+        step = 1.0 / self.L
+        for it in range(1, self.max_iter + 1):
+            U_next = np.clip(V - step * (self.H.dot(V) + f), self.lo, self.hi)
+            s_next = 0.5 * (1.0 + np.sqrt(1.0 + 4.0 * s * s))
+            V = U_next + (s - 1.0) / s_next * (U_next - U)
+            delta = np.abs(U_next - U).max()
+            U, s = U_next, s_next
+            if delta < self.tol:
+                break
+        return U, it
+
+    # x: measured state (Ca, T), sp: set point, scalar or (Np,) preview
+    # returns the jacket temperature to hold over the next interval
+    def step(self, x, sp):
+        t0 = time.perf_counter()
+        self.d = (x[1] - self.x_ss[1]) - self.x_model[1]
+        r = np.broadcast_to(np.asarray(sp, dtype=float) - self.x_ss[1], (self.Np,))
+        f = self.Fx.dot(self.x_model) + self.Fd * self.d + self.Fr.dot(r) + self.Fu * self.u_prev
+        U = -cho_solve(self.H_chol, f)
+        iters = 0
+        if U.min() < self.lo or U.max() > self.hi:
+            warm, mu = np.empty(self.Nc), np.empty(self.Nc)
+            warm[0:-1], warm[-1] = self.U[1:], self.U[-1]
+            mu[0:-1], mu[-1] = self.mu[1:], self.mu[-1]
+            U, self.mu, iters = self.solve_qp(f, warm, mu)
+        else:
+            self.mu[:] = 0.0
+        self.U = U
+        u = U[0]
+        self.x_model = self.Ad.dot(self.x_model) + self.Bd * u
+        self.u_prev = u
+        self.times.append(time.perf_counter() - t0)
+        self.iterations.append(iters)
+        return self.u_ss + u
+
+    def timing_report(self):
+        if not self.times:
+            return 'no MPC steps'
+        us = np.array(self.times) * 1e6
+        it = np.array(self.iterations)
+        return ('MPC %d steps: mean %.1f us, median %.1f us, p99 %.1f us, max %.1f us; '
+                'constrained steps %d, QP iterations mean %.1f max %d'
+                % (len(us), us.mean(), np.median(us), np.percentile(us, 99), us.max(),
+                   (it > 0).sum(), it[it > 0].mean() if (it > 0).any() else 0.0, it.max()))
@@ -0,0 +1,256 @@
+import os
+import json
+import time
+import pickle
+import hashlib
+import itertools
+import multiprocessing as mp
+import numpy as np
+
+from cosim import OdeStepper
+from cstr_model import CstrModel
+from cstr_scenarios import run_pi_scenarios
+from fopdt import fit_fopdt
+
+# Identify - tune - validate pipeline for the CSTR temperature loop
+#
+#   excite    doublet on the cooling temperature, nonlinear plant   (part1)
+#   identify  FOPDT fit of the response                             (part2)
+#   tune      IMC PI tunings over a range of closed-loop time constants tauc (part3)
+#   validate  every candidate in closed loop on the nonlinear plant over a set
+#             of set-point / feed disturbance scenarios, in parallel    (part4 - part7)
+#
+# Each stage result is cached in cache_dir under a hash of the stage settings
+# and of the results it uses, so a re-run only recomputes the stages whose
+# inputs changed. The plant used for validation can differ from the one used
+# for identification (validation_plant), e.g. to check robustness to a
+# mismatch; changing it recomputes the validation stage only.
+#
+#   pipe = CstrPipeline(plant={'UA': 5.5e4})
+#   result = pipe.run()
+#   pipe.history      # [(stage, key, 'computed' / 'cached', seconds), ...]
+
+cache_version = 1
+
+default_excitation = {
+    't_end': 25.0, 'n': 251,
+    'u_ss': 300.0,
+    'steps': [[1.0, 303.0], [10.0, 297.0], [19.0, 300.0]],     # [time, cooling temperature]
+}
+default_tuning = {
+    'tauc_factors': np.geomspace(0.05, 3.0, 16).tolist(),     # tauc = factor * taup
+    'theta_factor': 0.8,                                      # tauc >= 0.8 thetap
+}
+default_validation = {
+    't_end': 10.0, 'n': 301,
+    'sp': [[[1.0, 10.0]],                                     # set point steps [time, offset from T_ss]
+           [[1.0, -20.0]],
+           [[1.0, 5.0], [4.0, 10.0], [7.0, 15.0]]],
+    'Tf': [[],                                                # feed temperature steps [time, offset]
+           [[5.0, 5.0]],
+           [[5.0, -5.0]]],
+    'op_lo': 250.0, 'op_hi': 350.0,
+    'substeps': 2,
+}
+
+
+# piecewise constant profile on t: base, then value + offset from each [time, value]
+def step_profile(t, base, steps, offset=0.0):
+    out = np.full(len(t), float(base))
+    for t_step, value in steps:
+        out[t >= t_step] = value + offset
+    return out
+
+
+def _canonical(obj):
+    return json.dumps(obj, sort_keys=True, default=lambda o: np.asarray(o).tolist()).encode()
+
+
+# stage key: stage name, its settings and the digests of the results it depends on
+def stage_key(name, settings, upstream=()):
+    h = hashlib.sha1(('%s-%d' % (name, cache_version)).encode())
+    h.update(_canonical(settings))
+    for digest in upstream:
+        h.update(digest.encode())
+    return h.hexdigest()[:16]
+
+
+def result_digest(result):
+    return hashlib.sha1(pickle.dumps(result, protocol=4)).hexdigest()
+
+
+# ------------------------------------------------------------------
+# stages
+# ------------------------------------------------------------------
+def excite(plant, excitation):
+    model = CstrModel(**plant)
+    t = np.linspace(0, excitation['t_end'], excitation['n'])
+    u = step_profile(t, excitation['u_ss'], excitation['steps'])
+    x = np.empty((len(t), 2))
+    x[0] = model.steady_state(excitation['u_ss'])
+    # u[i+1] held over [t[i], t[i+1]], as in part1
+    sim = OdeStepper(lambda x, t, u: model.rhs(x, u), x[0], t[0])
+    for i in range(len(t) - 1):
+        x[i + 1] = sim.advance(t[i + 1], u[i + 1])
+    return {'t': t, 'u': u, 'Ca': x[:, 0], 'T': x[:, 1]}
+
+
+def identify(data):
+    best, results = fit_fopdt(data['t'], data['u'], data['T'])
+    return {'K': float(best.x[0]), 'tau': float(best.x[1]), 'theta': float(best.x[2]),
+            'sse': float(best.fun), 'starts': len(results)}
+
+
+# IMC PI rules (part3)
+def tune(fit, tuning):
+    tauc = np.maximum(np.asarray(tuning['tauc_factors']) * fit['tau'], tuning['theta_factor'] * fit['theta'])
+    Kc = (1.0 / fit['K']) * (fit['tau'] / (fit['theta'] + tauc))
+    tauI = np.full(len(tauc), fit['tau'])
+    return {'tauc': tauc, 'Kc': Kc, 'tauI': tauI}
+
+
+def validation_scenarios(validation, T_ss, Tf):
+    t = np.linspace(0, validation['t_end'], validation['n'])
+    cases = list(itertools.product(validation['sp'], validation['Tf']))
+    sp = np.array([step_profile(t, T_ss, steps, T_ss) for steps, _ in cases])
+    tf = np.array([step_profile(t, Tf, steps, Tf) for _, steps in cases])
+    return t, sp, tf
+
+
+# closed loop runs for a chunk of candidates, every candidate over every scenario
+def _validate_chunk(args):
+    plant, validation, Kc, tauI = args
+    model = CstrModel(**plant)
+    u_ss = validation.get('u_ss', default_excitation['u_ss'])
+    x0 = model.steady_state(u_ss)
+    t, sp, tf = validation_scenarios(validation, x0[1], model.Tf)
+    n_case = len(sp)
+    summary, _ = run_pi_scenarios(t, np.tile(sp, (len(Kc), 1)), np.repeat(Kc, n_case), np.repeat(tauI, n_case),
+                                  op_lo=validation['op_lo'], op_hi=validation['op_hi'], op_bias=u_ss,
+                                  Tf=np.tile(tf, (len(Kc), 1)), x0=x0, model=model,
+                                  substeps=validation['substeps'])
+    return summary.reshape(len(Kc), n_case)
+
+
+def validate(plant, validation, tuning_result, processes=1, chunk=4):
+    Kc, tauI = tuning_result['Kc'], tuning_result['tauI']
+    jobs = [(plant, validation, Kc[k:k+chunk], tauI[k:k+chunk]) for k in range(0, len(Kc), chunk)]
+    if processes > 1 and len(jobs) > 1:
+        with mp.get_context('spawn').Pool(min(processes, len(jobs))) as pool:
+            results = pool.map(_validate_chunk, jobs)
+    else:
+        results = [_validate_chunk(job) for job in jobs]
+    scenarios = np.concatenate(results)
+    iae = np.where(scenarios['runaway'], np.inf, scenarios['iae'])
+    return {'scenarios': scenarios, 'worst_iae': iae.max(axis=1), 'mean_iae': iae.mean(axis=1)}
+
+
+# ------------------------------------------------------------------
+# pipeline
+# ------------------------------------------------------------------
+class CstrPipeline:
+    def __init__(self, plant=None, excitation=None, tuning=None, validation=None, validation_plant=None,
+                 cache_dir='./cache', processes=None, chunk=4):
+        self.plant = dict(CstrModel().params(), **(plant or {}))
+        self.validation_plant = dict(self.plant, **(validation_plant or {}))
+        self.excitation = dict(default_excitation, **(excitation or {}))
+        self.tuning = dict(default_tuning, **(tuning or {}))
+        self.validation = dict(default_validation, **(validation or {}))
+        self.cache_dir = cache_dir
+        self.processes = processes or os.cpu_count()
+        self.chunk = chunk
+        self.history = []
+        self._done = {}
+
+    def _stage(self, name, settings, upstream, fun):
+        key = stage_key(name, settings, [result_digest(r) for r in upstream])
+        if key in self._done:
+            return self._done[key]
+        path = os.path.join(self.cache_dir, '%s_%s.pkl' % (name, key))
+        t0 = time.perf_counter()
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                result = pickle.load(f)
+            status = 'cached'
+        else:
+            result = fun()
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp = path + '.%d.tmp' % os.getpid()
+            with open(tmp, 'wb') as f:
+                pickle.dump(result, f, protocol=4)
+            os.replace(tmp, path)
+            status = 'computed'
+        self.history.append((name, key, status, time.perf_counter() - t0))
+        self._done[key] = result
+        return result
+
+    def excite(self):
+        return self._stage('excite', {'plant': self.plant, 'excitation': self.excitation}, (),
+                           lambda: excite(self.plant, self.excitation))
+
+    def identify(self):
+        data = self.excite()
+        return self._stage('identify', {}, (data,), lambda: identify(data))
+
+    def tune(self):
+        fit = self.identify()
+        return self._stage('tune', self.tuning, (fit,), lambda: tune(fit, self.tuning))
+
+    def validate(self):
+        candidates = self.tune()
+        validation = dict(self.validation, u_ss=self.excitation['u_ss'])
+        return self._stage('validate', {'plant': self.validation_plant, 'validation': validation}, (candidates,),
+                           lambda: validate(self.validation_plant, validation, candidates,
+                                            self.processes, self.chunk))
+
+    # all stages, and the candidate with the smallest worst case IAE
+    def run(self):
+        result = {'data': self.excite(), 'fit': self.identify(), 'candidates': self.tune(),
+                  'validation': self.validate()}
+        worst = result['validation']['worst_iae']
+        k = int(np.argmin(worst))
+        c = result['candidates']
+        result['best'] = {'tauc': float(c['tauc'][k]), 'Kc': float(c['Kc'][k]), 'tauI': float(c['tauI'][k]),
+                          'worst_iae': float(worst[k]), 'index': k}
+        return result
+
+    def print_history(self):
+        for name, key, status, seconds in self.history:
+            print('  %-9s %s %-8s %8.3f s' % (name, key, status, seconds))
+
+
+def print_candidates(result):
+    c, v = result['candidates'], result['validation']
+    print('%8s %8s %8s %10s %10s %8s' % ('tauc', 'Kc', 'tauI', 'worst IAE', 'mean IAE', 'runaway'))
+    for k in range(len(c['tauc'])):
+        print('%8.3f %8.3f %8.3f %10.3f %10.3f %8d' % (c['tauc'][k], c['Kc'][k], c['tauI'][k], v['worst_iae'][k],
+                                                     v['mean_iae'][k], v['scenarios']['runaway'][k].sum()))
+
+
+if __name__ == '__main__':
+    pipe = CstrPipeline()
+    result = pipe.run()
+    fit = result['fit']
+    print('FOPDT: K %.4f  tau %.4f  theta %.4f  (SSE %.2f)' % (fit['K'], fit['tau'], fit['theta'], fit['sse']))
+    print_candidates(result)
+    print('best: %s' % result['best'])
+    pipe.print_history()
+
+    # tuning range changed: excitation and identification come from the cache
+    print('\nwider tauc range')
+    pipe = CstrPipeline(tuning={'tauc_factors': np.geomspace(0.02, 5.0, 24).tolist()})
+    print('best: %s' % pipe.run()['best'])
+    pipe.print_history()
+
+    # validation plant changed (heat transfer 4% lower): only the validation stage reruns
+    print('\nvalidation on a plant with UA -4%')
+    pipe = CstrPipeline(validation_plant={'UA': 4.8e4})
+    print('best: %s' % pipe.run()['best'])
+    pipe.print_history()
+
+    # plant changed: every stage depends on it
+    # (a 4% lower UA would already ignite the reactor during the doublet)
+    print('\nplant with UA +10%')
+    pipe = CstrPipeline(plant={'UA': 5.5e4})
+    print('best: %s' % pipe.run()['best'])
+    pipe.print_history()
@@ -0,0 +1,134 @@
+import numpy as np
+
+from cstr_model import default_model
+
+# Closed-loop PI(D) campaigns on the CSTR, M scenarios simulated together.
+#
+# Every scenario has its own gains, set-point profile, feed disturbances and
+# OP limits; they share the time grid t. The controller is the one used in
+# part4 - part6 (position form, derivative on PV, integration starts on the
+# second cycle, no integration while the OP is clipped). The plant is
+# integrated with fixed-step RK4, `substeps` steps per control interval, with
+# the OP held over the interval.
+#
+#   summary, traj = run_pi_scenarios(t, sp, Kc, tauI, keep_traj=True)
+#   summary['iae']          # (M,)
+#   traj['T']               # (M, len(t))
+#
+# Kc, tauI, tauD, OP limits and bias are scalars or (M,) arrays; sp, Tf and
+# Caf are scalars, (len(t),) profiles shared by all scenarios, or (M, len(t)).
+
+summary_dtype = np.dtype([
+    ('iae', 'f8'),              # integral of |e| dt
+    ('ise', 'f8'),              # integral of e^2 dt
+    ('itae', 'f8'),             # integral of t |e| dt
+    ('max_error', 'f8'),        # max |e|
+    ('final_error', 'f8'),      # |e| at the last sample
+    ('T_max', 'f8'),            # reactor temperature range (K)
+    ('T_min', 'f8'),
+    ('op_travel', 'f8'),        # sum of |OP changes|, actuator wear
+    ('sat_fraction', 'f8'),     # fraction of intervals with the OP clipped
+    ('runaway', '?'),           # T above T_runaway or not finite
+])
+
+
+def _profile(v, m, n):
+    v = np.asarray(v, dtype=float)
+    return np.broadcast_to(v, (m, n))
+
+
+# number of scenarios: (M,) per scenario values, (M, len(t)) profiles
+def scenario_count(values, profiles):
+    m = 1
+    for v in values:
+        m = max(m, np.size(v))
+    for v in profiles:
+        if np.ndim(v) == 2:
+            m = max(m, np.shape(v)[0])
+    return m
+
+
+def run_pi_scenarios(t, sp, Kc, tauI, tauD=0.0, op_lo=250.0, op_hi=350.0, op_bias=300.0,
+                     Tf=350.0, Caf=1.0, x0=(0.87725294608097, 324.475443431599),
+                     model=default_model, substeps=2, T_runaway=400.0, keep_traj=False):
+    t = np.asarray(t, dtype=float)
+    n = len(t)
+    M = scenario_count((Kc, tauI, tauD, op_lo, op_hi, op_bias), (sp, Tf, Caf))
+    sp = _profile(sp, M, n)
+    Tf = _profile(Tf, M, n)
+    Caf = _profile(Caf, M, n)
+    Kc, tauI, tauD, op_lo, op_hi, op_bias = (np.broadcast_to(np.asarray(v, dtype=float), (M,))
+                                             for v in (Kc, tauI, tauD, op_lo, op_hi, op_bias))
+    kI = Kc / tauI
+
+    x = np.empty((M, 2))
+    x[:] = np.asarray(x0, dtype=float)
+    T = x[:, 1]
+    ie = np.zeros(M)
+    T_last = T.copy()
+    op_last = np.array(op_bias)
+    # accumulators as plain arrays, copied into the structured summary at the end
+    iae, ise, itae, max_e, op_travel, n_sat = np.zeros((6, M))
+    T_max, T_min = T.copy(), T.copy()
+    if keep_traj:
+        traj = {name: np.empty((M, n)) for name in ('Ca', 'T', 'op', 'sp')}
+        traj['Ca'][:, 0] = x[:, 0]
+        traj['T'][:, 0] = T
+        traj['sp'][:] = sp
+
+    # unstable scenarios may overflow; they are flagged as runaway instead
+    with np.errstate(over='ignore', invalid='ignore'):
+        for i in range(n - 1):
+            dt = t[i + 1] - t[i]
+            # controller
+            e = sp[:, i] - T
+            abs_e = np.abs(e)
+            iae += abs_e * dt
+            ise += e * e * dt
+            itae += t[i] * dt * abs_e
+            np.maximum(max_e, abs_e, out=max_e)
+            if i >= 1:
+                ie_new = ie + e * dt
+                op = op_bias + Kc * e + kI * ie_new
+                if tauD.any():
+                    op -= Kc * tauD * (T - T_last) / dt
+            else:
+                ie_new = ie
+                op = op_bias + Kc * e
+            sat = (op > op_hi) | (op < op_lo)
+            ie = np.where(sat, ie, ie_new)                  # anti-reset windup
+            np.clip(op, op_lo, op_hi, out=op)
+            n_sat += sat
+            op_travel += np.abs(op - op_last)
+            op_last = op
+            T_last = T
+            # plant, RK4 with the OP held
+            h = dt / substeps
+            tf, caf = Tf[:, i], Caf[:, i]
+            for _ in range(substeps):
+                k1 = model.rhs(x, op, tf, caf)
+                k2 = model.rhs(x + 0.5 * h * k1, op, tf, caf)
+                k3 = model.rhs(x + 0.5 * h * k2, op, tf, caf)
+                k4 = model.rhs(x + h * k3, op, tf, caf)
+                x = x + h / 6.0 * (k1 + 2.0 * k2 + 2.0 * k3 + k4)
+            T = x[:, 1]
+            np.maximum(T_max, T, out=T_max)
+            np.minimum(T_min, T, out=T_min)
+            if keep_traj:
+                traj['Ca'][:, i + 1] = x[:, 0]
+                traj['T'][:, i + 1] = T
+                traj['op'][:, i] = op
+    # last error sample
+    e = np.abs(sp[:, n - 1] - T)
+    s = np.zeros(M, dtype=summary_dtype)
+    s['iae'], s['ise'], s['itae'] = iae, ise, itae
+    s['max_error'] = np.maximum(max_e, e)
+    s['final_error'] = e
+    s['T_max'], s['T_min'] = T_max, T_min
+    s['op_travel'] = op_travel
+    s['sat_fraction'] = n_sat / (n - 1)
+    s['runaway'] = ~np.isfinite(T) | ~(T_max <= T_runaway)
+    if keep_traj:
+        traj['op'][:, n - 1] = traj['op'][:, n - 2]
+        return s, traj
+    return s, None
@@ -0,0 +1,173 @@
+import os
+import json
+import time
+import numpy as np
+
+# Experiment log: one binary file per run
+#
+#   magic    8 bytes   b'EXPLOG\x00\x01'
+#   length   uint32    size of the JSON header in bytes (padding included)
+#   header   JSON      {"columns": [[name, dtype], ...], "meta": {...}, "created": ...}
+#            padded with spaces so the records start on a 64 byte boundary
+#   records  packed little-endian rows of the column dtype, appended in chunks
+#
+# The row count is never stored: it follows from the file size, so a run
+# that stops early is still readable (a partly written last row is ignored).
+# Rows reach the file every `chunk` rows or `flush_interval` seconds,
+# whichever comes first, so a crashed run loses at most that much.
+#
+#   with ExpLogWriter(new_run_path('doublet'), [('t', 'f8'), ('T', 'f8')], meta) as log:
+#       log.append(t, T)
+#   data, meta = read_log(path)          # data['T'] is a memory-mapped view
+
+magic = b'EXPLOG\x00\x01'
+align = 64
+run_dir = './runs'
+run_ext = '.xlog'
+
+
+def _json_default(o):
+    if isinstance(o, np.generic):
+        return o.item()
+    if isinstance(o, np.ndarray):
+        return o.tolist()
+    raise TypeError('%s is not JSON serialisable' % type(o).__name__)
+
+
+def log_dtype(columns):
+    return np.dtype([(name, np.dtype(kind).newbyteorder('<')) for name, kind in columns])
+
+
+# unique file name runs/<prefix>_<date>-<time>_<pid>_<n>.xlog
+def new_run_path(prefix, directory=run_dir):
+    os.makedirs(directory, exist_ok=True)
+    stamp = time.strftime('%Y%m%d-%H%M%S')
+    for n in range(1000):
+        path = os.path.join(directory, '%s_%s_%d_%d%s' % (prefix, stamp, os.getpid(), n, run_ext))
+        if not os.path.exists(path):
+            return path
+    raise RuntimeError('no free run file name in %s' % directory)
+
+
+# newest run with this prefix, None if there is none
+def latest_run(prefix, directory=run_dir):
+    if not os.path.isdir(directory):
+        return None
+    runs = [os.path.join(directory, f) for f in os.listdir(directory)
+            if f.startswith(prefix + '_') and f.endswith(run_ext)]
+    return max(runs, key=os.path.getmtime) if runs else None
+
+
+class ExpLogWriter:
+    def __init__(self, path, columns, meta=None, chunk=64, flush_interval=1.0):
+        self.path = path
+        self.dtype = log_dtype(columns)
+        self.names = self.dtype.names
+        header = json.dumps({'columns': [[name, self.dtype[name].str] for name in self.names],
+                             'meta': meta or {},
+                             'created': time.strftime('%Y-%m-%d %H:%M:%S')},
+                            default=_json_default).encode()
+        pad = -(len(magic) + 4 + len(header)) % align
+        header += b' ' * pad
+        self._file = open(path, 'wb')
+        self._file.write(magic + np.uint32(len(header)).astype('<u4').tobytes() + header)
+        self._buf = np.zeros(chunk, dtype=self.dtype)
+        self._n = 0
+        self.rows = 0
+        self.flush_interval = flush_interval
+        self._last_flush = time.monotonic()
+
+    # one row, values in column order
+    def append(self, *values):
+        self._buf[self._n] = values
+        self._n += 1
+        self.rows += 1
+        if self._n == len(self._buf) or time.monotonic() - self._last_flush > self.flush_interval:
+            self.flush()
+
+    # many rows at once: a structured array, or one array per column
+    def append_rows(self, *columns):
+        if len(columns) == 1 and columns[0].dtype.names:
+            rows = np.asarray(columns[0])
+        else:
+            rows = np.empty(len(columns[0]), dtype=self.dtype)
+            for name, col in zip(self.names, columns):
+                rows[name] = col
+        self.flush()
+        self._file.write(rows.astype(self.dtype, copy=False).tobytes())
+        self.rows += len(rows)
+
+    def flush(self):
+        if self._n:
+            self._file.write(self._buf[0:self._n].tobytes())
+            self._n = 0
+        self._file.flush()
+        self._last_flush = time.monotonic()
+
+    def close(self):
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_header(path):
+    with open(path, 'rb') as f:
+        if f.read(len(magic)) != magic:
+            raise ValueError('%s is not an experiment log' % path)
+        length = int(np.frombuffer(f.read(4), dtype='<u4')[0])
+        header = json.loads(f.read(length).decode())
+    header['offset'] = len(magic) + 4 + length
+    return header
+
+
+# data: structured memmap (read only) over the records, meta: run metadata
+def read_log(path, mmap=True):
+    header = read_header(path)
+    dtype = np.dtype([(name, kind) for name, kind in header['columns']])
+    rows = (os.path.getsize(path) - header['offset']) // dtype.itemsize
+    if rows == 0:
+        data = np.zeros(0, dtype=dtype)
+    elif mmap:
+        data = np.memmap(path, dtype=dtype, mode='r', offset=header['offset'], shape=(rows,))
+    else:
+        data = np.fromfile(path, dtype=dtype, count=rows, offset=header['offset'])
+    return data, header['meta']
+
+
+if __name__ == '__main__':
+    import tempfile
+    # write and read back n rows of 5 columns, text vs binary log
+    n = 1000000
+    columns = [('t', 'f8'), ('Tc', 'f8'), ('Ca', 'f8'), ('T', 'f8'), ('sp', 'f8')]
+    values = np.random.default_rng(0).normal(size=(n, len(columns)))
+    with tempfile.TemporaryDirectory() as tmp:
+        txt, xlog = os.path.join(tmp, 'data.txt'), os.path.join(tmp, 'data' + run_ext)
+        t0 = time.perf_counter()
+        np.savetxt(txt, values, delimiter=',')
+        t1 = time.perf_counter()
+        back = np.loadtxt(txt, delimiter=',')
+        t2 = time.perf_counter()
+        with ExpLogWriter(xlog, columns, {'rows': n}) as log:
+            for k in range(0, n, 10000):
+                log.append_rows(*values[k:k+10000].T)
+        t3 = time.perf_counter()
+        data, meta = read_log(xlog)
+        total = data['T'].sum()
+        t4 = time.perf_counter()
+        size = os.path.getsize(xlog)
+        del data
+        with ExpLogWriter(xlog, columns) as log:
+            for row in values[0:100000].tolist():
+                log.append(*row)
+        t5 = time.perf_counter()
+        print('%d rows x %d columns' % (n, len(columns)))
+        print('  savetxt  %7.3f s   loadtxt %7.3f s   %6.1f MB' % (t1 - t0, t2 - t1, os.path.getsize(txt) / 1e6))
+        print('  log      %7.3f s   memmap  %7.3f s   %6.1f MB' % (t3 - t2, t4 - t3, size / 1e6))
+        print('  per-row append: %.2f us/row' % ((t5 - t4) / 100000 * 1e6))
+        assert np.allclose(total, back[:, 3].sum())
@@ -0,0 +1,104 @@
+import numpy as np
+from scipy.signal import lfilter
+from scipy.optimize import minimize
+
+# First-order plus dead-time model
+#
+#   tau dy/dt = -y + K u(t - theta)          (y, u as deviations)
+#
+# discretised exactly for an input that is held constant over each sample
+# interval. uh[k] is the input held over [t_k, t_k+1); for the data written
+# by part1 and the PI scripts this is u[k+1]. The dead time is split into
+# theta = (d + f) dt, d whole samples and a fraction f, so over one interval
+# the delayed input is uh[k-d-1] for f dt and then uh[k-d]:
+#
+#   y[k+1] = a y[k] + b1 uh[k-d-1] + b2 uh[k-d]
+#   a = exp(-dt/tau),  c = exp(-(1-f) dt/tau),  b1 = K (c - a),  b2 = K (1 - c)
+#
+# The whole response is one lfilter call. The model starts at rest and the
+# input is zero before t_0.
+
+
+def _split_delay(dt, theta):
+    theta = max(theta, 0.0)
+    d = int(np.floor(theta / dt))
+    return d, theta / dt - d
+
+
+def _shift(uh, n):
+    # uh delayed by n samples, zero before the start
+    out = np.zeros(len(uh))
+    if n < len(uh):
+        out[n:] = uh[0:len(uh) - n]
+    return out
+
+
+def fopdt_coefficients(dt, K, tau, theta):
+    d, f = _split_delay(dt, theta)
+    a = np.exp(-dt / tau)
+    c = np.exp(-(1.0 - f) * dt / tau)
+    return a, K * (c - a), K * (1.0 - c), d
+
+
+# response y (len(uh)+1,) with y[0] = 0
+# grad=True also returns dy/d[K, tau, theta], (len(uh)+1, 3)
+def fopdt_response(uh, dt, K, tau, theta, grad=False):
+    uh = np.asarray(uh, dtype=float)
+    d, f = _split_delay(dt, theta)
+    a = np.exp(-dt / tau)
+    c = np.exp(-(1.0 - f) * dt / tau)
+    v1, v2 = _shift(uh, d + 1), _shift(uh, d)
+    y = np.zeros(len(uh) + 1)
+    y[1:] = lfilter([1.0], [1.0, -a], K * (c - a) * v1 + K * (1.0 - c) * v2)
+    if not grad:
+        return y
+    # differentiate the recursion: dy[k+1] = a dy[k] + da y[k] + db1 v1[k] + db2 v2[k]
+    da_dtau = a * dt / tau ** 2
+    dc_dtau = c * (1.0 - f) * dt / tau ** 2
+    dc_dtheta = c / tau
+    forcing = np.stack([(c - a) * v1 + (1.0 - c) * v2,
+                        da_dtau * y[0:-1] + K * (dc_dtau - da_dtau) * v1 - K * dc_dtau * v2,
+                        K * dc_dtheta * (v1 - v2)])
+    dy = np.zeros((len(uh) + 1, 3))
+    dy[1:] = lfilter([1.0], [1.0, -a], forcing, axis=1).T
+    return y, dy
+
+
+# sum of squared errors between y (measured) and the model, with gradient
+def fopdt_sse(x, uh, dt, y):
+    ym, dym = fopdt_response(uh, dt, x[0], x[1], x[2], grad=True)
+    r = ym - y
+    return r.dot(r), 2.0 * r.dot(dym)
+
+
+# starting points for the multi-start fit, spread over time constant and dead time
+def default_starts(uh, y, dt, theta_max):
+    span = dt * len(uh)
+    K0 = np.ptp(y) / max(np.ptp(uh), 1e-12) * np.sign(np.dot(uh - uh.mean(), y[1:] - y[1:].mean()) or 1.0)
+    starts = []
+    for tau in span * np.array([0.01, 0.05, 0.2, 0.5]):
+        for theta in theta_max * np.array([0.0, 0.1, 0.5]):
+            starts.append([K0, max(tau, dt), theta])
+    return np.array(starts)
+
+
+# fit K, tau, theta to sampled data t, u, y (u[k+1] held over [t_k, t_k+1])
+# u0, y0: operating point, the data is assumed to start at rest there
+# returns the best scipy result and all of them
+def fit_fopdt(t, u, y, u0=None, y0=None, starts=None, bounds=None, theta_max=5.0):
+    t, u, y = (np.asarray(v, dtype=float) for v in (t, u, y))
+    dt = t[1] - t[0]
+    u0 = u[0] if u0 is None else u0
+    y0 = y[0] if y0 is None else y0
+    uh = u[1:] - u0
+    yd = y - y0
+    if bounds is None:
+        bounds = ((-1.0e10, 1.0e10), (0.01, 1.0e10), (0.0, theta_max))
+    if starts is None:
+        starts = default_starts(uh, yd, dt, bounds[2][1])
+    results = []
+    for x0 in np.atleast_2d(starts):
+        res = minimize(fopdt_sse, x0, args=(uh, dt, yd), jac=True, method='SLSQP', bounds=bounds)
+        results.append(res)
+    best = min(results, key=lambda r: r.fun)
+    return best, results
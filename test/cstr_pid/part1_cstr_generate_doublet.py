@@ -1,55 +1,9 @@
 import numpy as np
 import matplotlib.pyplot as plt
 from scipy.integrate import odeint
-
-# define CSTR model
-def cstr(x,t,u,Tf,Caf):
-    # Inputs (3):
-    # Temperature of cooling jacket (K)--控制输入
-    Tc = u
-    # Tf = Feed Temperature (K)
-    # Caf = Feed Concentration (mol/m^3)
-
-    # States (2):
-    # Concentration of A in CSTR (mol/m^3)--浓度
-    Ca = x[0]
-    # Temperature in CSTR (K)--温度
-    T = x[1]
-
-    # Parameters:
-    # Volumetric Flowrate (m^3/sec)--流量
-    q = 100
-    # Volume of CSTR (m^3)
-    V = 100
-    # Density of A-B Mixture (kg/m^3)
-    rho = 1000
-    # Heat capacity of A-B Mixture (J/kg-K)
-    Cp = 0.239
-    # Heat of reaction for A->B (J/mol)
-    mdelH = 5e4
-    # E - Activation energy in the Arrhenius Equation (J/mol)
-    # R - Universal Gas Constant = 8.31451 J/mol-K
-    EoverR = 8750
-    # Pre-exponential factor (1/sec)
-    k0 = 7.2e10
-    # U - Overall Heat Transfer Coefficient (W/m^2-K)
-    # A - Area - this value is specific for the U calculation (m^2)
-    UA = 5e4
-    # reaction rate
-    rA = k0*np.exp(-EoverR/T)*Ca
-
-    # Calculate concentration derivative
-    dCadt = q/V*(Caf - Ca) - rA
-    # Calculate temperature derivative
-    dTdt = q/V*(Tf - T) \
-            + mdelH/(rho*Cp)*rA \
-            + UA/V/rho/Cp*(Tc-T)
-    
-    # Return xdot:
-    xdot = np.zeros(2)
-    xdot[0] = dCadt
-    xdot[1] = dTdt
-    return xdot
+from cstr_model import cstr, default_model
+from exp_log import ExpLogWriter, new_run_path
+from rls_ident import FopdtRls
 
 # Steady State Initial Conditions for the States
 Ca_ss = 0.87725294608097
@@ -78,6 +32,18 @@ u[10:100] = 303.0
 u[100:190] = 297.0
 u[190:] = 300.0
 
+# Run log, one file per run (read by part2, see exp_log.py)
+# Column t = time, Tc = cooling temperature, Ca, T = reactor states
+log = ExpLogWriter(new_run_path('doublet'),[('t','f8'),('Tc','f8'),('Ca','f8'),('T','f8')],
+                   meta={'script':'part1_cstr_generate_doublet','model':default_model.params(),
+                         'Tf':Tf,'Caf':Caf})
+log.append(t[0],u[0],Ca[0],T[0])
+
+# Online FOPDT estimate, updated with every new sample (see rls_ident.py)
+rls = FopdtRls(t[1]-t[0],lam=1.0)
+rls.prime(u[0],T[0])
+est = np.full((len(t),3),np.nan)  # K, tau, theta
+
 # Simulate CSTR
 for i in range(len(t)-1):
     ts = [t[i],t[i+1]]
@@ -86,14 +52,12 @@ for i in range(len(t)-1):
     T[i+1] = y[-1][1]
     x0[0] = Ca[i+1]
     x0[1] = T[i+1]
-
-# Construct results and save data file
-# Column 1 = time
-# Column 2 = cooling temperature
-# Column 3 = reactor temperature
-data = np.vstack((t,u,T)) # vertical stack
-data = data.T             # transpose data
-np.savetxt('data_doublet.txt',data,delimiter=',')
+    log.append(t[i+1],u[i+1],Ca[i+1],T[i+1])
+    rls.update(u[i+1],T[i+1])
+    est[i+1] = rls.fopdt()
+log.close()
+print('run log: ' + log.path)
+print('online FOPDT estimate: K %.4f  tau %.4f  theta %.4f' % tuple(est[-1]))
     
 # Plot the results
 plt.figure()
@@ -113,4 +77,12 @@ plt.ylabel('T (K)')
 plt.xlabel('Time (min)')
 plt.legend(['Reactor Temperature'],loc='best')
 
+# online estimate while the data came in
+plt.figure()
+for j, name in enumerate(('K','tau','theta')):
+    plt.subplot(3,1,j+1)
+    plt.plot(t,est[:,j],'b-',linewidth=2)
+    plt.ylabel(name)
+plt.xlabel('Time (min)')
+
 plt.show()
@@ -1,75 +1,41 @@
+import time
 import numpy as np
 import matplotlib.pyplot as plt
-from scipy.integrate import odeint
-from scipy.optimize import minimize
-from scipy.interpolate import interp1d
+from fopdt import fopdt_response, fopdt_sse, fit_fopdt, default_starts
+from exp_log import latest_run, read_log
 
-# Import CSV data file
+# Import the newest doublet run from part1 (see exp_log.py),
+# or the CSV data file if there is none
 # Column 1 = time (t)
 # Column 2 = input (u)
 # Column 3 = output (yp)
-data = np.loadtxt('data_doublet.txt',delimiter=',')
-u0 = data[0,1]
-yp0 = data[0,2]
-t = data[:,0].T
-u = data[:,1].T
-yp = data[:,2].T
+run = latest_run('doublet')
+if run is not None:
+    print('run log: ' + run)
+    data, meta = read_log(run)
+    t, u, yp = data['t'], data['Tc'], data['T']
+else:
+    data = np.loadtxt('data_doublet.txt',delimiter=',')
+    t = data[:,0].T
+    u = data[:,1].T
+    yp = data[:,2].T
+u0 = u[0]
+yp0 = yp[0]
 
 # specify number of steps
 ns = len(t)
 delta_t = t[1]-t[0]
-# create linear interpolation of the u data versus time
-uf = interp1d(t,u)
-
-# define first-order plus dead-time approximation    
-def fopdt(y,t,uf,Km,taum,thetam):
-    # arguments
-    #  y      = output
-    #  t      = time
-    #  uf     = input linear function (for time shift)
-    #  Km     = model gain
-    #  taum   = model time constant
-    #  thetam = model time constant
-    # time-shift u
-    try:
-        if (t-thetam) <= 0:
-            um = uf(0.0)
-        else:
-            um = uf(t-thetam)
-    except:
-        #print('Error with time extrapolation: ' + str(t))
-        um = u0
-    # calculate derivative
-    dydt = (-(y-yp0) + Km * (um-u0))/taum
-    return dydt
+# u[i+1] is held over [t[i], t[i+1]] (see part1), deviation from the start
+uh = u[1:] - u0
 
 # simulate FOPDT model with x=[Km,taum,thetam]
+# exact discrete-time response, see fopdt.py
 def sim_model(x):
-    # input arguments
-    Km = x[0]
-    taum = x[1]
-    thetam = x[2]
-    # storage for model values
-    ym = np.zeros(ns)  # model
-    # initial condition
-    ym[0] = yp0
-    # loop through time steps    
-    for i in range(0,ns-1):
-        ts = [delta_t*i,delta_t*(i+1)]
-        y1 = odeint(fopdt,ym[i],ts,args=(uf,Km,taum,thetam))
-        ym[i+1] = y1[-1]
-    return ym
+    return yp0 + fopdt_response(uh,delta_t,x[0],x[1],x[2])
 
-# define objective
+# define objective: sum of squared errors and its gradient
 def objective(x):
-    # simulate model
-    ym = sim_model(x)
-    # calculate objective
-    obj = 0.0
-    for i in range(len(ym)):
-        obj = obj + (ym[i]-yp[i])**2    
-    # return result
-    return obj
+    return fopdt_sse(x,uh,delta_t,yp-yp0)
 
 # initial guesses
 x0 = np.zeros(3)
@@ -78,16 +44,19 @@ x0[1] = 3.0 # taum
 x0[2] = 0.0 # thetam
 
 # show initial objective
-print('Initial SSE Objective: ' + str(objective(x0)))
+print('Initial SSE Objective: ' + str(objective(x0)[0]))
 
-# optimize Km, taum, thetam
+# optimize Km, taum, thetam from several starting points (and x0)
 # bounds on variables
 bnds = ((-1.0e10, 1.0e10), (0.01, 1.0e10), (0.0, 5.0))
-solution = minimize(objective,x0,method='SLSQP',bounds=bnds)
+starts = np.vstack((x0,default_starts(uh,yp-yp0,delta_t,bnds[2][1])))
+start_time = time.perf_counter()
+solution, solutions = fit_fopdt(t,u,yp,starts=starts,bounds=bnds)
+print('%d starts, %.1f ms' % (len(solutions),(time.perf_counter()-start_time)*1e3))
 x = solution.x
 
 # show final objective
-print('Final SSE Objective: ' + str(objective(x)))
+print('Final SSE Objective: ' + str(solution.fun))
 
 print('Kp: ' + str(x[0]))
 print('taup: ' + str(x[1]))
@@ -106,7 +75,7 @@ plt.ylabel('Output')
 plt.legend(loc='best')
 plt.subplot(2,1,2)
 plt.plot(t,u,'bx-',linewidth=2)
-plt.plot(t,uf(t),'r--',linewidth=3)
-plt.legend(['Measured','Interpolated'],loc='best')
+plt.step(t[0:-1],u[1:],'r--',where='post',linewidth=3)
+plt.legend(['Measured','Held input'],loc='best')
 plt.ylabel('Input Data')
 plt.show()
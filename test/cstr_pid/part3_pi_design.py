@@ -1,7 +1,11 @@
-# from identification
-Kp = 2.16288502017
-taup = 0.913444964569
-thetap = 0.000121628824381
+from cstr_pipeline import CstrPipeline
+
+# from identification (excitation + FOPDT fit, cached, see cstr_pipeline.py)
+fit = CstrPipeline().identify()
+Kp = fit['K']
+taup = fit['tau']
+thetap = fit['theta']
+print('Kp: %s  taup: %s  thetap: %s' % (Kp, taup, thetap))
 
 # design PI controller
 tauc = max(0.1*taup,0.8*thetap)
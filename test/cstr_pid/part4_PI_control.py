@@ -1,61 +1,14 @@
 import numpy as np
 import matplotlib.pyplot as plt
-from scipy.integrate import odeint
+from cosim import OdeStepper
+from cstr_model import cstr, default_model
+from exp_log import ExpLogWriter, new_run_path
 
 # from IMC tuning
 Kc = 4.61730615181
 tauI = 0.913444964569
 tauD = 0.0
 
-# define CSTR model
-def cstr(x,t,u,Tf,Caf):
-    # Inputs (3):
-    # Temperature of cooling jacket (K)
-    Tc = u
-    # Tf = Feed Temperature (K)
-    # Caf = Feed Concentration (mol/m^3)
-
-    # States (2):
-    # Concentration of A in CSTR (mol/m^3)
-    Ca = x[0]
-    # Temperature in CSTR (K)
-    T = x[1]
-
-    # Parameters:
-    # Volumetric Flowrate (m^3/sec)
-    q = 100
-    # Volume of CSTR (m^3)
-    V = 100
-    # Density of A-B Mixture (kg/m^3)
-    rho = 1000
-    # Heat capacity of A-B Mixture (J/kg-K)
-    Cp = 0.239
-    # Heat of reaction for A->B (J/mol)
-    mdelH = 5e4
-    # E - Activation energy in the Arrhenius Equation (J/mol)
-    # R - Universal Gas Constant = 8.31451 J/mol-K
-    EoverR = 8750
-    # Pre-exponential factor (1/sec)
-    k0 = 7.2e10
-    # U - Overall Heat Transfer Coefficient (W/m^2-K)
-    # A - Area - this value is specific for the U calculation (m^2)
-    UA = 5e4
-    # reaction rate
-    rA = k0*np.exp(-EoverR/T)*Ca
-
-    # Calculate concentration derivative
-    dCadt = q/V*(Caf - Ca) - rA
-    # Calculate temperature derivative
-    dTdt = q/V*(Tf - T) \
-            + mdelH/(rho*Cp)*rA \
-            + UA/V/rho/Cp*(Tc-T)
-    
-    # Return xdot:
-    xdot = np.zeros(2)
-    xdot[0] = dCadt
-    xdot[1] = dTdt
-    return xdot
-
 # Steady State Initial Conditions for the States
 Ca_ss = 0.87725294608097
 T_ss = 324.475443431599
@@ -98,6 +51,12 @@ op_hi = 350.0
 op_lo = 250.0
 
 pv[0] = T_ss
+# Run log, one file per run (see exp_log.py), one row per time step
+log = ExpLogWriter(new_run_path('pi_control'),[('t','f8'),('Tc','f8'),('Ca','f8'),('T','f8'),('sp','f8'),('op','f8')],
+                   meta={'script':'part4_PI_control','model':default_model.params(),'Tf':Tf,'Caf':Caf,
+                         'Kc':Kc,'tauI':tauI,'tauD':tauD,'op_hi':op_hi,'op_lo':op_lo})
+# plant integrator, kept alive for the whole run (see cosim.py)
+sim = OdeStepper(cstr,x0,t[0],args=(Tf,Caf))
 # loop through time steps    
 for i in range(len(t)-1):
     delta_t = t[i+1]-t[i]
@@ -115,27 +74,20 @@ for i in range(len(t)-1):
     if op[i] < op_lo:  # check lower limit
         op[i] = op_lo
         ie[i] = ie[i] - e[i] * delta_t # anti-reset windup
-    ts = [t[i],t[i+1]]
     u[i+1] = op[i]
-    y = odeint(cstr,x0,ts,args=(u[i+1],Tf,Caf))
-    Ca[i+1] = y[-1][0]
-    T[i+1] = y[-1][1]
-    x0[0] = Ca[i+1]
-    x0[1] = T[i+1]
+    y = sim.advance(t[i+1],u[i+1])
+    Ca[i+1] = y[0]
+    T[i+1] = y[1]
     pv[i+1] = T[i+1]
+    log.append(t[i],u[i],Ca[i],T[i],sp[i],op[i])
 op[len(t)-1] = op[len(t)-2]
 ie[len(t)-1] = ie[len(t)-2]
 P[len(t)-1] = P[len(t)-2]
 I[len(t)-1] = I[len(t)-2]
 D[len(t)-1] = D[len(t)-2]
-
-# Construct results and save data file
-# Column 1 = time
-# Column 2 = cooling temperature
-# Column 3 = reactor temperature
-data = np.vstack((t,u,T)) # vertical stack
-data = data.T             # transpose data
-np.savetxt('data_doublet.txt',data,delimiter=',')
+log.append(t[-1],u[-1],Ca[-1],T[-1],sp[-1],op[-1])
+log.close()
+print('run log: ' + log.path)
     
 # Plot the results
 plt.figure()
@@ -0,0 +1,100 @@
+import time
+import numpy as np
+import matplotlib.pyplot as plt
+from cstr_scenarios import run_pi_scenarios
+
+# Tuning campaign: a grid of PI gains around the IMC tuning, each tuning run
+# through several set-point profiles and feed disturbances, all scenarios
+# simulated together (see cstr_scenarios.py).
+
+# from IMC tuning
+Kc_imc = 4.61730615181
+tauI_imc = 0.913444964569
+
+# Time Interval (min), as part6
+t = np.linspace(0,10,301)
+T_ss = 324.475443431599
+
+# set point profiles
+sp_cases = {}
+sp_steps = np.ones(len(t))*T_ss
+for i in range(15):
+    sp_steps[i*20:(i+1)*20] = 300 + i*7.0
+sp_steps[300] = sp_steps[299]
+sp_cases['staircase'] = sp_steps
+sp_cases['step up'] = np.where(t < 1, T_ss, T_ss + 10.0)
+sp_cases['step down'] = np.where(t < 1, T_ss, T_ss - 20.0)
+sp_cases['ramp'] = T_ss + np.clip(t - 1, 0, 6) * 5.0
+
+# feed disturbances (Tf, Caf profiles), applied at t = 5 min
+dist_cases = {
+    'none': (350.0, 1.0),
+    'Tf +5 K': (np.where(t < 5, 350.0, 355.0), 1.0),
+    'Tf -5 K': (np.where(t < 5, 350.0, 345.0), 1.0),
+    'Caf +10%': (350.0, np.where(t < 5, 1.0, 1.1)),
+}
+
+# gain grid: 25 x 25 tunings, 16 scenarios each -> 10000 runs
+Kc_mult = np.logspace(-1, 1, 25)
+tauI_mult = np.logspace(-1.5, 0.5, 25)
+n_case = len(sp_cases) * len(dist_cases)
+KK, TT = np.meshgrid(Kc_mult, tauI_mult, indexing='ij')
+Kc = np.repeat(KK.ravel() * Kc_imc, n_case)
+tauI = np.repeat(TT.ravel() * tauI_imc, n_case)
+sp = np.empty((len(Kc), len(t)))
+Tf = np.empty((len(Kc), len(t)))
+Caf = np.empty((len(Kc), len(t)))
+k = 0
+for sp_case in sp_cases.values():
+    for Tf_case, Caf_case in dist_cases.values():
+        sp[k::n_case] = sp_case
+        Tf[k::n_case] = Tf_case
+        Caf[k::n_case] = Caf_case
+        k += 1
+
+start_time = time.perf_counter()
+summary, _ = run_pi_scenarios(t,sp,Kc,tauI,Tf=Tf,Caf=Caf)
+print('%d scenarios, %.2f s' % (len(summary),time.perf_counter()-start_time))
+
+# worst case IAE of each tuning over its scenarios, runaway counts as failed
+iae = np.where(summary['runaway'], np.inf, summary['iae']).reshape(KK.size, n_case)
+worst = iae.max(axis=1).reshape(KK.shape)
+order = np.argsort(worst, axis=None)
+print('%8s %8s %10s %10s %10s' % ('Kc', 'tauI', 'worst IAE', 'mean IAE', 'sat frac'))
+for idx in order[0:5]:
+    i, j = np.unravel_index(idx, KK.shape)
+    rows = summary[(i*len(tauI_mult)+j)*n_case:(i*len(tauI_mult)+j+1)*n_case]
+    print('%8.3f %8.3f %10.3f %10.3f %10.3f' % (KK[i,j]*Kc_imc, TT[i,j]*tauI_imc, worst[i,j],
+                                             rows['iae'].mean(), rows['sat_fraction'].mean()))
+print('runaway tunings: %d of %d' % (np.isinf(worst).sum(), worst.size))
+
+# rerun the best tuning and the IMC tuning with trajectories
+i, j = np.unravel_index(order[0], KK.shape)
+best = (KK[i,j]*Kc_imc, TT[i,j]*tauI_imc)
+sp_all = np.repeat(np.array(list(sp_cases.values())), 2, axis=0)
+_, traj = run_pi_scenarios(t,sp_all,[best[0],Kc_imc]*len(sp_cases),[best[1],tauI_imc]*len(sp_cases),
+                           keep_traj=True)
+
+# Plot the results
+plt.figure(1)
+plt.pcolormesh(Kc_mult*Kc_imc,tauI_mult*tauI_imc,np.log10(worst).T,shading='auto')
+plt.xscale('log')
+plt.yscale('log')
+plt.colorbar(label='log10 worst case IAE')
+plt.plot(best[0],best[1],'r*',markersize=12,label='best')
+plt.plot(Kc_imc,tauI_imc,'wo',label='IMC')
+plt.xlabel('Kc')
+plt.ylabel('tauI')
+plt.legend(loc='best')
+
+plt.figure(2)
+for k, name in enumerate(sp_cases):
+    plt.subplot(len(sp_cases),1,k+1)
+    plt.plot(t,traj['sp'][2*k],'k--',linewidth=1,label='Set Point')
+    plt.plot(t,traj['T'][2*k],'r-',linewidth=2,label='best Kc=%.2f tauI=%.3f' % best)
+    plt.plot(t,traj['T'][2*k+1],'b:',linewidth=2,label='IMC')
+    plt.ylabel(name)
+plt.subplot(len(sp_cases),1,1)
+plt.legend(loc='best')
+plt.xlabel('Time (min)')
+plt.show()
@@ -0,0 +1,98 @@
+import numpy as np
+import matplotlib.pyplot as plt
+from cosim import OdeStepper
+from cstr_model import cstr, default_model
+from cstr_mpc import CstrMpc
+from cstr_scenarios import run_pi_scenarios
+from exp_log import ExpLogWriter, new_run_path
+
+# IMC PI from part4, for comparison
+Kc = 4.61730615181
+tauI = 0.913444964569
+
+# Steady State Initial Conditions for the States
+Ca_ss = 0.87725294608097
+T_ss = 324.475443431599
+x0 = np.empty(2)
+x0[0] = Ca_ss
+x0[1] = T_ss
+
+# Steady State Initial Condition
+u_ss = 300.0
+# Feed Temperature (K)
+Tf = 350
+# Feed Concentration (mol/m^3)
+Caf = 1
+
+# Time Interval (min)
+t = np.linspace(0,25,251)
+
+# Store results for plotting
+Ca = np.ones(len(t)) * Ca_ss
+T = np.ones(len(t)) * T_ss
+u = np.ones(len(t)) * u_ss
+op = np.zeros(len(t))
+
+# set point, same steps as part4
+sp = np.zeros(len(t))
+sp[0:80] = 300.0
+sp[80:150] = 320.0
+sp[150:] = 280.0
+
+# Upper and Lower limits on OP
+op_hi = 350.0
+op_lo = 250.0
+
+# MPC: horizons in control intervals, weights on the tracking error and on OP moves
+mpc = CstrMpc(t[1]-t[0],u_ss=u_ss,x_ss=x0,Np=30,Nc=10,q=1.0,w=0.05,op_lo=op_lo,op_hi=op_hi)
+
+# Run log, one file per run (see exp_log.py), one row per time step
+log = ExpLogWriter(new_run_path('mpc_control'),[('t','f8'),('Tc','f8'),('Ca','f8'),('T','f8'),('sp','f8'),('op','f8')],
+                   meta={'script':'part8_mpc_control','model':default_model.params(),'Tf':Tf,'Caf':Caf,
+                         'Np':mpc.Np,'Nc':mpc.Nc,'q':1.0,'w':0.05,'op_hi':op_hi,'op_lo':op_lo})
+# plant integrator, kept alive for the whole run (see cosim.py)
+sim = OdeStepper(cstr,x0,t[0],args=(Tf,Caf))
+# loop through time steps
+for i in range(len(t)-1):
+    op[i] = mpc.step((Ca[i],T[i]),sp[i])
+    u[i+1] = op[i]
+    y = sim.advance(t[i+1],u[i+1])
+    Ca[i+1] = y[0]
+    T[i+1] = y[1]
+    log.append(t[i],u[i],Ca[i],T[i],sp[i],op[i])
+op[len(t)-1] = op[len(t)-2]
+log.append(t[-1],u[-1],Ca[-1],T[-1],sp[-1],op[-1])
+log.close()
+print('run log: ' + log.path)
+print(mpc.timing_report())
+
+# PI on the same set points (scenario engine, same controller as part4)
+pi, traj = run_pi_scenarios(t,sp,Kc,tauI,op_lo=op_lo,op_hi=op_hi,op_bias=u_ss,Tf=Tf,Caf=Caf,x0=x0,keep_traj=True)
+dt = t[1]-t[0]
+iae_mpc = np.sum(np.abs(sp[0:-1]-T[0:-1]))*dt
+print('IAE  PI %.2f  MPC %.2f' % (pi['iae'][0],iae_mpc))
+print('OP travel  PI %.1f  MPC %.1f' % (pi['op_travel'][0],np.sum(np.abs(np.diff(op[0:-1])))+abs(op[0]-u_ss)))
+
+# Plot the results
+plt.figure()
+plt.subplot(3,1,1)
+plt.plot(t,u,'b--',linewidth=3,label='MPC')
+plt.plot(t[1:],traj['op'][0,0:-1],'c:',linewidth=2,label='PI')
+plt.ylabel('Cooling T (K)')
+plt.legend(loc='best')
+
+plt.subplot(3,1,2)
+plt.plot(t,Ca,'g-',linewidth=3,label='MPC')
+plt.plot(t,traj['Ca'][0],'c:',linewidth=2,label='PI')
+plt.ylabel('Ca (mol/L)')
+plt.legend(loc='best')
+
+plt.subplot(3,1,3)
+plt.plot(t,T,'k-',linewidth=3,label='MPC')
+plt.plot(t,traj['T'][0],'c:',linewidth=2,label='PI')
+plt.plot(t,sp,'r--',linewidth=2,label='Set Point')
+plt.ylabel('T (K)')
+plt.xlabel('Time (min)')
+plt.legend(loc='best')
+
+plt.show()
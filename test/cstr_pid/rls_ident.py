@@ -0,0 +1,139 @@
+import numpy as np
+
+# Recursive least squares identification for streaming process data
+#
+# ARX model with an offset term, u held over each sample interval:
+#
+#   y[k+1] = a1 y[k] + ... + a_na y[k-na+1]
+#          + b1 u[k-nk] + ... + b_nb u[k-nk-nb+1] + c
+#
+# Every update is O(n^2) with n = na + nb + 1 parameters, independent of
+# how many samples have been seen. A forgetting factor lam < 1 lets the
+# estimate follow a slowly changing plant; to keep the covariance from
+# blowing up while the input is not exciting the plant (windup), its trace
+# is capped at max_trace. reset_covariance() restarts adaptation, for
+# example after a known change of the plant.
+#
+#   rls = FopdtRls(dt)
+#   for each sample:  rls.update(u_held, y_new)
+#   rls.fopdt()       # K, tau, theta at any time
+
+
+class RlsArx:
+    def __init__(self, na=1, nb=1, nk=0, lam=0.995, p0=1e4, max_trace=1e6, offset=True):
+        self.na, self.nb, self.nk = na, nb, nk
+        self.lam = lam
+        self.p0 = p0
+        self.max_trace = max_trace
+        self.offset = offset
+        self.n = na + nb + (1 if offset else 0)
+        self.theta = np.zeros(self.n)
+        self.P = p0 * np.eye(self.n)
+        self._y = np.zeros(na)                  # y[k], y[k-1], ...
+        self._u = np.zeros(nk + nb)             # u[k], u[k-1], ...
+        self._phi = np.zeros(self.n)
+        if offset:
+            self._phi[-1] = 1.0
+        self.count = 0                          # samples used
+        self.error = 0.0                        # last one step prediction error
+        self.resets = 0
+
+    # start the regressor at a steady operating point
+    def prime(self, u, y):
+        self._y[:] = y
+        self._u[:] = u
+
+    def reset_covariance(self, p0=None):
+        self.P = (self.p0 if p0 is None else p0) * np.eye(self.n)
+        self.resets += 1
+
+    def regressor(self):
+        phi = self._phi
+        phi[0:self.na] = self._y
+        phi[self.na:self.na + self.nb] = self._u[self.nk:self.nk + self.nb]
+        return phi
+
+    def predict(self):
+        return self.theta.dot(self.regressor())
+
+    # u: input held over the last interval, y: output at its end
+    def update(self, u, y):
+        self._u[1:] = self._u[0:-1]
+        self._u[0] = u
+        phi = self.regressor()
+        Pphi = self.P.dot(phi)
+        gain = Pphi / (self.lam + phi.dot(Pphi))
+        self.error = y - self.theta.dot(phi)
+        self.theta += gain * self.error
+        self.P -= np.outer(gain, Pphi)
+        self.P /= self.lam
+        trace = np.trace(self.P)
+        if trace > self.max_trace:
+            self.P *= self.max_trace / trace
+        self._y[1:] = self._y[0:-1]
+        self._y[0] = y
+        self.count += 1
+        return self.error
+
+
+class FopdtRls(RlsArx):
+    # FOPDT with an integer delay of nk samples plus a fraction of one, the
+    # same discretisation as fopdt.py:  y[k+1] = a y[k] + b1 u[k-nk-1] + b2 u[k-nk] + c
+    def __init__(self, dt, nk=0, **kwargs):
+        RlsArx.__init__(self, na=1, nb=2, nk=nk, **kwargs)
+        self.dt = dt
+
+    # current estimate as (K, tau, theta)
+    def fopdt(self):
+        a, b2, b1 = self.theta[0:3]
+        if not 0.0 < a < 1.0:
+            return np.nan, np.nan, np.nan
+        K = (b1 + b2) / (1.0 - a)
+        tau = -self.dt / np.log(a)
+        # fraction of a sample from the split between the two input taps
+        c = 1.0 - b2 / K if K != 0 else 1.0
+        f = 1.0 + tau / self.dt * np.log(c) if 0.0 < c <= 1.0 else 0.0
+        return K, tau, (self.nk + np.clip(f, 0.0, 1.0)) * self.dt
+
+
+if __name__ == '__main__':
+    import time
+    import matplotlib.pyplot as plt
+    from cosim import OdeStepper
+    from cstr_model import CstrModel
+
+    # long stream: random +-2 K cooling moves held for 5 min, jacket heat transfer
+    # degrading by 3% halfway (fouling); the estimate follows the change
+    plants = (CstrModel(), CstrModel(UA=4.85e4))
+    dt, n = 0.1, 20000
+    rng = np.random.default_rng(0)
+    u = 300.0 + np.repeat(rng.choice([-2.0, 2.0], n // 50), 50)
+    x = plants[0].steady_state(300.0)
+    sim = OdeStepper(lambda x, t, u, plant: plant.rhs(x, u), x, 0.0, args=(plants[0],))
+    rls = FopdtRls(dt, lam=0.999)
+    rls.prime(u[0], x[1])
+    est = np.empty((n, 3))
+    T = np.empty(n)
+    t_rls = 0.0
+    for k in range(n):
+        sim.args = (plants[k >= n // 2],)
+        T[k] = sim.advance((k + 1) * dt, u[k])[1]
+        t0 = time.perf_counter()
+        rls.update(u[k], T[k])
+        t_rls += time.perf_counter() - t0
+        est[k] = rls.fopdt()
+    print('%d samples, %.1f us per RLS update' % (n, t_rls / n * 1e6))
+    print('before change: K %.3f tau %.3f theta %.3f' % tuple(est[n // 2 - 1]))
+    print('after change:  K %.3f tau %.3f theta %.3f' % tuple(est[-1]))
+
+    tt = np.arange(1, n + 1) * dt
+    plt.figure()
+    for j, name in enumerate(('K', 'tau', 'theta')):
+        plt.subplot(4, 1, j + 1)
+        plt.plot(tt, est[:, j], 'b-')
+        plt.ylabel(name)
+    plt.subplot(4, 1, 4)
+    plt.plot(tt, T, 'k-')
+    plt.ylabel('T (K)')
+    plt.xlabel('Time (min)')
+    plt.show()